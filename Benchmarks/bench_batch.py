@@ -0,0 +1,73 @@
+"""
+Throughput benchmark for the columnar batch discount engine.
+
+Prices the same synthetic log with DiscountManager (processor.
+process_transactions) and with batch_discounts, both end to end (from and
+to transaction objects) and for the column operations alone. The batch
+engine uses NumPy when it is installed and pure-Python list passes
+otherwise; the engine in use is printed.
+
+Usage:
+    python -m Benchmarks.bench_batch [--lines 300000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import batch_discounts
+from Benchmarks.workload import generate_log
+from models import IgnoredTransaction
+from processor import process_transactions
+from validators import read_transactions
+
+
+def timed(func, *args):
+    """Return the best wall time of three calls."""
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        func(*args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def main(argv=None):
+    """Time the scalar and batch engines over one synthetic log."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=300_000)
+    parser.add_argument("--months", type=int, default=12)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "workload.txt")
+        generate_log(path, args.lines, months=args.months, malformed=0.01)
+        transactions = read_transactions(path)
+
+    valid = [t for t in transactions if not isinstance(t, IgnoredTransaction)]
+    columns = batch_discounts.to_columns(valid)
+    engine = "numpy" if batch_discounts.np is not None else "pure Python"
+    print(f"batch engine: {engine}, {len(transactions):,} lines")
+
+    for name, func, arg in (
+        ("DiscountManager", process_transactions, transactions),
+        (
+            "batch end to end",
+            batch_discounts.process_transactions_batch,
+            transactions,
+        ),
+        (
+            "batch columns only",
+            lambda columns: batch_discounts.apply_discounts_batch(*columns),
+            columns,
+        ),
+    ):
+        seconds = timed(func, arg)
+        print(
+            f"{name:>18} {seconds:7.3f} s {args.lines / seconds:12,.0f} lines/sec"
+        )
+
+
+if __name__ == "__main__":
+    main()
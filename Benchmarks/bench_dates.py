@@ -0,0 +1,39 @@
+"""
+Micro-benchmark for date validation.
+
+Compares the fixed-width fast path in validators.is_valid_date against the
+previous per-line datetime.strptime check.
+
+Usage:
+    python -m Benchmarks.bench_dates
+"""
+
+import datetime
+import timeit
+from validators import is_valid_date
+
+DATES = ["2015-02-01", "2015-02-29", "2016-02-29", "2015-13-01", "2015-2-1"]
+NUMBER = 100_000
+
+
+def strptime_valid(date: str) -> bool:
+    """Validate a date the way validate_transaction used to."""
+    try:
+        datetime.datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+
+def main():
+    """Time both validators over a mix of valid and invalid dates."""
+    for name, func in (("strptime", strptime_valid), ("fast", is_valid_date)):
+        for date in DATES:
+            seconds = timeit.timeit(lambda: func(date), number=NUMBER)
+            print(
+                f"{name:>8} {date:<12} {seconds / NUMBER * 1e9:8.0f} ns/call"
+            )
+
+
+if __name__ == "__main__":
+    main()
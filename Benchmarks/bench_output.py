@@ -0,0 +1,53 @@
+"""
+Throughput benchmark for output writing.
+
+Compares the buffered bulk writer behind processor.write_output against the
+previous one-print()-per-transaction implementation.
+
+Usage:
+    python -m Benchmarks.bench_output
+"""
+
+import os
+import time
+from contextlib import redirect_stdout
+from models import IgnoredTransaction
+from processor import process_transactions, write_output
+from validators import read_transactions
+
+REPEAT = 20_000  # Copies of input.txt written per run
+
+
+def print_output(transactions):
+    """Write transactions the way write_output used to."""
+    for transaction in transactions:
+        if isinstance(transaction, IgnoredTransaction):
+            print(f"{transaction.data} Ignored")
+        else:
+            discount_display = (
+                f"{transaction.discount / 100:.2f}"
+                if isinstance(transaction.discount, int)
+                else "-"
+            )
+            print(
+                f"{transaction.date} {transaction.size} {transaction.provider} "
+                f"{transaction.price / 100:.2f} {discount_display}"
+            )
+
+
+def main():
+    """Write the same processed transactions with both writers to /dev/null."""
+    transactions = (
+        process_transactions(read_transactions("input.txt")) * REPEAT
+    )
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        for name, writer in (("print", print_output), ("bulk", write_output)):
+            start = time.perf_counter()
+            with redirect_stdout(sink):
+                writer(transactions)
+            seconds = time.perf_counter() - start
+            print(f"{name:>6} {len(transactions) / seconds:12,.0f} lines/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Parse-time benchmark for the memory-mapped reader.
+
+Reads the same synthetic log with the text reader
+(validators.iter_transactions) and the memory-mapped reader
+(validators.iter_transactions_mmap), with the validation cache enabled and
+disabled, and reports the best of three runs.
+
+Usage:
+    python -m Benchmarks.bench_read [--lines 300000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from collections import deque
+from Benchmarks.workload import generate_log
+from validators import (
+    VALIDATION_CACHE_SIZE,
+    configure_validation_cache,
+    iter_transactions,
+    iter_transactions_mmap,
+)
+
+
+def best_time(reader, path, cache_size):
+    """Return the best wall time of three full reads, each from a cold cache.
+
+    Args:
+        reader (callable): The reader, taking the file path.
+        path (str): The log file.
+        cache_size (int): Validation cache size; 0 disables the cache.
+    """
+    best = None
+    for _ in range(3):
+        configure_validation_cache(cache_size)
+        start = time.perf_counter()
+        deque(reader(path), maxlen=0)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def main(argv=None):
+    """Time both readers over one synthetic log."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=300_000)
+    parser.add_argument("--months", type=int, default=12)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "workload.txt")
+        generate_log(path, args.lines, months=args.months, malformed=0.01)
+        for cache, cache_size in (
+            ("cache", VALIDATION_CACHE_SIZE),
+            ("no cache", 0),
+        ):
+            for name, reader in (
+                ("text", iter_transactions),
+                ("mmap", iter_transactions_mmap),
+            ):
+                seconds = best_time(reader, path, cache_size)
+                print(
+                    f"{name:>5} {cache:<9} {seconds:7.3f} s "
+                    f"{args.lines / seconds:12,.0f} lines/sec"
+                )
+    configure_validation_cache()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Startup benchmark for the command line entry point.
+
+Times complete ``python main.py`` runs on a small input, the way cron-like
+orchestrators invoke it, against a bare interpreter start, and lists the
+slowest imports reported by ``python -X importtime``.
+
+Usage:
+    python -m Benchmarks.bench_startup
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = 30
+SLOWEST_IMPORTS = 10
+
+
+def time_command(args, cwd):
+    """Run a command repeatedly and return its wall times in milliseconds."""
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def slowest_imports(args, cwd):
+    """Return (cumulative microseconds, module) for the slowest imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative), name.rstrip()))
+    return sorted(imports, reverse=True)[:SLOWEST_IMPORTS]
+
+
+def main():
+    """Time the plain CLI path against a bare interpreter start."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "input.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("2015-02-01 S MR\n2015-02-02 L LP\n2015-02-03 M MR\n")
+
+        commands = {
+            "python -c pass": [sys.executable, "-c", "pass"],
+            "python main.py": [sys.executable, "main.py", path],
+        }
+        for name, args in commands.items():
+            times = time_command(args, root)
+            print(
+                f"{name:<16} median {statistics.median(times):7.1f} ms "
+                f"min {min(times):7.1f} ms"
+            )
+
+        print("\nslowest imports (cumulative):")
+        for cumulative, name in slowest_imports(["main.py", path], root):
+            print(f"{cumulative / 1000:7.1f} ms {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Pipeline benchmark harness.
+
+Generates a synthetic shipment log, times each pipeline stage separately and
+reports lines/sec and peak memory per stage. Results are written as JSON so
+runs can be compared between releases.
+
+Validation stages are measured twice: "cold" starts every run with an empty
+validation cache, and "warm" with the cache already filled by a previous
+pass over the same lines, as for a feed that repeats lines.
+
+Usage:
+    python -m Benchmarks.harness --lines 1000000 --months 12 \\
+        --malformed 0.01 --output bench_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from Benchmarks.workload import (
+    DEFAULT_PROVIDER_MIX,
+    DEFAULT_SIZE_MIX,
+    generate_log,
+)
+from processor import process_transactions, write_output
+from validators import (
+    configure_validation_cache,
+    read_transactions,
+    validate_transaction,
+)
+
+
+def measure(stage, lines, setup=None):
+    """Run a stage twice: once timed, once under tracemalloc for peak memory.
+
+    Args:
+        stage (callable): The stage to run, taking no arguments.
+        lines (int): Number of input lines the stage handles.
+        setup (callable, optional): Run untimed before each run of the
+            stage, e.g. to reset caches.
+
+    Returns:
+        dict: Seconds, lines/sec and peak traced memory in bytes.
+    """
+    if setup is not None:
+        setup()
+    start = time.perf_counter()
+    stage()
+    seconds = time.perf_counter() - start
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        stage()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": seconds,
+        "lines_per_sec": lines / seconds if seconds else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run(path, lines):
+    """Benchmark every stage against an existing log file.
+
+    Args:
+        path (str): The input log.
+        lines (int): Number of lines in the log.
+
+    Returns:
+        dict: Stage name -> measurements.
+    """
+    with open(path, encoding="utf-8") as file:
+        raw_lines = [line.strip() for line in file]
+    transactions = read_transactions(path)
+    processed = process_transactions(transactions)
+
+    def validate():
+        for line in raw_lines:
+            validate_transaction(line)
+
+    def write():
+        with open(os.devnull, "w", encoding="utf-8") as sink:
+            write_output(processed, sink)
+
+    def read():
+        read_transactions(path)
+
+    def warm(stage):
+        def setup():
+            configure_validation_cache()
+            stage()
+
+        return setup
+
+    return {
+        "read_transactions": measure(read, lines, configure_validation_cache),
+        "read_transactions_warm": measure(read, lines, warm(read)),
+        "validate_transaction": measure(
+            validate, lines, configure_validation_cache
+        ),
+        "validate_transaction_warm": measure(validate, lines, warm(validate)),
+        "process_transactions": measure(
+            lambda: process_transactions(transactions), lines
+        ),
+        "write_output": measure(write, lines),
+    }
+
+
+def parse_mix(text):
+    """Parse a mix such as ``S=5,M=2,L=3`` into a weight dict."""
+    mix = {}
+    for item in text.split(","):
+        name, weight = item.split("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def format_mix(mix):
+    """Format a weight dict as ``S=5,M=2,L=3``."""
+    return ",".join(f"{name}={weight}" for name, weight in mix.items())
+
+
+def main(argv=None):
+    """Generate a workload, benchmark it and write the JSON report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--months", type=int, default=3)
+    parser.add_argument(
+        "--size-mix", type=parse_mix, default=format_mix(DEFAULT_SIZE_MIX)
+    )
+    parser.add_argument(
+        "--provider-mix",
+        type=parse_mix,
+        default=format_mix(DEFAULT_PROVIDER_MIX),
+    )
+    parser.add_argument("--malformed", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "workload.txt")
+        generate_log(
+            path,
+            args.lines,
+            months=args.months,
+            size_mix=args.size_mix,
+            provider_mix=args.provider_mix,
+            malformed=args.malformed,
+            seed=args.seed,
+        )
+        stages = run(path, args.lines)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workload": {
+            "lines": args.lines,
+            "months": args.months,
+            "size_mix": args.size_mix,
+            "provider_mix": args.provider_mix,
+            "malformed": args.malformed,
+            "seed": args.seed,
+        },
+        "stages": stages,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    for name, result in stages.items():
+        print(
+            f"{name:<27} {result['lines_per_sec']:12,.0f} lines/sec "
+            f"{result['peak_memory_bytes'] / 2**20:8.1f} MiB peak"
+        )
+
+
+if __name__ == "__main__":
+    main()
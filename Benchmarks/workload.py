@@ -0,0 +1,68 @@
+"""
+Synthetic shipment log generator for benchmarks.
+
+Usage:
+    from Benchmarks.workload import generate_log
+    generate_log("synthetic.txt", lines=1_000_000, months=12, malformed=0.01)
+"""
+
+import datetime
+import random
+
+DEFAULT_SIZE_MIX = {"S": 5, "M": 2, "L": 3}
+DEFAULT_PROVIDER_MIX = {"LP": 1, "MR": 1}
+
+# Lines that validate_transaction rejects, one per ignore reason.
+MALFORMED_LINES = (
+    "2015-02-29 S MR",  # Bad date
+    "2015-02-01 XL LP",  # Unknown size
+    "2015-02-01 S CUSPS",  # Unknown provider
+    "2015-02-01 CUSPS",  # Bad field count
+)
+
+
+def generate_log(
+    path: str,
+    lines: int,
+    months: int = 1,
+    start: datetime.date = datetime.date(2015, 1, 1),
+    size_mix: dict = None,
+    provider_mix: dict = None,
+    malformed: float = 0.0,
+    seed: int = 0,
+):
+    """Write a synthetic shipment log in date order.
+
+    Args:
+        path (str): The file to write.
+        lines (int): Number of lines.
+        months (int): Number of months the dates are spread over.
+        start (datetime.date): First day of the first month.
+        size_mix (dict, optional): Relative weight of each package size.
+        provider_mix (dict, optional): Relative weight of each provider.
+        malformed (float): Fraction of lines that fail validation.
+        seed (int): Random seed, for reproducible workloads.
+    """
+    rng = random.Random(seed)
+    size_mix = size_mix or DEFAULT_SIZE_MIX
+    provider_mix = provider_mix or DEFAULT_PROVIDER_MIX
+
+    first = start.replace(day=1)
+    month = first.month - 1 + months
+    end = first.replace(year=first.year + month // 12, month=month % 12 + 1)
+    days = (end - first).days
+
+    sizes = rng.choices(list(size_mix), list(size_mix.values()), k=lines)
+    providers = rng.choices(
+        list(provider_mix), list(provider_mix.values()), k=lines
+    )
+
+    with open(path, "w", encoding="utf-8") as file:
+        for index in range(lines):
+            if rng.random() < malformed:
+                file.write(rng.choice(MALFORMED_LINES) + "\n")
+                continue
+            day = first + datetime.timedelta(days=index * days // lines)
+            file.write(
+                f"{day.isoformat()} {sizes[index]} {providers[index]}\n"
+            )
@@ -0,0 +1,68 @@
+"""
+Differential tests for the columnar batch discount engine.
+
+Tests:
+    - test_batch_matches_scalar_on_sample: Ensures the batch engine matches DiscountManager on the sample input.
+    - test_batch_matches_scalar_on_random_input: Ensures the batch engine matches DiscountManager on random multi-month, multi-account input.
+    - test_batch_groups_by_month_token: Ensures non-canonical dates form their own month, as in DiscountManager.
+
+All tests cover the NumPy engine, when NumPy is installed, and the
+pure-Python fallback.
+"""
+
+import random
+import unittest
+from unittest import mock
+import batch_discounts
+from batch_discounts import process_transactions_batch
+from models import Transaction, IgnoredTransaction
+from processor import process_transactions
+from validators import read_transactions
+
+ENGINES = [None] + ([batch_discounts.np] if batch_discounts.np else [])
+
+
+class TestBatchDiscounts(unittest.TestCase):
+    def assertMatchesScalar(self, transactions):
+        expected = process_transactions(transactions)
+        for engine in ENGINES:
+            with mock.patch.object(batch_discounts, "np", engine):
+                self.assertEqual(
+                    process_transactions_batch(transactions), expected
+                )
+
+    def test_batch_matches_scalar_on_sample(self):
+        self.assertMatchesScalar(read_transactions("input.txt"))
+
+    def test_batch_matches_scalar_on_random_input(self):
+        rng = random.Random(42)
+        for _ in range(20):
+            transactions = []
+            for day in sorted(rng.randrange(1, 120) for _ in range(300)):
+                month, day = divmod(day, 28)
+                if rng.random() < 0.05:
+                    transactions.append(IgnoredTransaction("garbage"))
+                # Some dates are unpadded, as the validators accept.
+                template = rng.choice(["2015-{:02d}-{:02d}", "2015-{}-{}"])
+                transactions.append(
+                    Transaction(
+                        template.format(month + 1, day + 1),
+                        rng.choice("SSSMLLL"),
+                        rng.choice(["LP", "MR"]),
+                        rng.choice([None, "a1", "a2"]),
+                    )
+                )
+            self.assertMatchesScalar(transactions)
+
+    def test_batch_groups_by_month_token(self):
+        transactions = [Transaction("2015-2-1", "S", "MR")] * 15 + [
+            Transaction("2015-02-05", "S", "MR")
+        ] * 15
+        self.assertMatchesScalar(transactions)
+        self.assertEqual(
+            process_transactions_batch(transactions)[-1].discount, 50
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Unit tests for the price catalog and its hot reload.
+
+Tests:
+    - test_default_catalog_index: Ensures the default catalog indexes the built-in prices and derived values.
+    - test_reload_adds_provider: Ensures a reloaded catalog is used by validation and new DiscountManagers.
+    - test_invalid_catalog_keeps_previous: Ensures a failed reload leaves the published catalog in place.
+    - test_watcher_and_refresh: Ensures file changes are picked up by the watcher and by refresh_catalog only.
+    - test_reload_mid_stream: Ensures a provider published while transactions are being processed is priced instead of crashing the running manager.
+"""
+
+import json
+import os
+import pickle
+import tempfile
+import unittest
+from catalog import (
+    DEFAULT_CATALOG,
+    CatalogWatcher,
+    get_catalog,
+    reload_catalog,
+    set_catalog,
+)
+from discounts import DiscountManager
+from models import Transaction, IgnoredTransaction
+from processor import iter_processed_transactions
+from validators import validate_transaction
+
+CATALOG_WITH_DPD = {
+    "monthly_discount_limit": "10.00",
+    "prices": {
+        "LP": {"S": "1.50", "M": "4.90", "L": "6.90"},
+        "MR": {"S": "2.00", "M": "3.00", "L": "4.00"},
+        "DPD": {"S": "1.20", "M": "3.50"},
+    },
+}
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(set_catalog, DEFAULT_CATALOG)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "prices.json")
+
+    def write_catalog(self, data):
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+
+    def test_default_catalog_index(self):
+        catalog = get_catalog()
+        self.assertIs(catalog, DEFAULT_CATALOG)
+        self.assertEqual(catalog.price_index[("L", "LP")], 690)
+        self.assertEqual(catalog.lowest_price["S"], 150)
+        self.assertEqual(catalog.monthly_limit, 1000)
+        self.assertEqual(catalog.valid_sizes, {"S", "M", "L"})
+        restored = pickle.loads(pickle.dumps(catalog))
+        self.assertEqual(restored.price_index, catalog.price_index)
+
+    def test_reload_adds_provider(self):
+        self.write_catalog(CATALOG_WITH_DPD)
+        reload_catalog(self.path)
+
+        self.assertIsInstance(
+            validate_transaction("2015-02-01 S DPD"), Transaction
+        )
+        self.assertIsInstance(
+            validate_transaction("2015-02-01 L DPD"), IgnoredTransaction
+        )
+
+        processed = DiscountManager().apply_discounts(
+            Transaction("2015-02-01", "S", "MR")
+        )
+        self.assertEqual((processed.price, processed.discount), (120, 80))
+
+    def test_invalid_catalog_keeps_previous(self):
+        self.write_catalog({"prices": {"LP": {"S": "1.505"}}})
+        with self.assertRaises(ValueError):
+            reload_catalog(self.path)
+        self.assertIs(get_catalog(), DEFAULT_CATALOG)
+
+    def test_watcher_and_refresh(self):
+        self.write_catalog(CATALOG_WITH_DPD)
+        watcher = CatalogWatcher(self.path)
+        manager = DiscountManager()
+        self.assertFalse(watcher.poll())
+
+        data = dict(CATALOG_WITH_DPD, monthly_discount_limit="0.00")
+        self.write_catalog(data)
+        os.utime(self.path, ns=(0, watcher.mtime + 1))
+        self.assertTrue(watcher.poll())
+
+        # In-flight managers keep their catalog until they refresh.
+        self.assertEqual(manager.catalog.monthly_limit, 1000)
+        self.assertTrue(manager.refresh_catalog())
+        processed = manager.apply_discounts(
+            Transaction("2015-02-01", "S", "MR")
+        )
+        self.assertEqual((processed.price, processed.discount), (200, "-"))
+
+    def test_reload_mid_stream(self):
+        def transactions():
+            yield validate_transaction("2015-02-01 S MR")
+            reload_catalog(self.path)
+            yield validate_transaction("2015-02-02 S DPD")
+
+        self.write_catalog(CATALOG_WITH_DPD)
+        processed = list(iter_processed_transactions(transactions()))
+        self.assertEqual(
+            [(t.provider, t.price, t.discount) for t in processed],
+            [("MR", 150, 50), ("DPD", 120, "-")],
+        )
+
+        set_catalog(DEFAULT_CATALOG)
+        with self.assertRaises(ValueError):
+            DiscountManager().apply_discounts(
+                Transaction("2015-02-01", "S", "DPD")
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Tests for incremental processing with on-disk checkpoints.
+
+Tests:
+    - test_incremental_runs_match_full_run: Ensures processing a file in appended chunks gives the same output as one full run.
+    - test_partial_line_is_left_for_next_run: Ensures a line without a trailing newline is not consumed.
+    - test_final_run_processes_last_line: Ensures the unterminated last line of the repo's input.txt is reported as deferred, then processed by a final run.
+    - test_dedup_index_is_kept_across_runs: Ensures a line redelivered in a later run is dropped and does not take a second discount.
+    - test_retain_months_bounds_saved_state: Ensures the saved discount state and dedup index only keep the retained months, and late redeliveries are dropped.
+    - test_truncated_file_is_rejected: Ensures a file shorter than the checkpoint offset raises an error.
+    - test_snapshot_restore_round_trip: Ensures DiscountManager state survives snapshot and restore.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from checkpoint import load_checkpoint, process_incremental, save_checkpoint
+from discounts import DiscountManager
+from models import Transaction
+from processor import process_transactions, write_output
+from validators import read_transactions
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.input_path = os.path.join(self.tmp_dir.name, "input.txt")
+        self.checkpoint_path = os.path.join(self.tmp_dir.name, "state.json")
+
+    def append(self, text):
+        with open(self.input_path, "a", encoding="utf-8") as file:
+            file.write(text)
+
+    def run_incremental(self, final=False):
+        output = io.StringIO()
+        process_incremental(
+            self.input_path, self.checkpoint_path, output, final
+        )
+        return output.getvalue()
+
+    def test_incremental_runs_match_full_run(self):
+        with open("input.txt", encoding="utf-8") as file:
+            lines = [line + "\n" for line in file.read().splitlines()]
+
+        output = ""
+        for start in range(0, len(lines), 4):
+            self.append("".join(lines[start : start + 4]))
+            output += self.run_incremental()
+
+        expected = io.StringIO()
+        write_output(
+            process_transactions(read_transactions("input.txt")), expected
+        )
+        self.assertEqual(output, expected.getvalue())
+
+    def test_partial_line_is_left_for_next_run(self):
+        self.append("2015-02-01 S MR\n2015-02-02 S")
+        self.assertEqual(self.run_incremental(), "2015-02-01 S MR 1.50 0.50\n")
+
+        self.append(" MR\n")
+        self.assertEqual(self.run_incremental(), "2015-02-02 S MR 1.50 0.50\n")
+
+    def test_final_run_processes_last_line(self):
+        with open("input.txt", encoding="utf-8") as file:
+            self.append(file.read())
+        expected = io.StringIO()
+        write_output(
+            process_transactions(read_transactions("input.txt")), expected
+        )
+        expected = expected.getvalue().splitlines(keepends=True)
+
+        output = io.StringIO()
+        deferred = process_incremental(
+            self.input_path, self.checkpoint_path, output
+        )
+        self.assertEqual(deferred, len("2015-03-01 S MR"))
+        self.assertEqual(output.getvalue(), "".join(expected[:-1]))
+
+        self.assertEqual(self.run_incremental(final=True), expected[-1])
+        self.assertEqual(self.run_incremental(final=True), "")
+
+    def test_dedup_index_is_kept_across_runs(self):
+        self.append("2015-02-01 S MR #a\n2015-02-01 S MR #a\n")
+        output = io.StringIO()
+        process_incremental(
+            self.input_path, self.checkpoint_path, output, dedup=True
+        )
+        self.assertEqual(output.getvalue(), "2015-02-01 S MR 1.50 0.50\n")
+
+        self.append("2015-02-01 S MR #a\n2015-02-02 S MR #b\n")
+        output = io.StringIO()
+        process_incremental(
+            self.input_path, self.checkpoint_path, output, dedup=True
+        )
+        self.assertEqual(output.getvalue(), "2015-02-02 S MR 1.50 0.50\n")
+
+    def test_retain_months_bounds_saved_state(self):
+        for month in range(1, 6):
+            output = io.StringIO()
+            self.append(f"2015-{month:02d}-01 S MR #{month}\n")
+            if month == 5:
+                self.append("2015-01-01 S MR #1\n")
+            process_incremental(
+                self.input_path,
+                self.checkpoint_path,
+                output,
+                dedup=True,
+                retain_months=1,
+            )
+        self.assertEqual(output.getvalue(), "2015-05-01 S MR 1.50 0.50\n")
+        months, _, seen = load_checkpoint(self.checkpoint_path)
+        self.assertEqual(sorted(months), ["2015-04", "2015-05"])
+        self.assertEqual(sorted(seen["months"]), ["2015-04", "2015-05"])
+
+    def test_truncated_file_is_rejected(self):
+        self.append("2015-02-01 S MR\n")
+        save_checkpoint(self.checkpoint_path, DiscountManager(), 1000)
+        with self.assertRaises(ValueError):
+            self.run_incremental()
+
+    def test_snapshot_restore_round_trip(self):
+        manager = DiscountManager()
+        for day in range(1, 4):
+            manager.apply_discounts(Transaction(f"2015-02-0{day}", "L", "LP"))
+
+        restored = DiscountManager()
+        restored.restore(manager.snapshot())
+        self.assertEqual(restored.snapshot(), {"2015-02": [3, 690]})
+
+
+if __name__ == "__main__":
+    unittest.main()
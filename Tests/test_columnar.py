@@ -0,0 +1,106 @@
+"""
+Unit tests for the binary columnar format.
+
+Tests:
+    - test_validated_round_trip_feeds_processing: Ensures validated transactions read back can be processed without validation.
+    - test_processed_round_trip: Ensures processed output written through write_output reads back unchanged.
+    - test_columns_are_zero_copy_views: Ensures columns are exposed as typed memoryviews over the mapped file.
+    - test_keeps_transaction_ids: Ensures transaction ids read back unchanged, so a columnar file can be deduplicated.
+    - test_keeps_non_canonical_dates: Ensures accepted dates not in YYYY-MM-DD form read back unchanged, so reprocessing keeps their month.
+    - test_rejects_other_files: Ensures non-columnar and truncated columnar files are rejected.
+"""
+
+import os
+import tempfile
+import unittest
+from columnar import ColumnarFile, read_columnar, write_columnar
+from models import Transaction
+from processor import process_transactions, write_output
+from validators import read_transactions
+
+
+class TestColumnar(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "transactions.col")
+        self.transactions = read_transactions("input.txt")
+        self.transactions.insert(
+            3, Transaction("2015-02-04", "M", "LP", "acct")
+        )
+
+    def test_validated_round_trip_feeds_processing(self):
+        write_columnar(self.transactions, self.path)
+        restored = list(read_columnar(self.path))
+        self.assertEqual(restored, self.transactions)
+        self.assertEqual(
+            process_transactions(restored),
+            process_transactions(self.transactions),
+        )
+
+    def test_processed_round_trip(self):
+        processed = process_transactions(self.transactions)
+        write_output(processed, self.path, fmt="columnar")
+        self.assertEqual(list(read_columnar(self.path)), processed)
+
+        with self.assertRaises(ValueError):
+            write_columnar(processed + self.transactions, self.path)
+
+    def test_columns_are_zero_copy_views(self):
+        write_columnar(self.transactions, self.path)
+        with ColumnarFile(self.path) as columnar:
+            ordinals = columnar.columns["ordinal"]
+            self.assertIsInstance(ordinals, memoryview)
+            self.assertEqual(ordinals.format, "i")
+            self.assertEqual(len(ordinals), 21)
+            self.assertEqual(ordinals[0], self.transactions[0].ordinal)
+            self.assertEqual(list(columnar.columns["ignored_position"]), [20])
+
+    def test_keeps_transaction_ids(self):
+        transactions = [
+            Transaction("2015-02-01", "S", "MR", None, "a-1"),
+            Transaction("2015-02-01", "S", "MR"),
+            Transaction("2015-02-02", "L", "LP", "acct", "\u00e9-2"),
+        ]
+        write_columnar(transactions, self.path)
+        self.assertEqual(list(read_columnar(self.path)), transactions)
+        with ColumnarFile(self.path) as columnar:
+            self.assertEqual(
+                list(columnar.columns["transaction_id_offset"]), [0, 3, 3, 7]
+            )
+
+        write_columnar(self.transactions, self.path)
+        with ColumnarFile(self.path) as columnar:
+            self.assertFalse(columnar.header["transaction_ids"])
+            self.assertEqual(len(columnar.columns["transaction_id_offset"]), 0)
+
+    def test_keeps_non_canonical_dates(self):
+        transactions = [
+            Transaction("2015-2-1", "L", "LP"),
+            Transaction("2015-2-1", "L", "LP"),
+            Transaction("2015-02-03", "L", "LP"),
+        ]
+        write_columnar(transactions, self.path)
+        restored = list(read_columnar(self.path))
+        self.assertEqual(restored, transactions)
+        self.assertEqual(
+            process_transactions(restored),
+            process_transactions(transactions),
+        )
+        with ColumnarFile(self.path) as columnar:
+            self.assertEqual(list(columnar.columns["date"]), [1, 1, 0])
+            self.assertEqual(columnar.header["dates"], ["2015-2-1"])
+
+    def test_rejects_other_files(self):
+        with self.assertRaises(ValueError):
+            ColumnarFile("input.txt")
+
+        write_columnar(self.transactions, self.path)
+        with open(self.path, "r+b") as file:
+            file.truncate(64)
+        with self.assertRaisesRegex(ValueError, "damaged"):
+            ColumnarFile(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests for deduplication of redelivered transactions.
+
+Tests:
+    - test_redelivered_batch_is_priced_once: Ensures duplicated lines do not consume the L/LP count or the monthly discount budget twice.
+    - test_transactions_without_id_pass_through: Ensures lines without a transaction id and ignored lines are never dropped.
+    - test_closed_months_are_evicted: Ensures months outside the retention window are evicted and their redeliveries dropped as late.
+    - test_unpadded_dates_share_their_month: Ensures unpadded dates are indexed and evicted by calendar month.
+    - test_bloom_prefilter_never_drops_new_ids: Ensures an index with an undersized Bloom prefilter still keeps every new id and drops every duplicate.
+    - test_snapshot_restore: Ensures exact and Bloom indexes with stable hashes survive snapshot and restore, and a restoring index applies its own retention window.
+"""
+
+import json
+import unittest
+from dedup import BloomFilter, SeenIndex, deduplicate
+from models import IgnoredTransaction, Transaction
+from processor import process_transactions
+from validators import validate_transaction
+
+
+def lines_with_ids(lines):
+    return [f"{line} #{number}" for number, line in enumerate(lines)]
+
+
+class TestDedup(unittest.TestCase):
+    def test_redelivered_batch_is_priced_once(self):
+        batch = [
+            validate_transaction(line)
+            for line in lines_with_ids(
+                ["2015-02-01 L LP", "2015-02-02 L LP", "2015-02-03 S MR"]
+            )
+        ]
+        third = validate_transaction("2015-02-04 L LP #3")
+        self.assertEqual(third.transaction_id, "3")
+
+        index = SeenIndex()
+        processed = process_transactions(
+            deduplicate(batch + batch + [third], index)
+        )
+
+        self.assertEqual(len(processed), 4)
+        self.assertEqual(processed[-1].discount, 690)
+        self.assertEqual(index.duplicates, 3)
+
+    def test_transactions_without_id_pass_through(self):
+        transactions = [
+            Transaction("2015-02-01", "S", "MR"),
+            Transaction("2015-02-01", "S", "MR"),
+            IgnoredTransaction("2015-02-01 S MR #"),
+            IgnoredTransaction("2015-02-01 S MR #"),
+        ]
+        self.assertEqual(list(deduplicate(transactions)), transactions)
+
+    def test_closed_months_are_evicted(self):
+        index = SeenIndex(retain_months=1)
+        transactions = [
+            Transaction(f"2015-{month:02d}-01", "S", "MR", None, "same-id")
+            for month in (1, 2, 3)
+        ]
+        kept = list(deduplicate(transactions + transactions[:2], index))
+
+        self.assertEqual(kept, transactions)
+        self.assertEqual(sorted(index.months), ["2015-02", "2015-03"])
+        self.assertEqual((index.late, index.duplicates), (1, 1))
+
+    def test_unpadded_dates_share_their_month(self):
+        index = SeenIndex(retain_months=1)
+        transactions = [
+            Transaction("2015-2-1", "S", "MR", None, "a"),
+            Transaction("2015-02-05", "S", "MR", None, "a"),
+            Transaction("2015-3-1", "S", "MR", None, "b"),
+            Transaction("2015-4-1", "S", "MR", None, "c"),
+            Transaction("2015-2-9", "S", "MR", None, "d"),
+        ]
+        kept = list(deduplicate(transactions, index))
+
+        self.assertEqual(kept, [transactions[0]] + transactions[2:4])
+        self.assertEqual(sorted(index.months), ["2015-03", "2015-04"])
+        self.assertEqual((index.late, index.duplicates), (1, 1))
+
+    def test_bloom_prefilter_never_drops_new_ids(self):
+        # 10 bits per id would give ~1% false positives; 2 give far more.
+        index = SeenIndex(bloom_bits=2_000)
+        transactions = [
+            Transaction("2015-02-01", "S", "MR", None, f"id-{number}")
+            for number in range(1000)
+        ]
+        kept = list(deduplicate(transactions + transactions, index))
+
+        self.assertEqual(kept, transactions)
+        self.assertEqual(index.duplicates, 1000)
+        self.assertGreater(index.blooms["2015-02"].false_positive_rate(), 0.1)
+
+        bloom = BloomFilter(64)
+        self.assertFalse(bloom.add(12345))
+        self.assertTrue(bloom.add(12345))
+
+    def test_snapshot_restore(self):
+        for bloom_bits in (None, 1024):
+            index = SeenIndex(bloom_bits=bloom_bits, stable_hashes=True)
+            first, second = (
+                Transaction("2015-02-01", "S", "MR", None, transaction_id)
+                for transaction_id in "ab"
+            )
+            index.seen(first)
+            restored = SeenIndex(bloom_bits=bloom_bits, stable_hashes=True)
+            restored.restore(json.loads(json.dumps(index.snapshot())))
+            self.assertTrue(restored.seen(first))
+            self.assertFalse(restored.seen(second))
+
+        with self.assertRaises(ValueError):
+            SeenIndex().snapshot()
+
+        index = SeenIndex(stable_hashes=True)
+        for month in (1, 2, 3):
+            index.seen(Transaction(f"2015-{month}-1", "S", "MR", None, "a"))
+        restored = SeenIndex(retain_months=1, stable_hashes=True)
+        restored.restore(index.snapshot())
+        self.assertEqual(sorted(restored.months), ["2015-02", "2015-03"])
+        self.assertEqual(restored.closed_before, "2015-02")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,10 @@ Tests:
     - test_small_package_discount: Ensures the small package discount is applied correctly.
     - test_large_lp_third_shipment_free: Ensures the large LP third shipment free discount is applied correctly.
     - test_large_lp_third_shipment_discount: Ensures that the third shipment free discount is correctly applied after the second large LP shipment.
+    - test_compiled_rule_table: Ensures each (size, provider) pair only dispatches to the rules that can apply to it.
+    - test_accounts_have_separate_budgets: Ensures discount tracking is partitioned by account and month.
+    - test_retain_months_evicts_idle_partitions: Ensures partitions of past months are evicted.
+    - test_snapshot_restore_with_accounts: Ensures account partitions survive snapshot and restore.
 """
 
 import unittest
@@ -18,27 +22,99 @@ class TestDiscounts(unittest.TestCase):
     def setUp(self):
         self.discount_manager = DiscountManager()
         self.tracking_data = defaultdict(
-            lambda: {"L_LP_count": 0, "discount": 0.0}
+            lambda: {"L_LP_count": 0, "discount": 0}
         )
 
     def test_small_package_discount(self):
         transaction = Transaction("2025-03-09", "S", "LP")
         discount_rule = SmallPackageDiscount()
         price, discount = discount_rule.apply(transaction, self.tracking_data)
-        self.assertEqual(price, 1.50)
-        self.assertEqual(discount, 0.0)
+        self.assertEqual(price, 150)
+        self.assertEqual(discount, 0)
 
     def test_large_lp_third_shipment_free(self):
         transaction = Transaction("2025-03-09", "L", "LP")
         discount_rule = LargeLPThirdShipmentFree()
         price, discount = discount_rule.apply(transaction, self.tracking_data)
-        self.assertEqual(price, 6.90)
-        self.assertEqual(discount, 0.0)
+        self.assertEqual(price, 690)
+        self.assertEqual(discount, 0)
 
     def test_large_lp_third_shipment_discount(self):
         self.tracking_data["2025-03"]["L_LP_count"] = 2  # Third Shipment
         transaction = Transaction("2025-03-09", "L", "LP")
         discount_rule = LargeLPThirdShipmentFree()
         price, discount = discount_rule.apply(transaction, self.tracking_data)
-        self.assertEqual(price, 0.00)
-        self.assertEqual(discount, 6.90)
+        self.assertEqual(price, 0)
+        self.assertEqual(discount, 690)
+
+    def test_compiled_rule_table(self):
+        table = self.discount_manager.rule_table
+        self.assertEqual(table[("M", "MR")], (300, ()))
+        self.assertEqual(table[("S", "LP")], (150, ()))
+
+        price, rules = table[("S", "MR")]
+        self.assertEqual(price, 200)
+        self.assertEqual(
+            [type(rule) for rule in rules], [SmallPackageDiscount]
+        )
+
+        price, rules = table[("L", "LP")]
+        self.assertEqual(price, 690)
+        self.assertEqual(
+            [type(rule) for rule in rules], [LargeLPThirdShipmentFree]
+        )
+
+    def test_accounts_have_separate_budgets(self):
+        for _ in range(25):
+            self.discount_manager.apply_discounts(
+                Transaction("2025-03-09", "S", "MR", "alice")
+            )
+        processed = self.discount_manager.apply_discounts(
+            Transaction("2025-03-09", "S", "MR", "bob")
+        )
+        self.assertEqual((processed.price, processed.discount), (150, 50))
+        self.assertEqual(processed.account, "bob")
+
+        tracking_data = self.discount_manager.tracking_data
+        self.assertEqual(tracking_data[("alice", "2025-03")]["discount"], 1000)
+        self.assertEqual(tracking_data[("bob", "2025-03")]["discount"], 50)
+        self.assertNotIn("2025-03", tracking_data)
+
+    def test_retain_months_evicts_idle_partitions(self):
+        manager = DiscountManager(retain_months=2)
+        for account in ("alice", "bob"):
+            manager.apply_discounts(
+                Transaction("2025-01-09", "S", "MR", account)
+            )
+        manager.apply_discounts(Transaction("2025-02-09", "S", "MR", "alice"))
+        self.assertEqual(len(manager.tracking_data), 3)
+
+        # Two months before 2025-03 are still retained.
+        manager.apply_discounts(Transaction("2025-03-01", "S", "MR", "carol"))
+        self.assertEqual(len(manager.tracking_data), 4)
+        self.assertEqual(manager.evicted_before, "2025-01")
+
+        manager.apply_discounts(Transaction("2025-04-01", "S", "MR", "carol"))
+        self.assertEqual(
+            set(manager.tracking_data),
+            {("alice", "2025-02"), ("carol", "2025-03"), ("carol", "2025-04")},
+        )
+
+    def test_snapshot_restore_with_accounts(self):
+        self.discount_manager.apply_discounts(
+            Transaction("2025-03-09", "S", "MR", "alice")
+        )
+        self.discount_manager.apply_discounts(
+            Transaction("2025-03-09", "S", "MR")
+        )
+        snapshot = self.discount_manager.snapshot()
+        self.assertEqual(
+            snapshot, {"alice 2025-03": [0, 50], "2025-03": [0, 50]}
+        )
+
+        restored = DiscountManager()
+        restored.restore(snapshot)
+        self.assertEqual(
+            restored.tracking_data[("alice", "2025-03")]["discount"], 50
+        )
+        self.assertEqual(restored.snapshot(), snapshot)
@@ -0,0 +1,56 @@
+"""
+Unit tests for the external merge sort and out-of-order processing.
+
+Tests:
+    - test_external_sort_spills_and_stays_stable: Ensures spilled multi-pass sorting is correct and stable.
+    - test_unsorted_input_in_date_order: Ensures shuffled input is priced as if it arrived sorted, output in date order.
+    - test_unsorted_input_in_input_order: Ensures results can be returned in the original input order.
+"""
+
+import random
+import unittest
+from external_sort import external_sort, process_unsorted
+from models import IgnoredTransaction
+from processor import process_transactions
+from validators import read_transactions
+
+
+class TestExternalSort(unittest.TestCase):
+    def setUp(self):
+        self.transactions = [
+            t
+            for t in read_transactions("input.txt")
+            if not isinstance(t, IgnoredTransaction)
+        ]
+        self.shuffled = list(self.transactions)
+        random.Random(7).shuffle(self.shuffled)
+
+    def test_external_sort_spills_and_stays_stable(self):
+        rng = random.Random(1)
+        items = [(rng.randrange(10), index) for index in range(1000)]
+        result = list(
+            external_sort(
+                items, key=lambda item: item[0], run_size=7, fan_in=3
+            )
+        )
+        self.assertEqual(result, sorted(items, key=lambda item: item[0]))
+
+    def test_unsorted_input_in_date_order(self):
+        by_date = sorted(self.shuffled, key=lambda t: t.date)
+        result = list(
+            process_unsorted(self.shuffled, order="date", run_size=4)
+        )
+        self.assertEqual(result, process_transactions(by_date))
+
+    def test_unsorted_input_in_input_order(self):
+        by_date = sorted(self.shuffled, key=lambda t: t.date)
+        expected = dict(zip(map(id, by_date), process_transactions(by_date)))
+        result = list(process_unsorted(self.shuffled, run_size=4))
+        self.assertEqual(result, [expected[id(t)] for t in self.shuffled])
+
+        with self.assertRaises(ValueError):
+            process_unsorted(self.shuffled, order="random")
+
+
+if __name__ == "__main__":
+    unittest.main()
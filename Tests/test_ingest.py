@@ -0,0 +1,83 @@
+"""
+Tests for multi-shard ingestion.
+
+Tests:
+    - test_expand_sources: Ensures directories and globs expand to sorted shard paths and plain paths are kept.
+    - test_shards_match_concatenated_input: Ensures shards priced in one pass match a single file holding all their lines.
+    - test_bad_shards_are_reported_and_skipped: Ensures missing, wrongly named and empty shards are reported without aborting the batch.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from ingest import expand_sources, iter_shards, process_shards
+from processor import iter_processed_transactions, write_output
+from validators import read_transactions
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def write_shard(self, name, text):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        return path
+
+    def test_expand_sources(self):
+        second = self.write_shard("b.txt", "x\n")
+        first = self.write_shard("a.txt", "x\n")
+        self.write_shard("notes.md", "x\n")
+
+        self.assertEqual(expand_sources([self.tmp_dir.name]), [first, second])
+        self.assertEqual(
+            expand_sources([os.path.join(self.tmp_dir.name, "*")]),
+            [first, second, os.path.join(self.tmp_dir.name, "notes.md")],
+        )
+        self.assertEqual(
+            expand_sources(["missing.txt", "none*.txt"]),
+            ["missing.txt", "none*.txt"],
+        )
+
+    def test_shards_match_concatenated_input(self):
+        with open("input.txt", encoding="utf-8") as file:
+            lines = [line + "\n" for line in file.read().splitlines()]
+        for number, start in enumerate(range(0, len(lines), 4)):
+            self.write_shard(
+                f"shard-{number:02d}.txt", "".join(lines[start : start + 4])
+            )
+
+        expected = io.StringIO()
+        write_output(
+            iter_processed_transactions(read_transactions("input.txt")),
+            expected,
+        )
+        actual = io.StringIO()
+        errors = process_shards([self.tmp_dir.name], actual, max_workers=2)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(actual.getvalue(), expected.getvalue())
+
+    def test_bad_shards_are_reported_and_skipped(self):
+        good = self.write_shard("good.txt", "2015-02-01 S MR\n")
+        wrong = self.write_shard("good.csv", "2015-02-01 S MR\n")
+        empty = self.write_shard("empty.txt", "")
+        missing = os.path.join(self.tmp_dir.name, "missing.txt")
+
+        errors = []
+        transactions = list(
+            iter_shards([missing, wrong, good, empty, good], errors)
+        )
+
+        self.assertEqual(len(transactions), 2)
+        self.assertEqual([path for path, _ in errors], [missing, wrong, empty])
+        self.assertIsInstance(errors[0][1], FileNotFoundError)
+        self.assertIsInstance(errors[1][1], ValueError)
+        self.assertIn("empty", str(errors[2][1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
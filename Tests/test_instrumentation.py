@@ -0,0 +1,64 @@
+"""
+Tests for the optional pipeline instrumentation.
+
+Tests:
+    - test_counters_for_sample_run: Ensures stage, rule and monthly cap counters are recorded for a full run.
+    - test_ignored_lines_by_reason: Ensures ignored lines are counted by reason.
+    - test_disabled_by_default: Ensures nothing is recorded when instrumentation is off.
+"""
+
+import io
+import unittest
+import instrumentation
+from processor import iter_processed_transactions, write_output
+from validators import iter_transactions, validate_transaction
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(instrumentation.disable)
+
+    def test_counters_for_sample_run(self):
+        instrumentation.enable()
+        write_output(
+            iter_processed_transactions(iter_transactions("input.txt")),
+            io.StringIO(),
+        )
+        summary = instrumentation.disable().summary()
+
+        for stage in ("read", "process", "write"):
+            self.assertEqual(summary["stages"][stage]["items"], 21)
+        self.assertEqual(
+            summary["rules"]["LargeLPThirdShipmentFree"],
+            {"evaluations": 7, "hits": 1},
+        )
+        self.assertEqual(
+            summary["rules"]["SmallPackageDiscount"],
+            {"evaluations": 8, "hits": 8},
+        )
+        self.assertEqual(summary["ignored"], {"field_count": 1})
+        self.assertEqual(summary["monthly_cap_triggered"], 1)
+
+    def test_ignored_lines_by_reason(self):
+        stats = instrumentation.enable()
+        for line in (
+            "2015-02-01 S",
+            "2015-02-29 S MR",
+            "2015-02-01 XL MR",
+            "2015-02-01 S CUSPS",
+            "2015-02-01 S MR",
+        ):
+            validate_transaction(line)
+        self.assertEqual(
+            stats.summary()["ignored"],
+            {"field_count": 1, "date": 1, "size": 1, "provider": 1},
+        )
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(instrumentation.STATS)
+        validate_transaction("2015-02-29 S MR")
+        self.assertIsNone(instrumentation.disable())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ Tests:
 
 import unittest
 from models import Transaction, IgnoredTransaction
+from output import format_transaction
 from processor import process_transactions
 
 
@@ -63,20 +64,7 @@ class TestIntegration(unittest.TestCase):
         ]
 
         # Capture the output from the processed transactions
-        output_lines = []
-        for transaction in processed:
-            if isinstance(transaction, IgnoredTransaction):
-                output_lines.append(f"{transaction.data} Ignored")
-            else:
-                discount_display = (
-                    f"{transaction.discount:.2f}"
-                    if isinstance(transaction.discount, float)
-                    else "-"
-                )
-                output_lines.append(
-                    f"{transaction.date} {transaction.size} {transaction.provider} "
-                    f"{transaction.price:.2f} {discount_display}"
-                )
+        output_lines = [format_transaction(t) for t in processed]
 
         # Compare the processed output with the expected output
         self.assertEqual(output_lines, expected_output)
@@ -0,0 +1,155 @@
+"""
+Tests for the command line entry point.
+
+Tests:
+    - test_plain_invocation_uses_defaults: Ensures a lone input path is parsed without argparse and with default options.
+    - test_options_are_parsed: Ensures command line options override the defaults.
+    - test_cli_output_matches_pipeline: Ensures the CLI writes the same output as the pipeline functions, with and without options, and writes the monthly report.
+    - test_invalid_input_exits_with_error: Ensures a missing input file exits with its error message.
+    - test_unsupported_combinations_are_rejected: Ensures options that the selected mode would ignore exit with an error, and --workers is accepted for a multi-input batch.
+    - test_columnar_input_skips_parsing: Ensures validated transactions written with --validate-only are read back as input and priced like the text log, and processed columnar files are rejected as input.
+    - test_bad_shards_are_reported_after_batch: Ensures a multi-input batch writes the readable shards and exits with status 1.
+    - test_startup_skips_optional_modules: Ensures importing main does not load argparse, multiprocessing or asyncio.
+"""
+
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from main import DEFAULTS, check_options, main, parse_args
+from processor import process_transactions, write_output
+from validators import read_transactions
+
+
+class TestMain(unittest.TestCase):
+    def test_plain_invocation_uses_defaults(self):
+        self.assertEqual(vars(parse_args([])), DEFAULTS)
+        options = parse_args(["shipments.txt"])
+        self.assertEqual(options.inputs, ["shipments.txt"])
+        self.assertEqual(options.format, "text")
+
+    def test_options_are_parsed(self):
+        options = parse_args(
+            ["shipments.txt", "--parallel", "--workers", "2", "-o", "out"]
+        )
+        self.assertEqual(options.inputs, ["shipments.txt"])
+        self.assertTrue(options.parallel)
+        self.assertEqual(options.workers, 2)
+        self.assertEqual(options.output, "out")
+        self.assertEqual(options.port, DEFAULTS["port"])
+        self.assertEqual(parse_args(["--stats"]).inputs, ["input.txt"])
+
+    def test_cli_output_matches_pipeline(self):
+        expected = io.StringIO()
+        write_output(
+            process_transactions(read_transactions("input.txt")), expected
+        )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            report = os.path.join(tmp_dir, "report.txt")
+            for options in (
+                [],
+                ["--mmap"],
+                ["--order", "input"],
+                ["--report", report],
+                ["--retain-months", "1"],
+                ["--order", "date", "--retain-months", "0"],
+            ):
+                path = os.path.join(tmp_dir, "output.txt")
+                main(["input.txt", "--output", path, *options])
+                with open(path, encoding="utf-8") as file:
+                    self.assertEqual(file.read(), expected.getvalue())
+            with open(report, encoding="utf-8") as file:
+                self.assertTrue(file.read().startswith("2015-02: "))
+
+    def test_invalid_input_exits_with_error(self):
+        with self.assertRaises(SystemExit) as context:
+            main(["missing.txt"])
+        self.assertIn("does not exist", str(context.exception.code))
+
+    def test_unsupported_combinations_are_rejected(self):
+        for options, message in (
+            (["--checkpoint", "ck.json", "--format", "store"], "--format"),
+            (["--checkpoint", "ck.json", "--mmap"], "--mmap"),
+            (["--checkpoint", "ck.json", "--report", "r.txt"], "--report"),
+            (["--order", "date", "--parallel"], "--parallel"),
+            (["--scenario", "s.json", "--report", "r.txt"], "--report"),
+            (["--scenario", "s.json", "--format", "columnar"], "--format"),
+            (["--final"], "--final"),
+            (["--port", "9000"], "--port"),
+            (["--host", "0.0.0.0"], "--host"),
+            (["--socket", "pricing.sock"], "--socket"),
+            (["--workers", "2"], "--workers"),
+            (["--serve", "--stats"], "--stats"),
+            (["--serve", "--workers", "2"], "--workers"),
+            (["--parallel", "--retain-months", "1"], "--parallel"),
+            (["--retain-months", "-1"], "--retain-months"),
+        ):
+            with self.assertRaises(SystemExit) as context:
+                main(["input.txt", *options])
+            self.assertIn(message, str(context.exception.code))
+            self.assertIn("Error:", str(context.exception.code))
+
+        # Shard reader threads of a multi-input batch.
+        check_options(parse_args(["a.txt", "b.txt", "--workers", "2"]))
+
+    def test_columnar_input_skips_parsing(self):
+        expected = io.StringIO()
+        write_output(
+            process_transactions(read_transactions("input.txt")), expected
+        )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            validated = os.path.join(tmp_dir, "validated.col")
+            processed = os.path.join(tmp_dir, "processed.col")
+            output = os.path.join(tmp_dir, "output.txt")
+            main(
+                ["input.txt", "--validate-only", "--format", "columnar"]
+                + ["-o", validated]
+            )
+            main([validated, "--output", output])
+            with open(output, encoding="utf-8") as file:
+                self.assertEqual(file.read(), expected.getvalue())
+
+            main(["input.txt", "--format", "columnar", "-o", processed])
+            for options, message in (
+                ([processed], "processed"),
+                ([validated, "--mmap"], "--mmap"),
+                (["input.txt", "--validate-only"], "--format columnar"),
+            ):
+                with self.assertRaises(SystemExit) as context:
+                    main([*options, "--output", output])
+                self.assertIn(message, str(context.exception.code))
+
+    def test_bad_shards_are_reported_after_batch(self):
+        expected = io.StringIO()
+        write_output(
+            process_transactions(read_transactions("input.txt")), expected
+        )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "output.txt")
+            with self.assertRaises(SystemExit) as context:
+                main(["missing.txt", "input.txt", "--output", path])
+            self.assertEqual(context.exception.code, 1)
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual(file.read(), expected.getvalue())
+
+    def test_startup_skips_optional_modules(self):
+        code = (
+            "import sys, main; print(sorted({'argparse', 'asyncio', "
+            "'multiprocessing', 'json', 'decimal'} & set(sys.modules)))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
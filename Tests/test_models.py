@@ -0,0 +1,55 @@
+"""
+Unit tests for the compact transaction models.
+
+Tests:
+    - test_records_have_no_instance_dict: Ensures records are slotted and carry no per-instance `__dict__`.
+    - test_fields_are_interned: Ensures repeated field values share a single string object.
+    - test_equality_and_repr: Ensures records compare and print like the former dataclasses.
+    - test_date_ordinal: Ensures dates are exposed as integer ordinals.
+"""
+
+import datetime
+import pickle
+import unittest
+from models import Transaction, ProcessedTransaction, IgnoredTransaction
+
+
+class TestModels(unittest.TestCase):
+    def test_records_have_no_instance_dict(self):
+        for record in (
+            Transaction("2015-02-01", "S", "MR"),
+            ProcessedTransaction("2015-02-01", "S", "MR", 150, 50),
+            IgnoredTransaction("2015-02-29 CUSPS"),
+        ):
+            self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_fields_are_interned(self):
+        first = Transaction("".join(["2015-", "02-01"]), "S", "".join("MR"))
+        second = Transaction("".join(["2015-02", "-01"]), "S", "".join("MR"))
+        self.assertIs(first.date, second.date)
+        self.assertIs(first.provider, second.provider)
+
+    def test_equality_and_repr(self):
+        transaction = Transaction("2015-02-01", "S", "MR")
+        self.assertEqual(transaction, Transaction("2015-02-01", "S", "MR"))
+        self.assertNotEqual(transaction, Transaction("2015-02-01", "M", "MR"))
+        self.assertNotEqual(
+            transaction, ProcessedTransaction("2015-02-01", "S", "MR", 150, 50)
+        )
+        self.assertEqual(
+            repr(transaction),
+            "Transaction(date='2015-02-01', size='S', provider='MR', "
+            "account=None, transaction_id=None)",
+        )
+        self.assertEqual(pickle.loads(pickle.dumps(transaction)), transaction)
+
+    def test_date_ordinal(self):
+        expected = datetime.date(2015, 2, 1).toordinal()
+        self.assertEqual(
+            Transaction("2015-02-01", "S", "MR").ordinal, expected
+        )
+        self.assertEqual(Transaction("2015-2-1", "S", "MR").ordinal, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Unit tests for the buffered output backend.
+
+Tests:
+    - test_format_transaction: Ensures processed and ignored transactions are formatted as before.
+    - test_format_amount_from_cents: Ensures integer cents are converted to two-decimal amounts.
+    - test_write_output_to_stdout: Ensures the default sink is stdout and the output matches print() line for line.
+    - test_write_output_to_path_and_binary_buffer: Ensures file path and binary sinks receive the same bytes.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from models import ProcessedTransaction, IgnoredTransaction
+from output import format_amount, format_transaction
+from processor import process_transactions, write_output
+from validators import read_transactions
+
+
+def print_output(transactions):
+    """Reference implementation: one print() per transaction."""
+    for transaction in transactions:
+        if isinstance(transaction, IgnoredTransaction):
+            print(f"{transaction.data} Ignored")
+        else:
+            discount_display = (
+                f"{transaction.discount / 100:.2f}"
+                if isinstance(transaction.discount, int)
+                else "-"
+            )
+            print(
+                f"{transaction.date} {transaction.size} {transaction.provider} "
+                f"{transaction.price / 100:.2f} {discount_display}"
+            )
+
+
+class TestOutput(unittest.TestCase):
+    def setUp(self):
+        self.processed = process_transactions(read_transactions("input.txt"))
+        expected = io.StringIO()
+        with redirect_stdout(expected):
+            print_output(self.processed)
+        self.expected = expected.getvalue()
+
+    def test_format_transaction(self):
+        self.assertEqual(
+            format_transaction(
+                ProcessedTransaction("2015-02-17", "S", "MR", 190, 10)
+            ),
+            "2015-02-17 S MR 1.90 0.10",
+        )
+        self.assertEqual(
+            format_transaction(
+                ProcessedTransaction("2015-02-07", "L", "MR", 400, "-")
+            ),
+            "2015-02-07 L MR 4.00 -",
+        )
+        self.assertEqual(
+            format_transaction(
+                ProcessedTransaction("2015-02-07", "S", "MR", 150, 50, "acct")
+            ),
+            "2015-02-07 S MR acct 1.50 0.50",
+        )
+        self.assertEqual(
+            format_transaction(IgnoredTransaction("2015-02-29 CUSPS")),
+            "2015-02-29 CUSPS Ignored",
+        )
+
+    def test_format_amount_from_cents(self):
+        self.assertEqual(format_amount(0), "0.00")
+        self.assertEqual(format_amount(5), "0.05")
+        self.assertEqual(format_amount(690), "6.90")
+        self.assertEqual(format_amount(123456), "1234.56")
+        self.assertEqual(format_amount("-"), "-")
+
+    def test_write_output_to_stdout(self):
+        captured = io.StringIO()
+        with redirect_stdout(captured):
+            write_output(self.processed)
+        self.assertEqual(captured.getvalue(), self.expected)
+
+    def test_write_output_to_path_and_binary_buffer(self):
+        buffer = io.BytesIO()
+        write_output(self.processed, buffer)
+        self.assertEqual(buffer.getvalue(), self.expected.encode("utf-8"))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "output.txt")
+            write_output(self.processed, path)
+            with open(path, "rb") as file:
+                self.assertEqual(file.read(), self.expected.encode("utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,10 +6,18 @@ Tests:
     - test_process_ignored_transaction: Ensures that ignored transactions remain unchanged.
     - test_process_multiple_transactions: Ensures that multiple transactions are processed correctly.
     - test_process_with_invalid_data: Ensures that mixed valid and ignored transactions are processed properly.
+    - test_process_parallel_matches_serial: Ensures that per-month parallel processing matches serial processing.
+    - test_monthly_report_totals: Ensures monthly rollups add up revenue, discounts, counts and ignored lines per month.
+    - test_monthly_report_matches_output: Ensures the rollups equal totals recomputed from the processed transactions.
 """
 
 import unittest
-from processor import process_transactions
+from processor import (
+    MonthlyReport,
+    process_transactions,
+    process_transactions_parallel,
+)
+from validators import read_transactions
 from models import Transaction, ProcessedTransaction, IgnoredTransaction
 
 
@@ -47,3 +55,79 @@ class TestProcessor(unittest.TestCase):
         self.assertEqual(len(processed), 2)
         self.assertIsInstance(processed[0], ProcessedTransaction)
         self.assertIsInstance(processed[1], IgnoredTransaction)
+
+    def test_process_parallel_matches_serial(self):
+        transactions = read_transactions("input.txt") + [
+            Transaction(f"2016-{month:02d}-{day:02d}", size, provider)
+            for month in range(1, 13)
+            for day in range(1, 8)
+            for size, provider in (("S", "MR"), ("L", "LP"))
+        ]
+        transactions.insert(5, IgnoredTransaction("Invalid data"))
+        self.assertEqual(
+            process_transactions_parallel(transactions, max_workers=2),
+            process_transactions(transactions),
+        )
+
+    def test_monthly_report_totals(self):
+        report = MonthlyReport()
+        process_transactions(
+            [
+                Transaction("2015-02-01", "S", "MR"),
+                Transaction("2015-02-02", "S", "MR", "acme"),
+                IgnoredTransaction("2015-02-29 CUSPS"),
+                IgnoredTransaction(b"2015-13-01 S MR"),
+                Transaction("2015-03-01", "L", "LP"),
+            ],
+            report,
+        )
+
+        summary = report.summary()
+        self.assertEqual(
+            list(summary), ["2015-02", "acme 2015-02", "2015-03", "unknown"]
+        )
+        self.assertEqual(
+            summary["2015-02"],
+            {
+                "shipments": 1,
+                "revenue": 150,
+                "discount": 50,
+                "discount_limit": 1000,
+                "ignored": 1,
+                "counts": {"S MR": 1},
+            },
+        )
+        self.assertEqual(summary["acme 2015-02"]["discount"], 50)
+        self.assertEqual(summary["2015-03"]["revenue"], 690)
+        self.assertEqual(summary["unknown"]["ignored"], 1)
+        self.assertIn(
+            "2015-02: 1 shipments, revenue 1.50, discount 0.50 of 10.00",
+            report.format_report(),
+        )
+
+    def test_monthly_report_matches_output(self):
+        report = MonthlyReport()
+        processed = process_transactions(
+            read_transactions("input.txt"), report
+        )
+        shipments = [
+            t for t in processed if isinstance(t, ProcessedTransaction)
+        ]
+
+        summary = report.summary()
+        self.assertEqual(
+            sum(month["revenue"] for month in summary.values()),
+            sum(t.price for t in shipments),
+        )
+        self.assertEqual(
+            sum(month["discount"] for month in summary.values()),
+            sum(t.discount for t in shipments if t.discount != "-"),
+        )
+        self.assertEqual(
+            sum(sum(month["counts"].values()) for month in summary.values()),
+            len(shipments),
+        )
+        self.assertEqual(
+            sum(month["ignored"] for month in summary.values()),
+            len(processed) - len(shipments),
+        )
@@ -0,0 +1,110 @@
+"""
+Differential tests for the what-if scenario engine.
+
+Tests:
+    - test_scenarios_match_separate_runs: Ensures per-month totals of every scenario match a separate DiscountManager run with its catalog.
+    - test_report_lists_every_scenario: Ensures the report has a line per scenario and month and a total per scenario.
+    - test_unpriced_shipment_is_rejected: Ensures a scenario without a price for a shipment type in the input raises an error.
+"""
+
+import random
+import unittest
+from collections import defaultdict
+from catalog import PriceCatalog
+from discounts import DiscountManager
+from models import Transaction, ProcessedTransaction, IgnoredTransaction
+from processor import iter_processed_transactions
+from scenarios import ScenarioEngine, evaluate_scenarios
+from validators import read_transactions
+
+
+def separate_run(transactions, catalog):
+    """Per-month totals from a plain DiscountManager run."""
+    months = defaultdict(lambda: {"shipments": 0, "cost": 0, "discount": 0})
+    for transaction in iter_processed_transactions(
+        transactions, DiscountManager(catalog)
+    ):
+        if isinstance(transaction, ProcessedTransaction):
+            totals = months[transaction.date[:7]]
+            totals["shipments"] += 1
+            totals["cost"] += transaction.price
+            if transaction.discount != "-":
+                totals["discount"] += transaction.discount
+    return dict(months)
+
+
+class TestScenarios(unittest.TestCase):
+    def test_scenarios_match_separate_runs(self):
+        rng = random.Random(7)
+        scenarios = {
+            f"scenario-{number}": PriceCatalog(
+                {
+                    "LP": {
+                        "S": rng.randrange(100, 300),
+                        "M": rng.randrange(300, 600),
+                        "L": rng.randrange(500, 900),
+                    },
+                    "MR": {
+                        "S": rng.randrange(100, 300),
+                        "M": rng.randrange(200, 500),
+                        "L": rng.randrange(300, 700),
+                    },
+                },
+                rng.choice([0, 250, 1000, 3000]),
+            )
+            for number in range(6)
+        }
+        transactions = read_transactions("input.txt")
+        for day in sorted(rng.randrange(0, 150) for _ in range(1000)):
+            month, day = divmod(day, 28)
+            transactions.append(
+                Transaction(
+                    f"2016-{month + 1:02d}-{day + 1:02d}",
+                    rng.choice("SML"),
+                    rng.choice(["LP", "MR"]),
+                    rng.choice([None, "acme", "globex"]),
+                )
+            )
+        transactions.insert(100, IgnoredTransaction("2016-01-05 X"))
+
+        results = evaluate_scenarios(transactions, scenarios)
+        for name, catalog in scenarios.items():
+            self.assertEqual(
+                results[name], separate_run(transactions, catalog), name
+            )
+
+    def test_report_lists_every_scenario(self):
+        scenarios = {
+            "current": PriceCatalog(
+                {"LP": {"S": 150, "L": 690}, "MR": {"S": 200, "L": 400}}, 1000
+            ),
+            "cheap": PriceCatalog(
+                {"LP": {"S": 100, "L": 500}, "MR": {"S": 100, "L": 300}}, 500
+            ),
+        }
+        engine = ScenarioEngine(scenarios).evaluate(
+            [
+                Transaction("2015-02-01", "S", "MR"),
+                Transaction("2015-03-01", "L", "LP"),
+            ]
+        )
+        self.assertEqual(
+            engine.format_report().splitlines(),
+            [
+                "current 2015-02: 1 shipments, cost 1.50, discount 0.50",
+                "current 2015-03: 1 shipments, cost 6.90, discount 0.00",
+                "current total: cost 8.40, discount 0.50",
+                "cheap 2015-02: 1 shipments, cost 1.00, discount 0.00",
+                "cheap 2015-03: 1 shipments, cost 5.00, discount 0.00",
+                "cheap total: cost 6.00, discount 0.00",
+            ],
+        )
+
+    def test_unpriced_shipment_is_rejected(self):
+        engine = ScenarioEngine({"lp-only": PriceCatalog({"LP": {"S": 1}}, 0)})
+        with self.assertRaises(ValueError):
+            engine.add(Transaction("2015-02-01", "S", "MR"))
+
+
+if __name__ == "__main__":
+    unittest.main()
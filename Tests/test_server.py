@@ -0,0 +1,139 @@
+"""
+Tests for the asyncio pricing service, using local clients only.
+
+Tests:
+    - test_tcp_client_matches_batch_output: Ensures a TCP client receives the same lines the batch pipeline prints.
+    - test_concurrent_clients_share_monthly_limit: Ensures concurrent clients never exceed the shared monthly discount limit.
+    - test_unix_socket_client: Ensures the server also listens on a Unix socket.
+    - test_catalog_file_is_watched: Ensures a server started with a catalog file prices with the file's new contents once it changes.
+    - test_overlong_line_closes_connection: Ensures a line longer than READ_SIZE is not buffered and ends the connection.
+    - test_retain_months_evicts_past_months: Ensures a server started with retain_months drops the state of past months.
+"""
+
+import asyncio
+import io
+import json
+import os
+import socket
+import tempfile
+import unittest
+from catalog import DEFAULT_CATALOG, set_catalog
+from processor import process_transactions, write_output
+from server import READ_SIZE, start_server
+from validators import read_transactions
+
+
+async def send_lines(lines, host=None, port=None, path=None):
+    """Send lines to the server and return its whole answer."""
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write("".join(line + "\n" for line in lines).encode("utf-8"))
+    await writer.drain()
+    writer.write_eof()
+    answer = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return answer.decode("utf-8")
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server, self.pricing = await start_server()
+        self.host, self.port = self.server.sockets[0].getsockname()[:2]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_tcp_client_matches_batch_output(self):
+        with open("input.txt", encoding="utf-8") as file:
+            lines = file.read().splitlines()
+
+        expected = io.StringIO()
+        write_output(
+            process_transactions(read_transactions("input.txt")), expected
+        )
+
+        answer = await send_lines(lines, self.host, self.port)
+        self.assertEqual(answer, expected.getvalue())
+
+    async def test_concurrent_clients_share_monthly_limit(self):
+        answers = await asyncio.gather(
+            *(
+                send_lines(["2015-02-01 S MR"] * 5, self.host, self.port)
+                for _ in range(10)
+            )
+        )
+        lines = "".join(answers).splitlines()
+        self.assertEqual(len(lines), 50)
+        self.assertEqual(lines.count("2015-02-01 S MR 1.50 0.50"), 20)
+        self.assertEqual(lines.count("2015-02-01 S MR 2.00 -"), 30)
+        self.assertEqual(
+            self.pricing.discount_manager.tracking_data["2015-02"]["discount"],
+            1000,
+        )
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "requires Unix sockets")
+    async def test_unix_socket_client(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "pricing.sock")
+            server, _ = await start_server(path=path)
+            async with server:
+                answer = await send_lines(
+                    ["2015-02-01 S MR", "2015-02-29 CUSPS"], path=path
+                )
+        self.assertEqual(
+            answer, "2015-02-01 S MR 1.50 0.50\n2015-02-29 CUSPS Ignored\n"
+        )
+
+    async def test_catalog_file_is_watched(self):
+        self.addCleanup(set_catalog, DEFAULT_CATALOG)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "prices.json")
+            catalog = {
+                "monthly_discount_limit": "10.00",
+                "prices": {"MR": {"S": "2.00"}},
+            }
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(catalog, file)
+            server, pricing = await start_server(
+                catalog_path=path, poll_interval=0.01
+            )
+            host, port = server.sockets[0].getsockname()[:2]
+            async with server:
+                answer = await send_lines(["2015-02-01 S DPD"], host, port)
+                self.assertEqual(answer, "2015-02-01 S DPD Ignored\n")
+
+                catalog["prices"]["DPD"] = {"S": "1.20"}
+                with open(path, "w", encoding="utf-8") as file:
+                    json.dump(catalog, file)
+                os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+                await asyncio.sleep(0.05)
+                answer = await send_lines(["2015-02-01 S DPD"], host, port)
+                self.assertEqual(answer, "2015-02-01 S DPD 1.20 -\n")
+            pricing.watch_task.cancel()
+
+    async def test_overlong_line_closes_connection(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(b"2015-02-01 S MR\n" + b"x" * (READ_SIZE + 1))
+        await writer.drain()
+        answer = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        self.assertEqual(answer, b"2015-02-01 S MR 1.50 0.50\n")
+
+    async def test_retain_months_evicts_past_months(self):
+        server, pricing = await start_server(retain_months=0)
+        host, port = server.sockets[0].getsockname()[:2]
+        async with server:
+            await send_lines(
+                ["2015-02-01 S MR", "2015-03-01 S MR"], host, port
+            )
+        self.assertEqual(
+            list(pricing.discount_manager.tracking_data), ["2015-03"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests for the date-range query store.
+
+Tests:
+    - test_queries_match_brute_force: Ensures range queries and totals match filtering the processed transactions directly.
+    - test_store_reopens_from_write_output: Ensures a store written through write_output reopens with the same shipments.
+    - test_rejects_other_files: Ensures files that are not stores are rejected.
+"""
+
+import datetime
+import os
+import random
+import tempfile
+import unittest
+from models import Transaction, ProcessedTransaction
+from processor import process_transactions, write_output
+from store import TransactionStore, write_store
+from validators import read_transactions
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "shipments.idx")
+
+    def test_queries_match_brute_force(self):
+        rng = random.Random(3)
+        first = datetime.date(2015, 1, 1)
+        transactions = [
+            Transaction(
+                (first + datetime.timedelta(days=day)).isoformat(),
+                rng.choice("SML"),
+                rng.choice(["LP", "MR"]),
+                rng.choice([None, "acme"]),
+            )
+            for day in sorted(rng.randrange(0, 90) for _ in range(500))
+        ]
+        processed = process_transactions(transactions)
+        write_store(processed, self.path)
+
+        with TransactionStore(self.path) as store:
+            self.assertEqual(len(store), len(processed))
+            for _ in range(50):
+                start, end = sorted(rng.sample(range(-5, 95), 2))
+                start = (first + datetime.timedelta(days=start)).isoformat()
+                end = (first + datetime.timedelta(days=end)).isoformat()
+                provider = rng.choice([None, "LP", "MR", "XX"])
+                size = rng.choice([None, "S", "M", "L"])
+
+                expected = [
+                    t
+                    for t in processed
+                    if start <= t.date <= end
+                    and provider in (None, t.provider)
+                    and size in (None, t.size)
+                ]
+                query = (start, end, provider, size)
+                self.assertEqual(list(store.query(*query)), expected)
+                self.assertEqual(
+                    store.totals(*query),
+                    {
+                        "shipments": len(expected),
+                        "revenue": sum(t.price for t in expected),
+                        "discount": sum(
+                            t.discount for t in expected if t.discount != "-"
+                        ),
+                    },
+                )
+            self.assertEqual(list(store.query()), processed)
+
+    def test_store_reopens_from_write_output(self):
+        processed = process_transactions(read_transactions("input.txt"))
+        write_output(processed, self.path, fmt="store")
+
+        shipments = [
+            t for t in processed if isinstance(t, ProcessedTransaction)
+        ]
+        with TransactionStore(self.path) as store:
+            self.assertEqual(list(store.query()), shipments)
+            self.assertEqual(
+                list(store.rows("2015-02-05", "2015-02-06", provider="LP")),
+                [3, 5],
+            )
+
+    def test_rejects_other_files(self):
+        with self.assertRaises(ValueError):
+            TransactionStore("input.txt")
+
+
+if __name__ == "__main__":
+    unittest.main()
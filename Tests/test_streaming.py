@@ -0,0 +1,79 @@
+"""
+Tests for the streaming read -> validate -> discount -> write pipeline.
+
+Tests:
+    - test_stream_matches_list_pipeline: Ensures the streaming pipeline yields the same results as the list-based one.
+    - test_stream_checks_file_eagerly: Ensures file errors are raised on the call, not on first iteration.
+    - test_stream_peak_memory_is_bounded: Ensures peak memory stays flat on a large synthetic file.
+"""
+
+import os
+import tempfile
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+from processor import (
+    iter_processed_transactions,
+    process_transactions,
+    write_output,
+)
+from validators import iter_transactions, read_transactions
+
+SAMPLE_LINES = [
+    "2015-02-01 S MR",
+    "2015-02-03 L LP",
+    "2015-02-29 CUSPS",
+    "2015-02-06 L LP",
+    "2015-02-09 L LP",
+    "2015-03-01 S MR",
+]
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def write_file(self, name, lines):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            for line in lines:
+                file.write(line + "\n")
+        return path
+
+    def test_stream_matches_list_pipeline(self):
+        path = self.write_file("sample.txt", SAMPLE_LINES)
+        expected = process_transactions(read_transactions(path))
+        streamed = list(iter_processed_transactions(iter_transactions(path)))
+        self.assertEqual(streamed, expected)
+
+    def test_stream_checks_file_eagerly(self):
+        with self.assertRaises(FileNotFoundError):
+            iter_transactions(os.path.join(self.tmp_dir.name, "missing.txt"))
+        with self.assertRaises(ValueError):
+            iter_transactions(self.write_file("empty.txt", []))
+
+    def test_stream_peak_memory_is_bounded(self):
+        line_count = 50_000
+        lines = (
+            SAMPLE_LINES[i % len(SAMPLE_LINES)] for i in range(line_count)
+        )
+        path = self.write_file("large.txt", lines)
+
+        tracemalloc.start()
+        try:
+            with open(os.devnull, "w", encoding="utf-8") as sink:
+                with redirect_stdout(sink):
+                    write_output(
+                        iter_processed_transactions(iter_transactions(path))
+                    )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # A fully materialised list of 50k transactions needs several MiB.
+        self.assertLess(peak, 1024 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,14 +4,45 @@ Unit tests for the transaction validation functions.
 Tests:
     - test_valid_transaction: Ensures that a valid transaction string is parsed correctly.
     - test_invalid_transaction: Ensures that an invalid transaction string returns an `IgnoredTransaction`.
+    - test_transaction_with_account: Ensures that an optional fourth field is read as the account id.
+    - test_transaction_with_id: Ensures that a trailing "#id" token is read as the transaction id by both readers.
+    - test_invalid_leap_day: Ensures that a non-existent leap day is rejected.
+    - test_date_validation_matches_strptime: Ensures the fast date check accepts exactly what `strptime` accepts.
+    - test_mmap_reader_matches_text_reader: Ensures the memory-mapped reader yields the same transactions as the text reader, whatever the block size.
+    - test_mmap_reader_rejects_empty_file: Ensures the memory-mapped reader reports empty files like the text reader.
+    - test_validation_cache_hits_repeated_lines: Ensures repeated lines are served from the cache with the same results.
+    - test_validation_cache_follows_catalog: Ensures cached results are not reused after a new catalog is published.
+    - test_validation_cache_size_is_configurable: Ensures the cache is bounded and can be disabled.
 """
 
+import datetime
+import itertools
+import os
+import tempfile
 import unittest
-from validators import validate_transaction
+from unittest import mock
+import catalog
+import validators
+from catalog import PriceCatalog
+from output import format_transaction
+from processor import process_transactions
+from validators import (
+    configure_validation_cache,
+    is_valid_date,
+    iter_transactions,
+    iter_transactions_mmap,
+    validate_transaction,
+    validate_transaction_bytes,
+    validation_cache_info,
+)
 from models import Transaction, IgnoredTransaction
 
 
 class TestValidators(unittest.TestCase):
+    def setUp(self):
+        configure_validation_cache()
+        self.addCleanup(configure_validation_cache)
+
     def test_valid_transaction(self):
         valid_line = "2025-03-09 S LP"
         transaction = validate_transaction(valid_line)
@@ -24,3 +55,148 @@ class TestValidators(unittest.TestCase):
         invalid_line = "2025-03-09 XL LP"
         transaction = validate_transaction(invalid_line)
         self.assertIsInstance(transaction, IgnoredTransaction)
+
+    def test_transaction_with_account(self):
+        transaction = validate_transaction("2025-03-09 S LP acct-42")
+        self.assertIsInstance(transaction, Transaction)
+        self.assertEqual(transaction.account, "acct-42")
+        self.assertIsNone(validate_transaction("2025-03-09 S LP").account)
+        self.assertIsInstance(
+            validate_transaction("2025-03-09 S LP acct-42 extra"),
+            IgnoredTransaction,
+        )
+
+    def test_transaction_with_id(self):
+        for line in ("2015-02-01 S MR #t-1", "2015-02-01 S MR acme #t-1"):
+            transaction = validate_transaction(line)
+            self.assertEqual(transaction.transaction_id, "t-1")
+            self.assertEqual(
+                validate_transaction_bytes(line.encode() + b" "), transaction
+            )
+        self.assertIsNone(
+            validate_transaction("2015-02-01 S MR a#b").transaction_id
+        )
+        for line in ("2015-02-01 S MR #", "2015-02-01 S MR #t-1 acme"):
+            self.assertIsInstance(
+                validate_transaction(line), IgnoredTransaction
+            )
+
+    def test_invalid_leap_day(self):
+        transaction = validate_transaction("2015-02-29 S MR")
+        self.assertIsInstance(transaction, IgnoredTransaction)
+        self.assertIsInstance(
+            validate_transaction("2016-02-29 S MR"), Transaction
+        )
+
+    def test_date_validation_matches_strptime(self):
+        def strptime_valid(date):
+            try:
+                datetime.datetime.strptime(date, "%Y-%m-%d")
+            except ValueError:
+                return False
+            return True
+
+        years = [
+            "0000",
+            "0001",
+            "1900",
+            "2000",
+            "2015",
+            "2016",
+            "2100",
+            "9999",
+        ]
+        months = ["00", "01", "02", "04", "12", "13", "2", "1a"]
+        days = ["00", "01", "28", "29", "30", "31", "32", "1", " 1", "x1"]
+        for year, month, day in itertools.product(years, months, days):
+            date = f"{year}-{month}-{day}"
+            self.assertEqual(is_valid_date(date), strptime_valid(date), date)
+
+        for date in ["2015/02/01", "2015-02-01x", "\uff12015-02-01", ""]:
+            self.assertEqual(is_valid_date(date), strptime_valid(date), date)
+
+    def test_mmap_reader_matches_text_reader(self):
+        content = (
+            b"2015-02-01 S MR\n"
+            b"  2015-02-02\tL LP  \n"
+            b"2015-02-29 CUSPS\n"
+            b"\n"
+            b"2015-02-03 S MR\r\n"
+            b"2015-02-04 M LP\r2015-02-05 S LP\n"
+            b"2015-02-06\x1cS MR\n"
+            b"2015-02-07 S \xc3\x9cMR\n"
+            b"2015-02-08 S MR #t1\n"
+            b"2015-02-08 S MR #t1 \n"
+            b"2015-2-8 L LP"
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "input.txt")
+            for data in (content, content + b"\n2015-02-10 S MR\n"):
+                with open(path, "wb") as file:
+                    file.write(data)
+                expected = process_transactions(iter_transactions(path))
+                for block_size in (1, 16, 40, validators.MMAP_BLOCK_SIZE):
+                    with mock.patch.object(
+                        validators, "MMAP_BLOCK_SIZE", block_size
+                    ):
+                        transactions = list(iter_transactions_mmap(path))
+                    actual = process_transactions(transactions)
+                    self.assertEqual(
+                        [format_transaction(t) for t in actual],
+                        [format_transaction(t) for t in expected],
+                    )
+                    self.assertEqual(actual[2].data, b"2015-02-29 CUSPS")
+                    self.assertEqual(
+                        [t.transaction_id for t in transactions[9:11]],
+                        ["t1", "t1"],
+                    )
+        self.assertEqual(len(actual), 13)
+
+    def test_mmap_reader_rejects_empty_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "input.txt")
+            open(path, "wb").close()
+            with self.assertRaises(ValueError):
+                iter_transactions_mmap(path)
+
+    def test_validation_cache_hits_repeated_lines(self):
+        lines = ["2015-02-01 S MR", "2015-02-01 S MR", "2015-02-01 X MR"] * 3
+        results = [validate_transaction(line) for line in lines]
+        results.append(validate_transaction_bytes(b"2015-02-01 S MR"))
+
+        self.assertEqual(results[0], Transaction("2015-02-01", "S", "MR"))
+        self.assertEqual(results[1], results[0])
+        self.assertIsNot(results[1], results[0])
+        self.assertEqual(results[2], IgnoredTransaction("2015-02-01 X MR"))
+        self.assertEqual(results[-1], results[0])
+
+        info = validation_cache_info()
+        self.assertEqual(info["misses"], 3)
+        self.assertEqual(info["hits"], 7)
+        self.assertAlmostEqual(info["hit_rate"], 0.7)
+        self.assertEqual(info["size"], 3)
+
+    def test_validation_cache_follows_catalog(self):
+        self.addCleanup(catalog.set_catalog, catalog.DEFAULT_CATALOG)
+        line = "2015-02-01 S XX"
+        self.assertIsInstance(validate_transaction(line), IgnoredTransaction)
+
+        catalog.set_catalog(PriceCatalog({"XX": {"S": 100}}, 1000))
+        self.assertEqual(
+            validate_transaction(line), Transaction("2015-02-01", "S", "XX")
+        )
+
+    def test_validation_cache_size_is_configurable(self):
+        configure_validation_cache(2)
+        for day in range(1, 6):
+            validate_transaction(f"2015-02-0{day} S MR")
+        self.assertEqual(validation_cache_info()["size"], 2)
+
+        configure_validation_cache(0)
+        validate_transaction("2015-02-01 S MR")
+        validate_transaction("2015-02-01 S MR")
+        info = validation_cache_info()
+        self.assertEqual((info["hits"], info["size"]), (0, 0))
+
+        with self.assertRaises(ValueError):
+            configure_validation_cache(-1)
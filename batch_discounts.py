@@ -0,0 +1,329 @@
+"""
+Columnar batch discount engine.
+
+This module prices whole batches of shipments at once. Transactions are
+converted to columns (month code, size code, provider code) and every
+discount rule is expressed as a column operation:
+
+    - base prices come from a flat lookup table indexed by size/provider code,
+    - the per-month L/LP shipment number is a grouped cumulative count,
+    - the monthly discount cap is a grouped cumulative sum, clipped at the
+      catalog's monthly discount limit.
+
+Results are identical to running DiscountManager over the same transactions.
+
+With NumPy installed, the column operations run vectorized: grouped running
+totals are one stable sort by group plus one cumulative sum, instead of a
+Python loop and a dict lookup per row. Without it, the same operations run
+as pure-Python list passes, which are slower than DiscountManager. Even with
+NumPy, process_transactions_batch spends most of its time converting
+transaction objects to columns and back, so the engine pays off for callers
+that already hold columns (see Benchmarks/bench_batch.py).
+
+Imports:
+    - numpy (optional): Vectorized column operations.
+    - array.array: Compact typed storage for the columns.
+    - itertools.repeat: Fills the account column of batches without accounts.
+    - operator.attrgetter: Extracts transaction fields column by column.
+    - typing.Iterable, List, Tuple, Union: Defines type hints.
+    - models.Transaction, ProcessedTransaction, IgnoredTransaction: Represents transactions.
+    - catalog.PriceCatalog, get_catalog: Prices, limits and size/provider codes.
+"""
+
+from array import array
+from itertools import repeat
+from operator import attrgetter
+from typing import Iterable, List, Tuple, Union
+from models import Transaction, ProcessedTransaction, IgnoredTransaction
+from catalog import PriceCatalog, get_catalog
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def to_columns(
+    transactions: Iterable[Transaction], catalog: PriceCatalog = None
+) -> Tuple[array, array, array]:
+    """Convert transactions to month code, size code and provider code columns.
+
+    Args:
+        transactions (Iterable[Transaction]): Valid transactions.
+        catalog (PriceCatalog, optional): Source of the size and provider
+            codes. Defaults to the published catalog.
+
+    Returns:
+        Tuple[array, array, array]: Month codes (see month_keys), size codes
+        and provider codes.
+    """
+    transactions = list(transactions)
+    return _encode_fields(*_fields(transactions), catalog or get_catalog())
+
+
+def _fields(transactions: List[Transaction]) -> Tuple[list, list, list]:
+    """Extract the date, size and provider of every transaction."""
+    return (
+        list(map(attrgetter("date"), transactions)),
+        list(map(attrgetter("size"), transactions)),
+        list(map(attrgetter("provider"), transactions)),
+    )
+
+
+def _encode_fields(
+    dates: list, sizes: list, providers: list, catalog: PriceCatalog
+) -> Tuple[array, array, array]:
+    """Encode field lists as the columns returned by to_columns."""
+    return (
+        month_keys(dates),
+        array("B", map(catalog.size_codes.__getitem__, sizes)),
+        array("B", map(catalog.provider_codes.__getitem__, providers)),
+    )
+
+
+def month_keys(dates: Iterable[str]) -> array:
+    """Map dates to a month code, numbered from 0 in order of appearance.
+
+    Rows share a code exactly when their ``date[:7]`` tokens are equal, the
+    same month key DiscountManager tracks, so ``2015-2-1`` and
+    ``2015-02-05`` fall into different months in both engines.
+
+    Args:
+        dates (Iterable[str]): The date of every row.
+
+    Returns:
+        array: The month code of every row.
+    """
+    dates = list(dates)
+    months = {}
+    # Dates repeat heavily: slice each distinct one once.
+    code_of = {
+        day: months.setdefault(day[:7], len(months))
+        for day in dict.fromkeys(dates)
+    }
+    return array("l", map(code_of.__getitem__, dates))
+
+
+def grouped_cumsum(groups: List[int], values: Iterable) -> List:
+    """Running total of values within each group, in row order.
+
+    Args:
+        groups (List[int]): The group key of every row.
+        values (Iterable): The value of every row.
+
+    Returns:
+        List: The inclusive running total of every row within its group.
+    """
+    totals = {}
+    result = []
+    for group, value in zip(groups, values):
+        total = totals.get(group, 0) + value
+        totals[group] = total
+        result.append(total)
+    return result
+
+
+def apply_discounts_batch(
+    months: array,
+    sizes: array,
+    providers: array,
+    catalog: PriceCatalog = None,
+    accounts: List[str] = None,
+) -> Tuple[array, array]:
+    """Price a batch of shipments given as columns.
+
+    Rows must be in processing order, as the L/LP count and the monthly cap
+    depend on it.
+
+    Args:
+        months (array): Month codes (see month_keys).
+        sizes (array): Size codes (see PriceCatalog.size_codes).
+        providers (array): Provider codes (see PriceCatalog.provider_codes).
+        catalog (PriceCatalog, optional): Prices and limits to use. Defaults
+            to the published catalog.
+        accounts (List[str], optional): Account id of every row, or None;
+            tracking is then grouped by (account, month).
+
+    Returns:
+        Tuple[array, array]: Final prices and discounts in cents (NumPy
+        int64 arrays if NumPy is installed); a discount of 0 means no
+        discount was applied.
+    """
+    catalog = catalog or get_catalog()
+    if np is not None:
+        return _apply_discounts_numpy(
+            months, sizes, providers, catalog, accounts
+        )
+    width = len(catalog.sizes)
+    # Flat price table indexed by provider_code * width + size_code.
+    price_table = [
+        catalog.price_index.get((size, provider))
+        for provider in catalog.providers
+        for size in catalog.sizes
+    ]
+    small = catalog.size_codes.get("S")
+    large = catalog.size_codes.get("L")
+    lp = catalog.provider_codes.get("LP")
+    lowest_small_price = catalog.lowest_price.get("S")
+    monthly_limit = catalog.monthly_limit
+
+    base = [price_table[p * width + s] for p, s in zip(providers, sizes)]
+    if accounts is not None:
+        months = list(zip(accounts, months))
+
+    is_large_lp = [s == large and p == lp for s, p in zip(sizes, providers)]
+    large_lp_count = grouped_cumsum(months, is_large_lp)
+
+    requested = [
+        (
+            price - lowest_small_price
+            if size == small
+            else price if large and count == 3 else 0
+        )
+        for price, size, large, count in zip(
+            base, sizes, is_large_lp, large_lp_count
+        )
+    ]
+
+    capped = [
+        min(total, monthly_limit)
+        for total in grouped_cumsum(months, requested)
+    ]
+    previous = {}
+    prices, discounts = array("l"), array("l")
+    for month, price, total in zip(months, base, capped):
+        granted = total - previous.get(month, 0)
+        previous[month] = total
+        prices.append(price - granted)
+        discounts.append(granted)
+
+    return prices, discounts
+
+
+def _grouped_cumsum_numpy(order, starts, values):
+    """Running total of values within each group, in row order.
+
+    Args:
+        order: Row numbers sorted by group, stably.
+        starts: Boolean mask of the sorted rows that start a group.
+        values: The non-negative value of every row.
+
+    Returns:
+        The inclusive running total of every row within its group.
+    """
+    totals = np.cumsum(values[order])
+    # Subtract, from every row, the total of all groups before its own.
+    before = np.where(starts, totals - values[order], 0)
+    totals -= np.maximum.accumulate(before)
+    result = np.empty_like(totals)
+    result[order] = totals
+    return result
+
+
+def _apply_discounts_numpy(months, sizes, providers, catalog, accounts):
+    """apply_discounts_batch with NumPy column operations."""
+    width = len(catalog.sizes)
+    price_table = np.array(
+        [
+            catalog.price_index.get((size, provider), 0)
+            for provider in catalog.providers
+            for size in catalog.sizes
+        ],
+        dtype=np.int64,
+    )
+    sizes = np.frombuffer(sizes, dtype=np.uint8).astype(np.intp)
+    providers = np.frombuffer(providers, dtype=np.uint8).astype(np.intp)
+    base = price_table[providers * width + sizes]
+
+    groups = np.frombuffer(months, dtype=months.typecode).astype(np.int64)
+    if accounts is not None:
+        codes = {}
+        account_codes = np.fromiter(
+            (codes.setdefault(account, len(codes)) for account in accounts),
+            dtype=np.int64,
+            count=len(accounts),
+        )
+        groups = account_codes * (groups.max(initial=0) + 1) + groups
+
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = sorted_groups[1:] != sorted_groups[:-1]
+
+    requested = np.zeros(len(base), dtype=np.int64)
+    small = catalog.size_codes.get("S")
+    if small is not None:
+        is_small = sizes == small
+        requested[is_small] = base[is_small] - catalog.lowest_price["S"]
+    large = catalog.size_codes.get("L")
+    lp = catalog.provider_codes.get("LP")
+    if large is not None and lp is not None:
+        is_large_lp = (sizes == large) & (providers == lp)
+        count = _grouped_cumsum_numpy(
+            order, starts, is_large_lp.astype(np.int64)
+        )
+        third = is_large_lp & (count == 3)
+        requested[third] = base[third]
+
+    capped = np.minimum(
+        _grouped_cumsum_numpy(order, starts, requested), catalog.monthly_limit
+    )
+    # Discount granted = capped running total minus the previous row's.
+    sorted_capped = capped[order]
+    previous = np.zeros_like(sorted_capped)
+    previous[1:] = sorted_capped[:-1]
+    previous[starts] = 0
+    discounts = np.empty_like(capped)
+    discounts[order] = sorted_capped - previous
+    return base - discounts, discounts
+
+
+def process_transactions_batch(
+    transactions: List[Union[Transaction, IgnoredTransaction]],
+    catalog: PriceCatalog = None,
+) -> List[Union[ProcessedTransaction, IgnoredTransaction]]:
+    """Process a list of transactions with the columnar batch engine.
+
+    Produces the same result as processor.process_transactions.
+
+    Args:
+        transactions (List[Union[Transaction, IgnoredTransaction]]):
+            A list of transactions to process.
+        catalog (PriceCatalog, optional): Prices and limits to use. Defaults
+            to the published catalog.
+
+    Returns:
+        List[Union[ProcessedTransaction, IgnoredTransaction]]:
+            A list of processed transactions, including ignored entries.
+    """
+    valid = [t for t in transactions if not isinstance(t, IgnoredTransaction)]
+    catalog = catalog or get_catalog()
+    accounts = list(map(attrgetter("account"), valid))
+    if accounts.count(None) == len(accounts):
+        accounts = None
+    fields = _fields(valid)
+    prices, discounts = apply_discounts_batch(
+        *_encode_fields(*fields, catalog), catalog, accounts
+    )
+
+    processed = list(
+        map(
+            ProcessedTransaction,
+            *fields,
+            prices.tolist(),
+            [discount or "-" for discount in discounts.tolist()],
+            accounts or repeat(None),
+        )
+    )
+    if len(valid) == len(transactions):
+        return processed
+
+    rows = iter(processed)
+    return [
+        (
+            transaction
+            if isinstance(transaction, IgnoredTransaction)
+            else next(rows)
+        )
+        for transaction in transactions
+    ]
@@ -0,0 +1,230 @@
+"""
+Price catalog for shipment providers and package sizes.
+
+The catalog holds providers, sizes, prices and the monthly discount limit,
+and precomputes everything the hot path needs: an O(1) price index keyed by
+(size, provider), the valid size and provider sets used by validation, the
+lowest price per size used by SmallPackageDiscount, and stable integer codes
+for sizes and providers used by the columnar formats.
+
+Catalogs are immutable. Loading a new one builds it completely before it is
+published with a single reference assignment, so hot reload never exposes a
+half-built catalog and never blocks running work: a DiscountManager keeps
+the catalog it was built with until it is refreshed.
+
+Catalog files are JSON, with amounts in decimal currency units:
+
+    {
+        "monthly_discount_limit": "10.00",
+        "prices": {"LP": {"S": "1.50", "M": "4.90", "L": "6.90"}}
+    }
+
+Imports:
+    - json: Parses catalog files (imported on first use).
+    - os: Reads file modification times for hot reload.
+    - decimal.Decimal: Converts decimal amounts to integer cents exactly
+    (imported on first use).
+"""
+
+import os
+
+# Default shipment pricing, in integer cents
+PRICES = {
+    "LP": {"S": 150, "M": 490, "L": 690},
+    "MR": {"S": 200, "M": 300, "L": 400},
+}
+
+MONTHLY_DISCOUNT_LIMIT = 1000  # Monthly limit for discounts, in cents
+
+
+class PriceCatalog:
+    """An immutable, precomputed price index."""
+
+    def __init__(self, prices: dict, monthly_limit: int):
+        """Build the catalog and all derived lookups.
+
+        Args:
+            prices (dict): provider -> size -> price in cents.
+            monthly_limit (int): Monthly discount limit in cents.
+        """
+        self.prices = {
+            provider: dict(sizes) for provider, sizes in prices.items()
+        }
+        self.monthly_limit = monthly_limit
+
+        self.providers = tuple(self.prices)
+        self.sizes = tuple(
+            dict.fromkeys(
+                size for sizes in self.prices.values() for size in sizes
+            )
+        )
+        self.provider_codes = {
+            p: code for code, p in enumerate(self.providers)
+        }
+        self.size_codes = {size: code for code, size in enumerate(self.sizes)}
+        self.valid_providers = frozenset(self.providers)
+        self.valid_sizes = frozenset(self.sizes)
+        self.valid_provider_bytes = frozenset(
+            p.encode() for p in self.providers
+        )
+        self.valid_size_bytes = frozenset(s.encode() for s in self.sizes)
+
+        self.price_index = {
+            (size, provider): price
+            for provider, sizes in self.prices.items()
+            for size, price in sizes.items()
+        }
+        self.lowest_price = {}
+        for (size, _), price in self.price_index.items():
+            self.lowest_price[size] = min(
+                price, self.lowest_price.get(size, price)
+            )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PriceCatalog":
+        """Build a catalog from parsed catalog file contents.
+
+        Args:
+            data (dict): A dict with "prices" and "monthly_discount_limit",
+                amounts in decimal currency units.
+
+        Returns:
+            PriceCatalog: The catalog.
+
+        Raises:
+            ValueError: If the data is incomplete or an amount is not a whole
+                number of cents.
+        """
+        try:
+            prices = {
+                provider: {
+                    size: to_cents(price) for size, price in sizes.items()
+                }
+                for provider, sizes in data["prices"].items()
+            }
+            monthly_limit = to_cents(data["monthly_discount_limit"])
+        except (KeyError, AttributeError, TypeError) as error:
+            raise ValueError(
+                f"Error: Invalid price catalog: {error!r}"
+            ) from error
+
+        if not prices:
+            raise ValueError("Error: Invalid price catalog: no providers.")
+        return cls(prices, monthly_limit)
+
+    def __getstate__(self):
+        return self.prices, self.monthly_limit
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+
+def to_cents(amount) -> int:
+    """Convert a decimal currency amount to integer cents.
+
+    Args:
+        amount: The amount, as a number or a string such as "1.50".
+
+    Returns:
+        int: The amount in cents.
+
+    Raises:
+        ValueError: If the amount is negative or has fractional cents.
+    """
+    from decimal import Decimal
+
+    cents = Decimal(str(amount)) * 100
+    if cents != cents.to_integral_value() or cents < 0:
+        raise ValueError(f"Error: Invalid amount '{amount}' in price catalog.")
+    return int(cents)
+
+
+DEFAULT_CATALOG = PriceCatalog(PRICES, MONTHLY_DISCOUNT_LIMIT)
+
+ACTIVE = DEFAULT_CATALOG  # The published catalog; replaced atomically
+
+
+def get_catalog() -> PriceCatalog:
+    """Return the currently published catalog."""
+    return ACTIVE
+
+
+def set_catalog(catalog: PriceCatalog):
+    """Publish a catalog for validation and newly built DiscountManagers."""
+    global ACTIVE
+    ACTIVE = catalog
+
+
+def load_catalog(path: str) -> PriceCatalog:
+    """Read a catalog file without publishing it.
+
+    Args:
+        path (str): The JSON catalog file.
+
+    Returns:
+        PriceCatalog: The catalog.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file is not a valid catalog.
+    """
+    import json
+
+    with open(path, encoding="utf-8") as file:
+        try:
+            data = json.load(file)
+        except json.JSONDecodeError as error:
+            raise ValueError(
+                f"Error: The price catalog '{path}' is not valid JSON."
+            ) from error
+    return PriceCatalog.from_dict(data)
+
+
+def reload_catalog(path: str) -> PriceCatalog:
+    """Load a catalog file and publish it.
+
+    The previous catalog stays published if loading fails.
+
+    Args:
+        path (str): The JSON catalog file.
+
+    Returns:
+        PriceCatalog: The newly published catalog.
+    """
+    catalog = load_catalog(path)
+    set_catalog(catalog)
+    return catalog
+
+
+class CatalogWatcher:
+    """Reloads a catalog file whenever its modification time changes."""
+
+    def __init__(self, path: str):
+        """Load and publish the catalog file.
+
+        Args:
+            path (str): The JSON catalog file.
+        """
+        self.path = path
+        self.mtime = os.stat(path).st_mtime_ns
+        reload_catalog(path)
+
+    def poll(self) -> bool:
+        """Reload the catalog if the file changed since the last load.
+
+        A file that fails to load is not retried until it changes again.
+
+        Returns:
+            bool: True if a new catalog was published.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the changed file is not a valid catalog; the
+                previous catalog stays published.
+        """
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        reload_catalog(self.path)
+        return True
@@ -0,0 +1,171 @@
+"""
+Incremental processing of append-only input files.
+
+A checkpoint records how far into the input file the previous run got (a
+byte offset) together with the per-month discount state of its
+DiscountManager. The next run restores that state and only reads the lines
+appended since, so each run costs O(new lines) instead of O(month so far).
+
+With deduplication, the index of transaction ids already seen is saved in
+the checkpoint too, so a batch redelivered on a later day is still dropped.
+
+A last line without a trailing newline may still be being written, so it is
+left for the next run unless the run is final (the file is complete).
+
+Imports:
+    - json: Serializes checkpoints.
+    - os: Checks file sizes and replaces checkpoints atomically.
+    - typing.Iterator, Tuple, Union: Defines type hints.
+    - models.Transaction, models.IgnoredTransaction: Represents transactions.
+    - discounts.DiscountManager: Holds the per-month discount state.
+    - dedup.SeenIndex, deduplicate: Drops redelivered transactions.
+    - processor.iter_processed_transactions, write_output: Processing pipeline.
+    - validators.check_input_file, validate_raw_line: Input checks and validation.
+"""
+
+import json
+import os
+from typing import Iterator, Tuple, Union
+from models import Transaction, IgnoredTransaction
+from discounts import DiscountManager
+from dedup import SeenIndex, deduplicate
+from processor import iter_processed_transactions, write_output
+from validators import check_input_file, validate_raw_line
+
+
+class AppendedLines:
+    """Iterates over the complete lines appended to a file after an offset.
+
+    A trailing line without a newline may still be being written; it is left
+    for the next run unless ``final`` is set. After iteration, ``offset``
+    points just past the last line that was consumed and ``deferred`` is the
+    size of the trailing line that was left, if any.
+    """
+
+    def __init__(self, file_name: str, offset: int = 0, final: bool = False):
+        """Initialize the reader.
+
+        Args:
+            file_name (str): The input file.
+            offset (int): Byte offset of the first unread line.
+            final (bool): Whether the file is complete, so a trailing line
+                without a newline is consumed too.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file is not a .txt file, is empty, or is
+                shorter than the offset (truncated or rotated).
+        """
+        check_input_file(file_name)
+        if os.path.getsize(file_name) < offset:
+            raise ValueError(
+                f"Error: The file '{file_name}' is shorter than the checkpoint "
+                f"offset {offset}; was it truncated or replaced?"
+            )
+        self.file_name = file_name
+        self.offset = offset
+        self.final = final
+        self.deferred = 0
+
+    def __iter__(self) -> Iterator[Union[Transaction, IgnoredTransaction]]:
+        with open(self.file_name, "rb") as file:
+            file.seek(self.offset)
+            for line in file:
+                complete = line.endswith(b"\n")
+                if not complete and not self.final:
+                    self.deferred = len(line)
+                    break
+                self.offset += len(line)
+                yield from validate_raw_line(line[:-1] if complete else line)
+
+
+def load_checkpoint(path: str) -> Tuple[dict, int, dict]:
+    """Load a checkpoint written by save_checkpoint.
+
+    Args:
+        path (str): The checkpoint file.
+
+    Returns:
+        Tuple[dict, int, dict]: The DiscountManager snapshot, the input
+        offset and the SeenIndex snapshot (None if it was not saved). A
+        missing checkpoint yields an empty state at offset 0.
+    """
+    if not os.path.isfile(path):
+        return {}, 0, None
+
+    with open(path, encoding="utf-8") as file:
+        checkpoint = json.load(file)
+    return checkpoint["months"], checkpoint["offset"], checkpoint.get("seen")
+
+
+def save_checkpoint(
+    path: str,
+    discount_manager: DiscountManager,
+    offset: int,
+    seen_index: SeenIndex = None,
+):
+    """Atomically write the discount state and input offset to a checkpoint.
+
+    Args:
+        path (str): The checkpoint file.
+        discount_manager (DiscountManager): The manager to snapshot.
+        offset (int): Byte offset of the first unread input line.
+        seen_index (SeenIndex, optional): Deduplication index to save; it
+            must use stable hashes.
+    """
+    checkpoint = {"offset": offset, "months": discount_manager.snapshot()}
+    if seen_index is not None:
+        checkpoint["seen"] = seen_index.snapshot()
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(checkpoint, file, separators=(",", ":"))
+    os.replace(temp_path, path)
+
+
+def process_incremental(
+    file_name: str,
+    checkpoint_path: str,
+    sink=None,
+    final: bool = False,
+    dedup: bool = False,
+    retain_months: int = None,
+) -> int:
+    """Process only the lines appended since the last checkpoint.
+
+    The discount state is restored from the checkpoint, the new lines are
+    streamed through the pipeline, and the checkpoint is updated once all
+    output has been written.
+
+    Args:
+        file_name (str): The append-only input file.
+        checkpoint_path (str): The checkpoint file; created if missing.
+        sink (optional): Output sink, see processor.write_output.
+        final (bool): Whether the file is complete, so a trailing line
+            without a newline is processed instead of left for the next run.
+        dedup (bool): Drop transactions whose id was already seen, in this
+            run or a previous one. An index saved by earlier runs is kept
+            even when this run does not deduplicate.
+        retain_months (int, optional): Passed to DiscountManager and the
+            deduplication index, so the saved state only keeps recent months.
+
+    Returns:
+        int: Size in bytes of the trailing line left for the next run, or 0.
+    """
+    state, offset, seen = load_checkpoint(checkpoint_path)
+    discount_manager = DiscountManager(retain_months=retain_months)
+    discount_manager.restore(state)
+    seen_index = None
+    if dedup or seen is not None:
+        seen_index = SeenIndex(retain_months, stable_hashes=True)
+        if seen is not None:
+            seen_index.restore(seen)
+
+    lines = AppendedLines(file_name, offset, final)
+    transactions = deduplicate(lines, seen_index) if dedup else lines
+    write_output(
+        iter_processed_transactions(transactions, discount_manager), sink
+    )
+    save_checkpoint(
+        checkpoint_path, discount_manager, lines.offset, seen_index
+    )
+    return lines.deferred
@@ -0,0 +1,383 @@
+"""
+Binary columnar file format for pipeline interchange.
+
+Files hold validated transactions, processed or not, as fixed-width columns
+plus a section with the raw data of ignored lines, so downstream jobs and
+repeat runs can skip text parsing and validation entirely. Readers map the
+file into memory and read columns through memoryview casts without copying.
+
+Layout (native little-endian byte order):
+
+    magic      8 bytes, b"VSHPCOL1"
+    length     uint32, size of the JSON header
+    header     JSON: row counts, date/size/provider/account tables, and the offset
+               of every section relative to the first 8-byte aligned byte
+               after the header
+    sections   ordinal (int32), date (uint32, 0 = the ordinal's
+               ``YYYY-MM-DD`` form, else index + 1 into the date table),
+               size (uint8), provider (uint8),
+               account (uint32, 0 = none, else index + 1 into the table),
+               price and discount (int32 cents, discount -1 = none; only for
+               processed files), transaction_id_offset (uint64, count + 1;
+               only if any row has a transaction id), transaction_id_data
+               (bytes, empty = none), ignored_position (uint32 row numbers),
+               ignored_offset (uint64, count + 1), ignored_data (bytes)
+
+Transaction ids are unique, so unlike accounts they are not kept in a
+header table but, like the raw data of ignored lines, as one byte section
+with an offset per row.
+
+Dates are stored as ordinals. Date tokens that validation accepts but that
+are not in ``YYYY-MM-DD`` form (e.g. ``2015-2-1``) are kept in the date
+table and read back unchanged, as months are keyed on ``date[:7]``.
+
+Imports:
+    - json: Encodes the header.
+    - mmap: Maps files for zero-copy reads.
+    - struct: Encodes the header length.
+    - sys: Checks the platform byte order.
+    - array.array: Builds the columns while writing.
+    - datetime.date: Converts ordinals back to dates.
+    - functools.lru_cache: Caches date strings, as dates repeat heavily.
+    - typing.Iterable, Iterator, Union: Defines type hints.
+    - models.Transaction, ProcessedTransaction, IgnoredTransaction: Represents transactions.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from datetime import date
+from functools import lru_cache
+from typing import Iterable, Iterator, Union
+from models import Transaction, ProcessedTransaction, IgnoredTransaction
+
+MAGIC = b"VSHPCOL1"
+NO_DISCOUNT = -1
+
+# Section name -> array typecode, in file order.
+SECTIONS = {
+    "ordinal": "i",
+    "date": "I",
+    "size": "B",
+    "provider": "B",
+    "account": "I",
+    "price": "i",
+    "discount": "i",
+    "transaction_id_offset": "Q",
+    "transaction_id_data": "B",
+    "ignored_position": "I",
+    "ignored_offset": "Q",
+    "ignored_data": "B",
+}
+
+
+@lru_cache(maxsize=4096)
+def ordinal_date(ordinal: int) -> str:
+    """Convert a date ordinal back to ``YYYY-MM-DD``."""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def check_byteorder(format_name: str = "columnar"):
+    """Reject big-endian hosts, as the binary formats are little-endian.
+
+    Args:
+        format_name (str): Name of the format, for the error message.
+
+    Raises:
+        ValueError: If the host is not little-endian.
+    """
+    if sys.byteorder != "little":
+        raise ValueError(
+            f"Error: The {format_name} format requires a little-endian host."
+        )
+
+
+def write_columnar(
+    transactions: Iterable[
+        Union[Transaction, ProcessedTransaction, IgnoredTransaction]
+    ],
+    path: str,
+):
+    """Write transactions to a columnar file.
+
+    Args:
+        transactions (Iterable[Union[Transaction, ProcessedTransaction, IgnoredTransaction]]):
+            Either validated or processed transactions (not both), with any
+            ignored transactions, in order.
+        path (str): The file to write.
+
+    Raises:
+        ValueError: If validated and processed transactions are mixed.
+    """
+    check_byteorder()
+    columns = {name: array(code) for name, code in SECTIONS.items()}
+    columns["ignored_offset"].append(0)
+    columns["transaction_id_offset"].append(0)
+    ignored_data, id_data = bytearray(), bytearray()
+    dates, sizes, providers, accounts = {}, {}, {}, {}
+    processed = None
+    rows = 0
+
+    for rows, transaction in enumerate(transactions, 1):
+        if isinstance(transaction, IgnoredTransaction):
+            data = transaction.data
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            ignored_data += data
+            columns["ignored_position"].append(rows - 1)
+            columns["ignored_offset"].append(len(ignored_data))
+            continue
+
+        is_processed = isinstance(transaction, ProcessedTransaction)
+        if processed is None:
+            processed = is_processed
+        elif processed != is_processed:
+            raise ValueError(
+                "Error: Cannot mix validated and processed transactions "
+                "in one columnar file."
+            )
+
+        ordinal, token = transaction.ordinal, transaction.date
+        columns["ordinal"].append(ordinal)
+        columns["date"].append(
+            0
+            if token == ordinal_date(ordinal)
+            else dates.setdefault(token, len(dates)) + 1
+        )
+        columns["size"].append(sizes.setdefault(transaction.size, len(sizes)))
+        columns["provider"].append(
+            providers.setdefault(transaction.provider, len(providers))
+        )
+        account = transaction.account
+        columns["account"].append(
+            0
+            if account is None
+            else accounts.setdefault(account, len(accounts)) + 1
+        )
+        transaction_id = getattr(transaction, "transaction_id", None)
+        if transaction_id is not None:
+            id_data += transaction_id.encode("utf-8")
+        columns["transaction_id_offset"].append(len(id_data))
+        if processed:
+            columns["price"].append(transaction.price)
+            discount = transaction.discount
+            columns["discount"].append(
+                NO_DISCOUNT if isinstance(discount, str) else discount
+            )
+
+    columns["ignored_data"] = ignored_data
+    columns["transaction_id_data"] = id_data
+    if not id_data:
+        columns["transaction_id_offset"] = array("Q")
+    offsets, position = {}, 0
+    for name in SECTIONS:
+        offsets[name] = position
+        position += aligned(len(columns[name]) * _itemsize(name))
+
+    header = json.dumps(
+        {
+            "rows": rows,
+            "valid": len(columns["ordinal"]),
+            "ignored": len(columns["ignored_position"]),
+            "processed": bool(processed),
+            "transaction_ids": bool(id_data),
+            "dates": list(dates),
+            "sizes": list(sizes),
+            "providers": list(providers),
+            "accounts": list(accounts),
+            "offsets": offsets,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<I", len(header)))
+        file.write(header)
+        file.write(bytes(aligned(file.tell()) - file.tell()))
+        for name in SECTIONS:
+            data = bytes(columns[name])
+            file.write(data)
+            file.write(bytes(aligned(len(data)) - len(data)))
+
+
+def _itemsize(name: str) -> int:
+    return array(SECTIONS[name]).itemsize
+
+
+def aligned(size: int) -> int:
+    """Round a size up to the 8-byte section alignment."""
+    return (size + 7) & ~7
+
+
+class ColumnarFile:
+    """A memory-mapped columnar file.
+
+    Columns are exposed as memoryviews in ``columns``; they stay valid until
+    the file is closed.
+    """
+
+    def __init__(self, path: str):
+        """Map the file and locate its sections.
+
+        Args:
+            path (str): The columnar file.
+
+        Raises:
+            ValueError: If the file is not a columnar file, or is damaged.
+        """
+        check_byteorder()
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        if self._view[:8] != MAGIC:
+            self.close()
+            raise ValueError(
+                f"Error: '{path}' is not a columnar transaction file."
+            )
+        try:
+            self._locate_sections()
+        except (struct.error, ValueError, KeyError, IndexError, TypeError):
+            self.close()
+            raise ValueError(
+                f"Error: '{path}' is a damaged columnar transaction file."
+            ) from None
+
+    def _locate_sections(self):
+        """Parse the header and cast every section to a typed memoryview."""
+        (length,) = struct.unpack_from("<I", self._view, 8)
+        self.header = json.loads(bytes(self._view[12 : 12 + length]))
+        start = aligned(12 + length)
+
+        counts = {
+            "ordinal": self.header["valid"],
+            "date": self.header["valid"],
+            "size": self.header["valid"],
+            "provider": self.header["valid"],
+            "account": self.header["valid"],
+            "price": self.header["valid"] if self.header["processed"] else 0,
+            "discount": (
+                self.header["valid"] if self.header["processed"] else 0
+            ),
+            "transaction_id_offset": (
+                self.header["valid"] + 1
+                if self.header["transaction_ids"]
+                else 0
+            ),
+            "ignored_position": self.header["ignored"],
+            "ignored_offset": self.header["ignored"] + 1,
+        }
+        self.columns = {}
+        for name, code in SECTIONS.items():
+            offset = start + self.header["offsets"][name]
+            if name == "ignored_data":
+                end = offset + self.columns["ignored_offset"][-1]
+            elif name == "transaction_id_data":
+                id_offsets = self.columns["transaction_id_offset"]
+                end = offset + (id_offsets[-1] if id_offsets else 0)
+            else:
+                end = offset + counts[name] * _itemsize(name)
+            if end > len(self._view):
+                raise ValueError(f"Section {name} ends past the file end.")
+            self.columns[name] = self._view[offset:end].cast(code)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the columns and unmap the file."""
+        for column in getattr(self, "columns", {}).values():
+            column.release()
+        self.columns = {}
+        self._view.release()
+        self._mmap.close()
+
+    @property
+    def processed(self) -> bool:
+        """bool: Whether the file holds processed transactions."""
+        return self.header["processed"]
+
+    def __iter__(
+        self,
+    ) -> Iterator[
+        Union[Transaction, ProcessedTransaction, IgnoredTransaction]
+    ]:
+        """Yield the stored transactions in their original order.
+
+        Files of validated transactions yield Transaction objects that can be
+        fed to processor.process_transactions without validation; processed
+        files yield ProcessedTransaction objects.
+        """
+        columns = self.columns
+        dates = [None] + self.header["dates"]
+        sizes = self.header["sizes"]
+        providers = self.header["providers"]
+        accounts = [None] + self.header["accounts"]
+        ignored_positions = columns["ignored_position"]
+        ignored_offsets = columns["ignored_offset"]
+        ignored_data = columns["ignored_data"]
+        id_offsets = columns["transaction_id_offset"]
+        id_data = columns["transaction_id_data"]
+
+        next_ignored = 0
+        valid = 0
+        for row in range(self.header["rows"]):
+            if (
+                next_ignored < len(ignored_positions)
+                and ignored_positions[next_ignored] == row
+            ):
+                start = ignored_offsets[next_ignored]
+                end = ignored_offsets[next_ignored + 1]
+                yield IgnoredTransaction(
+                    bytes(ignored_data[start:end]).decode("utf-8")
+                )
+                next_ignored += 1
+                continue
+
+            fields = (
+                dates[columns["date"][valid]]
+                or ordinal_date(columns["ordinal"][valid]),
+                sizes[columns["size"][valid]],
+                providers[columns["provider"][valid]],
+            )
+            account = accounts[columns["account"][valid]]
+            if self.processed:
+                discount = columns["discount"][valid]
+                yield ProcessedTransaction(
+                    *fields,
+                    columns["price"][valid],
+                    "-" if discount == NO_DISCOUNT else discount,
+                    account,
+                )
+            else:
+                transaction_id = None
+                if id_offsets:
+                    start, end = id_offsets[valid], id_offsets[valid + 1]
+                    if end > start:
+                        transaction_id = bytes(id_data[start:end]).decode(
+                            "utf-8"
+                        )
+                yield Transaction(*fields, account, transaction_id)
+            valid += 1
+
+
+def read_columnar(
+    path: str,
+) -> Iterator[Union[Transaction, ProcessedTransaction, IgnoredTransaction]]:
+    """Yield the transactions stored in a columnar file, in original order.
+
+    Args:
+        path (str): The columnar file.
+
+    Yields:
+        Union[Transaction, ProcessedTransaction, IgnoredTransaction]:
+            The stored transactions.
+    """
+    with ColumnarFile(path) as columnar:
+        yield from columnar
@@ -0,0 +1,332 @@
+"""
+Deduplication of redelivered transactions.
+
+Upstream feeds redeliver whole batches after retries. Transactions that
+carry a transaction id (a trailing ``#id`` token) are checked against an
+index of ids already seen, and repeats are dropped before they reach
+DiscountManager, so they neither count towards the third L/LP shipment nor
+use monthly discount budget twice. Transactions without an id pass through.
+
+The index is partitioned by calendar month. Each month keeps an exact set
+of 64-bit id hashes: small fixed-size integers instead of the
+variable-length id strings, so the index never keeps transactions or their
+ids alive (distinct ids colliding on all 64 bits are vanishingly rare).
+With ``bloom_bits``, each month also gets a fixed-size Bloom filter used as
+a prefilter: ids it reports as new are recorded without probing the set,
+and ids it reports as possibly seen are confirmed against the set, so a
+false positive costs one set probe and never drops a transaction.
+
+With ``retain_months``, months more than that many months before the
+latest month seen are closed and evicted, so memory stays bounded on an
+endless date-ordered feed. Transactions of closed months are dropped as
+late redeliveries.
+
+Python's str hashes change from one process to the next, so an index that
+is saved and restored across runs (see SeenIndex.snapshot and the
+checkpoint module) is built with ``stable_hashes``, which hashes ids with
+BLAKE2b instead.
+
+Imports:
+    - datetime: Maps dates to calendar months (imported on first use).
+    - hashlib.blake2b: Stable id hashes for indexes saved across runs.
+    - math.exp: Estimates Bloom filter false positive rates.
+    - array.array: Bit storage of the Bloom filters.
+    - typing.Iterable, Iterator, Union: Defines type hints.
+    - models.Transaction, IgnoredTransaction: Represents transactions.
+    - instrumentation: Counts dropped lines when enabled.
+"""
+
+from hashlib import blake2b
+from math import exp
+from array import array
+from typing import Iterable, Iterator, Union
+from models import Transaction, IgnoredTransaction
+import instrumentation
+
+BLOOM_HASHES = 7  # Bit probes per id; optimal for ~10 bits per expected id
+
+
+def stable_hash(transaction_id: str) -> int:
+    """Hash an id to 64 bits, identically in every process.
+
+    Args:
+        transaction_id (str): The transaction id.
+
+    Returns:
+        int: The hash.
+    """
+    digest = blake2b(transaction_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over 64-bit hashes."""
+
+    __slots__ = ("bits", "size", "hashes", "count")
+
+    def __init__(self, size: int, hashes: int = BLOOM_HASHES):
+        """Allocate an empty filter.
+
+        Args:
+            size (int): Number of bits, rounded up to a multiple of 64.
+            hashes (int): Number of bit probes per item.
+        """
+        self.bits = array("Q", bytes(8 * ((size + 63) // 64)))
+        self.size = len(self.bits) * 64
+        self.hashes = hashes
+        self.count = 0
+
+    def add(self, value: int) -> bool:
+        """Add a hash, telling whether it may have been present already.
+
+        Probe positions are derived from the two 32-bit halves of the hash
+        (double hashing).
+
+        Args:
+            value (int): A 64-bit hash.
+
+        Returns:
+            bool: False if the hash was certainly not present before.
+        """
+        bits, size = self.bits, self.size
+        value &= 0xFFFFFFFFFFFFFFFF
+        low, step = value & 0xFFFFFFFF, (value >> 32) | 1
+        present = True
+        for probe in range(self.hashes):
+            position = (low + probe * step) % size
+            word, bit = position >> 6, 1 << (position & 63)
+            if not bits[word] & bit:
+                bits[word] |= bit
+                present = False
+        self.count += not present
+        return present
+
+    def false_positive_rate(self) -> float:
+        """float: Estimated chance that a new item is reported as present."""
+        return (1 - exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+
+class SeenIndex:
+    """Per-month index of transaction ids already processed."""
+
+    def __init__(
+        self,
+        retain_months: int = None,
+        bloom_bits: int = None,
+        bloom_hashes: int = BLOOM_HASHES,
+        stable_hashes: bool = False,
+    ):
+        """Initialize an empty index.
+
+        Args:
+            retain_months (int, optional): If set, months more than this many
+                months before the latest month seen are closed and evicted.
+                Input must then arrive in date order. Defaults to keeping all.
+            bloom_bits (int, optional): If set, each month also gets a Bloom
+                filter prefilter of this many bits. Size it at about 10 bits
+                per expected transaction for ~1% false positives.
+            bloom_hashes (int): Bit probes per id of the Bloom filters.
+            stable_hashes (bool): Hash ids with stable_hash instead of the
+                built-in hash, so the index can be saved with snapshot and
+                restored in another process.
+        """
+        self.retain_months = retain_months
+        self.bloom_bits = bloom_bits
+        self.bloom_hashes = bloom_hashes
+        self.stable_hashes = stable_hashes
+        self.hash = stable_hash if stable_hashes else hash
+        self.months = {}
+        self.blooms = {}
+        self.month_names = {}
+        self.latest_month = None
+        self.closed_before = ""
+        self.duplicates = 0
+        self.late = 0
+
+    def month_of(self, transaction: Transaction) -> str:
+        """Return the calendar month of a transaction, as "YYYY-MM".
+
+        Validated dates need not be zero-padded, so the month is computed
+        from the date ordinal once per distinct ``date[:7]`` token.
+
+        Args:
+            transaction (Transaction): The transaction.
+
+        Returns:
+            str: The month.
+        """
+        token = transaction.date[:7]
+        month = self.month_names.get(token)
+        if month is None:
+            import datetime
+
+            day = datetime.date.fromordinal(transaction.ordinal)
+            month = self.month_names[token] = f"{day.year:04d}-{day.month:02d}"
+        return month
+
+    def seen(self, transaction: Transaction) -> bool:
+        """Record an id, telling whether it was already seen in its month.
+
+        Ids of closed months are always reported as seen.
+
+        Args:
+            transaction (Transaction): A transaction with a transaction id.
+
+        Returns:
+            bool: True if the transaction is a duplicate or late.
+        """
+        year_month = self.month_of(transaction)
+        ids = self.months.get(year_month)
+        if ids is None:
+            if year_month < self.closed_before:
+                self.late += 1
+                return True
+            ids = self.months[year_month] = set()
+            if self.bloom_bits is not None:
+                self.blooms[year_month] = BloomFilter(
+                    self.bloom_bits, self.bloom_hashes
+                )
+            if self.retain_months is not None:
+                self._advance(year_month)
+
+        value = self.hash(transaction.transaction_id)
+        if self.bloom_bits is not None and not self.blooms[year_month].add(
+            value
+        ):
+            ids.add(value)
+            return False
+        duplicate = value in ids
+        if not duplicate:
+            ids.add(value)
+        self.duplicates += duplicate
+        return duplicate
+
+    def _advance(self, year_month: str):
+        """Close and evict months that fell out of the retention window."""
+        if self.latest_month is not None and year_month <= self.latest_month:
+            return
+        self.latest_month = year_month
+
+        months = int(year_month[:4]) * 12 + int(year_month[5:]) - 1
+        first_kept = months - self.retain_months
+        cutoff = f"{first_kept // 12:04d}-{first_kept % 12 + 1:02d}"
+        if cutoff > self.closed_before:
+            self.closed_before = cutoff
+            self.evict_before(cutoff)
+
+    def evict_before(self, year_month: str) -> int:
+        """Drop the ids of months before a given month.
+
+        Args:
+            year_month (str): The first month to keep, as "YYYY-MM".
+
+        Returns:
+            int: Number of months evicted.
+        """
+        stale = [month for month in self.months if month < year_month]
+        for month in stale:
+            del self.months[month]
+            self.blooms.pop(month, None)
+        for token, month in list(self.month_names.items()):
+            if month < year_month:
+                del self.month_names[token]
+        return len(stale)
+
+    def snapshot(self) -> dict:
+        """Export the index state.
+
+        Bloom filters are not saved: restore rebuilds them from the ids.
+
+        Returns:
+            dict: "latest_month", "closed_before" and "months": "YYYY-MM" ->
+            sorted id hashes.
+
+        Raises:
+            ValueError: If the index does not use stable hashes.
+        """
+        if not self.stable_hashes:
+            raise ValueError(
+                "Error: Only an index with stable hashes can be saved."
+            )
+        return {
+            "latest_month": self.latest_month,
+            "closed_before": self.closed_before,
+            "months": {
+                month: sorted(ids) for month, ids in self.months.items()
+            },
+        }
+
+    def restore(self, state: dict):
+        """Load the index state exported by snapshot.
+
+        The index's own retain_months applies at once, so an index saved
+        with a longer window (or none) is trimmed. The Bloom filters of an
+        index built with bloom_bits are rebuilt from the ids.
+
+        Args:
+            state (dict): The output of snapshot.
+        """
+        self.latest_month = state["latest_month"]
+        self.closed_before = state["closed_before"]
+        self.months = {
+            month: set(ids) for month, ids in state["months"].items()
+        }
+        if self.retain_months is not None and self.months:
+            self.latest_month = None
+            self._advance(max(self.months))
+        self.blooms = {}
+        if self.bloom_bits is None:
+            return
+        for month, ids in self.months.items():
+            bloom = self.blooms[month] = BloomFilter(
+                self.bloom_bits, self.bloom_hashes
+            )
+            for value in ids:
+                bloom.add(value)
+
+
+def deduplicate(
+    transactions: Iterable[Union[Transaction, IgnoredTransaction]],
+    index: SeenIndex = None,
+) -> Iterator[Union[Transaction, IgnoredTransaction]]:
+    """Drop transactions whose id was already seen.
+
+    Args:
+        transactions (Iterable[Union[Transaction, IgnoredTransaction]]):
+            Validated transactions.
+        index (SeenIndex, optional): Index to check and update, e.g. to
+            inspect its counters afterwards. Defaults to a fresh exact index.
+
+    Yields:
+        Union[Transaction, IgnoredTransaction]: Transactions without an id,
+        ignored transactions, and the first occurrence of every id.
+    """
+    if index is None:
+        index = SeenIndex()
+    seen, hash_id = index.seen, index.hash
+    # Indexes without Bloom filters are probed inline while the date[:7]
+    # token does not change; SeenIndex.seen handles month changes, eviction
+    # and Bloom filters.
+    current_token, current = None, None
+    for transaction in transactions:
+        transaction_id = getattr(transaction, "transaction_id", None)
+        if transaction_id is None:
+            yield transaction
+            continue
+
+        token = transaction.date[:7]
+        if token == current_token:
+            value = hash_id(transaction_id)
+            if value not in current:
+                current.add(value)
+                yield transaction
+                continue
+            index.duplicates += 1
+        elif not seen(transaction):
+            if index.bloom_bits is None:
+                current_token = token
+                current = index.months[index.month_names[token]]
+            yield transaction
+            continue
+
+        instrumentation.record_ignored("duplicate")
@@ -5,25 +5,90 @@ This module contains discount rules and logic for applying discounts
 to shipment transactions. It manages discount limits, special rules,
 and ensures correct pricing.
 
+Discount state is tracked per partition: the year_month of a transaction,
+or (account, year_month) for transactions that carry an account id.
+
 Imports:
+    - datetime: Computes the month cutoff for evicting idle partitions
+    (imported on first use).
     - collections.defaultdict: Handles monthly discount tracking.
     - models.Transaction, ProcessedTransaction: Represents shipment transactions.
+    - catalog: Price catalog; PRICES and MONTHLY_DISCOUNT_LIMIT are its defaults.
+    - instrumentation: Optional rule hit and monthly cap counters.
 """
 
 from collections import defaultdict
 from models import Transaction, ProcessedTransaction
+from catalog import PRICES, MONTHLY_DISCOUNT_LIMIT, PriceCatalog, get_catalog
+import instrumentation
+
+
+class MonthState:
+    """Discount tracking for one partition, about a third the size of a dict.
+
+    Supports item access, so rules can use it like the plain
+    ``{"L_LP_count": ..., "discount": ...}`` dicts they also accept.
+    """
+
+    __slots__ = ("L_LP_count", "discount")
+
+    def __init__(self, L_LP_count: int = 0, discount: int = 0):
+        self.L_LP_count = L_LP_count
+        self.discount = discount
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        setattr(self, name, value)
+
+
+def tracking_key(transaction: Transaction):
+    """Return the tracking partition of a transaction.
 
-# Constants for shipment pricing
-PRICES = {
-    "LP": {"S": 1.50, "M": 4.90, "L": 6.90},
-    "MR": {"S": 2.00, "M": 3.00, "L": 4.00},
-}
+    Args:
+        transaction (Transaction): The transaction.
 
-MONTHLY_DISCOUNT_LIMIT = 10.0  # Monthly limit for discounts
+    Returns:
+        The year_month, or (account, year_month) if the transaction has an
+        account.
+    """
+    year_month = transaction.date[:7]
+    if transaction.account is None:
+        return year_month
+    return transaction.account, year_month
 
 
 class DiscountRule:
-    """Base class for all discount rules."""
+    """Base class for all discount rules.
+
+    Rules read prices from the catalog they are built with, so values derived
+    from it are computed once per catalog rather than once per transaction.
+    """
+
+    def __init__(self, catalog: PriceCatalog = None):
+        """Initialize the rule.
+
+        Args:
+            catalog (PriceCatalog, optional): Prices and limits to use.
+                Defaults to the published catalog.
+        """
+        self.catalog = catalog or get_catalog()
+
+    def applies_to(self, size: str, provider: str) -> bool:
+        """Tell whether the rule can ever change the price of a shipment type.
+
+        Used once by DiscountManager to build its rule table; rules that
+        return False are never called for that (size, provider) pair.
+
+        Args:
+            size (str): The package size.
+            provider (str): The shipment provider.
+
+        Returns:
+            bool: True if the rule may apply, False otherwise.
+        """
+        return True
 
     def apply(self, transaction: Transaction, tracking_data: dict) -> tuple:
         """Apply a discount rule to a transaction.
@@ -33,7 +98,7 @@ class DiscountRule:
             tracking_data (dict): Tracking information for discount limits.
 
         Returns:
-            tuple: The new price and applied discount amount.
+            tuple: The new price and applied discount amount, in cents.
         """
         raise NotImplementedError
 
@@ -41,6 +106,18 @@ class DiscountRule:
 class SmallPackageDiscount(DiscountRule):
     """Discount rule for small-sized shipments."""
 
+    def __init__(self, catalog: PriceCatalog = None):
+        """Precompute the lowest small package price among providers."""
+        super().__init__(catalog)
+        self.lowest_price = self.catalog.lowest_price.get("S")
+
+    def applies_to(self, size: str, provider: str) -> bool:
+        """Only small packages priced above the lowest rate are discounted."""
+        return (
+            size == "S"
+            and self.catalog.price_index[(size, provider)] > self.lowest_price
+        )
+
     def apply(self, transaction: Transaction, tracking_data: dict) -> tuple:
         """Apply the small package discount rule.
 
@@ -52,25 +129,27 @@ class SmallPackageDiscount(DiscountRule):
             tracking_data (dict): Tracking information for discount limits.
 
         Returns:
-            tuple: The new price and applied discount amount.
+            tuple: The new price and applied discount amount, in cents.
         """
+        price_index = self.catalog.price_index
         if transaction.size != "S":
-            return PRICES[transaction.provider][transaction.size], 0.0
+            return price_index[(transaction.size, transaction.provider)], 0
 
-        lowest_price = min(PRICES["LP"]["S"], PRICES["MR"]["S"])
-        current_price = PRICES[transaction.provider]["S"]
+        current_price = price_index[("S", transaction.provider)]
 
-        if current_price > lowest_price:
-            discount_amount = current_price - lowest_price
+        if current_price > self.lowest_price:
+            discount_amount = current_price - self.lowest_price
             return self.apply_monthly_limit(
                 transaction, discount_amount, tracking_data
             )
 
-        return current_price, 0.0
+        return current_price, 0
 
-    @staticmethod
     def apply_monthly_limit(
-        transaction: Transaction, discount_amount: float, tracking_data: dict
+        self,
+        transaction: Transaction,
+        discount_amount: int,
+        tracking_data: dict,
     ) -> tuple:
         """Apply the monthly discount limit.
 
@@ -78,27 +157,42 @@ class SmallPackageDiscount(DiscountRule):
 
         Args:
             transaction (Transaction): The transaction being processed.
-            discount_amount (float): The potential discount amount.
+            discount_amount (int): The potential discount amount, in cents.
             tracking_data (dict): Tracking information for discount limits.
 
         Returns:
-            tuple: The new price and final discount applied.
+            tuple: The new price and final discount applied, in cents.
         """
-        year_month = transaction.date[:7]
-        used_discount = tracking_data[year_month]["discount"]
-
-        if used_discount + discount_amount > MONTHLY_DISCOUNT_LIMIT:
-            discount_amount = max(0, MONTHLY_DISCOUNT_LIMIT - used_discount)
-
-        tracking_data[year_month]["discount"] += discount_amount
-        new_price = PRICES[transaction.provider]["S"] - discount_amount
+        key = tracking_key(transaction)
+        used_discount = tracking_data[key]["discount"]
+        monthly_limit = self.catalog.monthly_limit
+
+        if used_discount + discount_amount > monthly_limit:
+            discount_amount = max(0, monthly_limit - used_discount)
+            if instrumentation.STATS is not None:
+                instrumentation.STATS.monthly_cap_triggered += 1
+
+        tracking_data[key]["discount"] += discount_amount
+        new_price = (
+            self.catalog.price_index[("S", transaction.provider)]
+            - discount_amount
+        )
 
-        return round(new_price, 2), round(discount_amount, 2)
+        return new_price, discount_amount
 
 
 class LargeLPThirdShipmentFree(DiscountRule):
     """Discount rule for the third 'L' shipment of LP each month."""
 
+    def __init__(self, catalog: PriceCatalog = None):
+        """Look up the large LP price once."""
+        super().__init__(catalog)
+        self.price = self.catalog.price_index.get(("L", "LP"))
+
+    def applies_to(self, size: str, provider: str) -> bool:
+        """Only large LP shipments are counted and discounted."""
+        return size == "L" and provider == "LP"
+
     def apply(self, transaction: Transaction, tracking_data: dict) -> tuple:
         """Apply the third 'L' package free rule for LP shipments.
 
@@ -109,49 +203,199 @@ class LargeLPThirdShipmentFree(DiscountRule):
             tracking_data (dict): Tracking information for discount limits.
 
         Returns:
-            tuple: The new price and applied discount amount.
+            tuple: The new price and applied discount amount, in cents.
         """
         if transaction.size != "L" or transaction.provider != "LP":
-            return PRICES[transaction.provider][transaction.size], 0.0
+            return (
+                self.catalog.price_index[
+                    (transaction.size, transaction.provider)
+                ],
+                0,
+            )
 
-        year_month = transaction.date[:7]
-        tracking_data[year_month]["L_LP_count"] += 1
-        current_count = tracking_data[year_month]["L_LP_count"]
+        key = tracking_key(transaction)
+        tracking_data[key]["L_LP_count"] += 1
+        current_count = tracking_data[key]["L_LP_count"]
 
         if current_count == 3:
-            discount_amount = PRICES["LP"]["L"]
+            discount_amount = self.price
             return self.apply_monthly_limit(
                 transaction, discount_amount, tracking_data
             )
 
-        return PRICES["LP"]["L"], 0.0
+        return self.price, 0
 
-    @staticmethod
     def apply_monthly_limit(
-        transaction: Transaction, discount_amount: float, tracking_data: dict
+        self,
+        transaction: Transaction,
+        discount_amount: int,
+        tracking_data: dict,
     ) -> tuple:
         """Apply the monthly discount limit."""
-        year_month = transaction.date[:7]
-        used_discount = tracking_data[year_month]["discount"]
+        key = tracking_key(transaction)
+        used_discount = tracking_data[key]["discount"]
+        monthly_limit = self.catalog.monthly_limit
 
-        if used_discount + discount_amount > MONTHLY_DISCOUNT_LIMIT:
-            discount_amount = max(0, MONTHLY_DISCOUNT_LIMIT - used_discount)
+        if used_discount + discount_amount > monthly_limit:
+            discount_amount = max(0, monthly_limit - used_discount)
+            if instrumentation.STATS is not None:
+                instrumentation.STATS.monthly_cap_triggered += 1
 
-        tracking_data[year_month]["discount"] += discount_amount
-        new_price = PRICES["LP"]["L"] - discount_amount
+        tracking_data[key]["discount"] += discount_amount
+        new_price = self.price - discount_amount
 
-        return round(new_price, 2), round(discount_amount, 2)
+        return new_price, discount_amount
 
 
 class DiscountManager:
     """Manages and applies discount rules to transactions."""
 
-    def __init__(self):
-        """Initialize DiscountManager with discount rules and tracking data."""
-        self.rules = [LargeLPThirdShipmentFree(), SmallPackageDiscount()]
-        self.tracking_data = defaultdict(
-            lambda: {"L_LP_count": 0, "discount": 0.0}
-        )
+    def __init__(
+        self, catalog: PriceCatalog = None, retain_months: int = None
+    ):
+        """Initialize DiscountManager with discount rules and tracking data.
+
+        Args:
+            catalog (PriceCatalog, optional): Prices and limits to use.
+                Defaults to the published catalog.
+            retain_months (int, optional): If set, partitions of months more
+                than this many months before the latest month seen are
+                evicted, keeping memory bounded with many accounts. Input
+                must then arrive in date order. Defaults to keeping all.
+        """
+        self.tracking_data = defaultdict(MonthState)
+        self.retain_months = retain_months
+        self.current_month = None
+        self.evicted_before = ""
+        self.use_catalog(catalog or get_catalog())
+
+    def use_catalog(self, catalog: PriceCatalog):
+        """Switch to another catalog, keeping the per-month tracking data.
+
+        Rebuilds the rules and the rule table once for the new catalog.
+
+        Args:
+            catalog (PriceCatalog): Prices and limits to use.
+        """
+        self.catalog = catalog
+        self.rules = [
+            LargeLPThirdShipmentFree(catalog),
+            SmallPackageDiscount(catalog),
+        ]
+        self.rule_table = self.compile_rules()
+
+    def refresh_catalog(self) -> bool:
+        """Pick up a catalog published since this manager was built.
+
+        Returns:
+            bool: True if the manager switched to a new catalog.
+        """
+        catalog = get_catalog()
+        if catalog is self.catalog:
+            return False
+        self.use_catalog(catalog)
+        return True
+
+    def evict_before(self, year_month: str) -> int:
+        """Drop the tracking partitions of months before a given month.
+
+        Args:
+            year_month (str): The first month to keep, as "YYYY-MM".
+
+        Returns:
+            int: Number of partitions evicted.
+        """
+        stale = [
+            key
+            for key in self.tracking_data
+            if (key if isinstance(key, str) else key[1]) < year_month
+        ]
+        for key in stale:
+            del self.tracking_data[key]
+        return len(stale)
+
+    def _advance_month(self, transaction: Transaction):
+        """Evict partitions that fell out of the retention window."""
+        year_month = transaction.date[:7]
+        if year_month == self.current_month:
+            return
+        self.current_month = year_month
+
+        import datetime
+
+        day = datetime.date.fromordinal(transaction.ordinal)
+        first_kept = day.year * 12 + day.month - 1 - self.retain_months
+        cutoff = f"{first_kept // 12:04d}-{first_kept % 12 + 1:02d}"
+        if cutoff > self.evicted_before:
+            self.evicted_before = cutoff
+            self.evict_before(cutoff)
+
+    def snapshot(self) -> dict:
+        """Export the per-partition tracking state.
+
+        Returns:
+            dict: "year_month" or "account year_month" ->
+            [L_LP_count, used discount in cents].
+        """
+        return {
+            (key if isinstance(key, str) else " ".join(key)): [
+                data["L_LP_count"],
+                data["discount"],
+            ]
+            for key, data in self.tracking_data.items()
+        }
+
+    def restore(self, state: dict):
+        """Load per-partition tracking state produced by snapshot.
+
+        Args:
+            state (dict): "year_month" or "account year_month" ->
+                [L_LP_count, used discount in cents].
+        """
+        for key, (count, discount) in state.items():
+            if " " in key:
+                key = tuple(key.rsplit(" ", 1))
+            self.tracking_data[key] = MonthState(count, discount)
+
+    def compile_rules(self) -> dict:
+        """Build the dispatch table used by apply_discounts.
+
+        Maps every (size, provider) pair to its base price and the rules
+        that can apply to it, so the hot path is a single lookup.
+
+        Returns:
+            dict: (size, provider) -> (base price, tuple of applicable rules).
+        """
+        return {
+            (size, provider): (
+                price,
+                tuple(
+                    rule
+                    for rule in self.rules
+                    if rule.applies_to(size, provider)
+                ),
+            )
+            for (size, provider), price in self.catalog.price_index.items()
+        }
+
+    def _refresh_rule(self, size: str, provider: str) -> tuple:
+        """Look up a pair missing from the rule table in the published catalog.
+
+        Validation checks lines against the published catalog, so a pair
+        this manager does not know means a newer catalog was published while
+        it was running.
+
+        Raises:
+            ValueError: If the published catalog has no price for the pair
+                either.
+        """
+        self.refresh_catalog()
+        try:
+            return self.rule_table[(size, provider)]
+        except KeyError:
+            raise ValueError(
+                f"Error: No price for {size} {provider} in the price catalog."
+            ) from None
 
     def apply_discounts(
         self, transaction: Transaction
@@ -159,6 +403,8 @@ class DiscountManager:
         """Apply all applicable discount rules to a transaction.
 
         Determines the best available discount for a given transaction.
+        A (size, provider) pair unknown to this manager's catalog switches
+        it to the published catalog first.
 
         Args:
             transaction (Transaction): The transaction to evaluate.
@@ -166,13 +412,26 @@ class DiscountManager:
         Returns:
             ProcessedTransaction: The processed transaction with final price and discount.
         """
-        best_price, best_discount = (
-            PRICES[transaction.provider][transaction.size],
-            0.0,
-        )
+        if self.retain_months is not None:
+            self._advance_month(transaction)
+
+        try:
+            best_price, rules = self.rule_table[
+                (transaction.size, transaction.provider)
+            ]
+        except KeyError:
+            best_price, rules = self._refresh_rule(
+                transaction.size, transaction.provider
+            )
+        best_discount = 0
+        stats = instrumentation.STATS
 
-        for rule in self.rules:
+        for rule in rules:
             price, discount = rule.apply(transaction, self.tracking_data)
+            if stats is not None:
+                name = type(rule).__name__
+                stats.rule_evaluations[name] += 1
+                stats.rule_hits[name] += price < best_price
             if price < best_price:
                 best_price, best_discount = price, discount
 
@@ -183,4 +442,5 @@ class DiscountManager:
             transaction.provider,
             best_price,
             discount_display,
+            transaction.account,
         )
@@ -0,0 +1,188 @@
+"""
+External merge sort for transactions that arrive out of date order.
+
+LargeLPThirdShipmentFree and the monthly discount limit assume transactions
+are processed in date order. Feeds merged from several warehouses are not,
+and can be too large to sort in memory. This module sorts them with bounded
+memory: sorted runs are spilled to temporary files and k-way merged.
+
+Imports:
+    - heapq.merge: k-way merges sorted runs.
+    - itertools.islice: Reads runs in fixed-size chunks.
+    - operator.itemgetter: Sort keys for tagged transactions.
+    - pickle: Serializes spilled runs.
+    - tempfile: Temporary files for spilled runs.
+    - typing.Callable, Iterable, Iterator, Union: Defines type hints.
+    - models.Transaction, ProcessedTransaction, IgnoredTransaction: Represents transactions.
+    - discounts.DiscountManager: Applies discounts in date order.
+"""
+
+import heapq
+import pickle
+import tempfile
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, Union
+from models import Transaction, ProcessedTransaction, IgnoredTransaction
+from discounts import DiscountManager
+
+RUN_SIZE = 100_000  # Items sorted in memory per spilled run
+FAN_IN = 64  # Maximum runs merged at once
+CHUNK_SIZE = 1024  # Items pickled together in a run file
+
+
+def external_sort(
+    items: Iterable,
+    key: Callable,
+    run_size: int = RUN_SIZE,
+    fan_in: int = FAN_IN,
+    tmp_dir: str = None,
+) -> Iterator:
+    """Sort an iterable with bounded memory.
+
+    Items are collected into runs of ``run_size``, each run is sorted and
+    spilled to a temporary file, and the runs are merged. If there are more
+    than ``fan_in`` runs, they are merged in several passes. The sort is
+    stable. Input that fits in a single run never touches the disk.
+
+    Args:
+        items (Iterable): The items to sort; they must be picklable.
+        key (Callable): Sort key function.
+        run_size (int): Items sorted in memory per run.
+        fan_in (int): Maximum number of runs merged at once.
+        tmp_dir (str, optional): Directory for run files.
+
+    Yields:
+        The items in sorted order.
+    """
+    runs = []
+    try:
+        items = iter(items)
+        while True:
+            run = sorted(islice(items, run_size), key=key)
+            if not runs and len(run) < run_size:
+                yield from run
+                return
+            if not run:
+                break
+            runs.append(_spill(run, tmp_dir))
+
+        while len(runs) > fan_in:
+            merged = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start : start + fan_in]
+                merged.append(_spill(_merge(group, key), tmp_dir))
+                for run_file in group:
+                    run_file.close()
+            runs = merged
+
+        yield from _merge(runs, key)
+    finally:
+        for run_file in runs:
+            run_file.close()
+
+
+def _spill(items: Iterable, tmp_dir: str):
+    """Write sorted items to a temporary file, rewound for reading."""
+    run_file = tempfile.TemporaryFile(dir=tmp_dir)
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, CHUNK_SIZE))
+        if not chunk:
+            break
+        pickle.dump(chunk, run_file, pickle.HIGHEST_PROTOCOL)
+    run_file.seek(0)
+    return run_file
+
+
+def _read_run(run_file) -> Iterator:
+    """Yield the items of a spilled run."""
+    while True:
+        try:
+            chunk = pickle.load(run_file)
+        except EOFError:
+            return
+        yield from chunk
+
+
+def _merge(runs: list, key: Callable) -> Iterator:
+    """k-way merge spilled runs; earlier runs win ties, keeping the sort stable."""
+    return heapq.merge(*(_read_run(run_file) for run_file in runs), key=key)
+
+
+def _date_keys(
+    transactions: Iterable[Union[Transaction, IgnoredTransaction]],
+) -> Iterator[tuple]:
+    """Tag transactions with a (date ordinal, input position) key.
+
+    Ignored transactions have no date; they take the date of the previous
+    valid transaction, so they stay next to it in date order.
+    """
+    ordinal = 0
+    for position, transaction in enumerate(transactions):
+        if not isinstance(transaction, IgnoredTransaction):
+            ordinal = transaction.ordinal
+        yield (ordinal, position), transaction
+
+
+def process_unsorted(
+    transactions: Iterable[Union[Transaction, IgnoredTransaction]],
+    order: str = "input",
+    run_size: int = RUN_SIZE,
+    tmp_dir: str = None,
+    retain_months: int = None,
+) -> Iterator[Union[ProcessedTransaction, IgnoredTransaction]]:
+    """Process transactions that may arrive out of date order.
+
+    Transactions are externally sorted by date, keeping input order for equal
+    dates, and priced by one DiscountManager in that order.
+
+    Args:
+        transactions (Iterable[Union[Transaction, IgnoredTransaction]]):
+            Transactions in any order.
+        order (str): "input" to yield results in the original input order,
+            "date" to yield them in date order.
+        run_size (int): Items sorted in memory per spilled run.
+        tmp_dir (str, optional): Directory for run files.
+        retain_months (int, optional): Passed to DiscountManager; safe here,
+            as transactions are priced in date order.
+
+    Yields:
+        Union[ProcessedTransaction, IgnoredTransaction]: Processed transactions.
+
+    Raises:
+        ValueError: If the order is not "input" or "date".
+    """
+    if order not in ("input", "date"):
+        raise ValueError(
+            f"Error: Invalid output order '{order}', expected 'input' or 'date'."
+        )
+    return _process_unsorted(
+        transactions, order, run_size, tmp_dir, retain_months
+    )
+
+
+def _process_unsorted(transactions, order, run_size, tmp_dir, retain_months):
+    """Generator behind process_unsorted."""
+    discount_manager = DiscountManager(retain_months=retain_months)
+    by_date = external_sort(
+        _date_keys(transactions), itemgetter(0), run_size, tmp_dir=tmp_dir
+    )
+    processed = (
+        (
+            position,
+            (
+                transaction
+                if isinstance(transaction, IgnoredTransaction)
+                else discount_manager.apply_discounts(transaction)
+            ),
+        )
+        for (_, position), transaction in by_date
+    )
+
+    if order == "input":
+        processed = external_sort(
+            processed, itemgetter(0), run_size, tmp_dir=tmp_dir
+        )
+    for _, transaction in processed:
+        yield transaction
@@ -0,0 +1,132 @@
+"""
+Ingestion of many shard files in one run.
+
+Sources may be file paths, directories (every ``.txt`` file in them) or glob
+patterns. Shards are read and validated in a thread pool so file I/O
+overlaps, and their transactions are yielded in shard order, so a single
+DiscountManager prices the whole batch in one ordered pass. Shards are
+taken in the order the sources are given, each directory or glob sorted by
+name; shards that are not in date order relative to each other can be
+passed through external_sort.process_unsorted.
+
+A shard that cannot be read (missing, not a ``.txt`` file, empty) is
+reported and skipped without aborting the rest of the batch.
+
+Imports:
+    - glob: Expands glob patterns.
+    - os: Lists directories.
+    - collections.deque: Window of shards being read ahead.
+    - concurrent.futures.ThreadPoolExecutor: Reads shards concurrently.
+    - typing.Callable, Iterable, Iterator, List, Tuple, Union: Defines type hints.
+    - models.Transaction, IgnoredTransaction: Represents transactions.
+    - processor.iter_processed_transactions, write_output: The pricing pipeline.
+    - validators.read_transactions: Reads and validates one shard.
+"""
+
+import glob
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Tuple, Union
+from models import Transaction, IgnoredTransaction
+from processor import iter_processed_transactions, write_output
+from validators import read_transactions
+
+GLOB_CHARS = frozenset("*?[")
+READ_AHEAD = 4  # Default reader threads, and shards read ahead of use
+
+
+def expand_sources(sources: Iterable[str]) -> List[str]:
+    """Expand directories and glob patterns into shard paths.
+
+    Plain paths are kept as given, even if they do not exist, so reading them
+    reports the error. A glob that matches nothing is kept as well.
+
+    Args:
+        sources (Iterable[str]): File paths, directories or glob patterns.
+
+    Returns:
+        List[str]: Shard paths, in source order.
+    """
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(glob.glob(os.path.join(source, "*.txt"))))
+        elif GLOB_CHARS.intersection(source):
+            paths.extend(sorted(glob.glob(source)) or [source])
+        else:
+            paths.append(source)
+    return paths
+
+
+def _read_shard(path: str, reader: Callable) -> Tuple[list, Exception]:
+    """Read one shard, returning its transactions or the error it raised."""
+    try:
+        return reader(path), None
+    except (OSError, ValueError) as error:
+        return None, error
+
+
+def iter_shards(
+    sources: Iterable[str],
+    errors: list = None,
+    max_workers: int = None,
+    reader: Callable = read_transactions,
+) -> Iterator[Union[Transaction, IgnoredTransaction]]:
+    """Read shards concurrently and yield their transactions in shard order.
+
+    At most ``max_workers`` shards are read ahead of the one being consumed,
+    so memory is bounded by a few shards rather than the whole batch.
+    Shard errors are reported in shard order, as the shard is reached.
+
+    Args:
+        sources (Iterable[str]): File paths, directories or glob patterns.
+        errors (list, optional): Receives a (path, exception) pair for every
+            shard that could not be read.
+        max_workers (int, optional): Number of reader threads. Defaults to
+            READ_AHEAD.
+        reader (Callable, optional): Reads one shard into a list of
+            transactions. Defaults to validators.read_transactions.
+
+    Yields:
+        Union[Transaction, IgnoredTransaction]: Validated transactions.
+    """
+    workers = max_workers or READ_AHEAD
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for path in expand_sources(sources):
+            pending.append((path, executor.submit(_read_shard, path, reader)))
+            if len(pending) > workers:
+                yield from _shard_results(*pending.popleft(), errors)
+        while pending:
+            yield from _shard_results(*pending.popleft(), errors)
+
+
+def _shard_results(path: str, future, errors: list) -> list:
+    """Wait for a shard, recording its error if it could not be read."""
+    transactions, error = future.result()
+    if error is None:
+        return transactions
+    if errors is not None:
+        errors.append((path, error))
+    return []
+
+
+def process_shards(
+    sources: Iterable[str], sink=None, max_workers: int = None
+) -> List[Tuple[str, Exception]]:
+    """Price a batch of shards in one ordered pass and write the output.
+
+    Args:
+        sources (Iterable[str]): File paths, directories or glob patterns.
+        sink (optional): Output sink, see processor.write_output.
+        max_workers (int, optional): Number of reader threads.
+
+    Returns:
+        List[Tuple[str, Exception]]: The shards that could not be read, with
+        their errors.
+    """
+    errors = []
+    transactions = iter_shards(sources, errors, max_workers)
+    write_output(iter_processed_transactions(transactions), sink)
+    return errors
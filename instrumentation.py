@@ -0,0 +1,139 @@
+"""
+Optional profiling hooks and counters for the processing pipeline.
+
+Instrumentation is off by default: ``STATS`` is None and every hook costs a
+single module attribute lookup. Calling enable() installs a PipelineStats
+object that the pipeline stages update as they run:
+
+    - validators: time spent reading and validating, ignored lines by reason,
+    - processor: time spent applying discounts,
+    - discounts: rule evaluations and hits, monthly cap triggers,
+    - output: time spent formatting and writing.
+
+Workers of processor.process_transactions_parallel run in separate processes
+and are not instrumented.
+
+Imports:
+    - time.perf_counter: High resolution timer.
+    - collections.Counter, defaultdict: Counter storage.
+    - typing.Iterable, Iterator: Defines type hints.
+"""
+
+from collections import Counter, defaultdict
+from time import perf_counter
+from typing import Iterable, Iterator
+
+STATS = None  # The active PipelineStats, or None when instrumentation is off
+
+
+class PipelineStats:
+    """Counters and timers collected during a run."""
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.stage_seconds = defaultdict(float)
+        self.stage_items = Counter()
+        self.rule_evaluations = Counter()
+        self.rule_hits = Counter()
+        self.ignored = Counter()
+        self.monthly_cap_triggered = 0
+
+    def summary(self) -> dict:
+        """Export the counters as plain data.
+
+        Returns:
+            dict: Per-stage seconds and item counts, rule evaluations and hits,
+            ignored lines by reason and monthly cap triggers.
+        """
+        return {
+            "stages": {
+                stage: {
+                    "seconds": self.stage_seconds[stage],
+                    "items": self.stage_items[stage],
+                }
+                for stage in self.stage_seconds
+            },
+            "rules": {
+                rule: {
+                    "evaluations": self.rule_evaluations[rule],
+                    "hits": self.rule_hits[rule],
+                }
+                for rule in self.rule_evaluations
+            },
+            "ignored": dict(self.ignored),
+            "monthly_cap_triggered": self.monthly_cap_triggered,
+        }
+
+    def format_summary(self) -> str:
+        """Format the counters as a human-readable report.
+
+        Returns:
+            str: One line per stage, rule and ignore reason.
+        """
+        lines = []
+        for stage, seconds in self.stage_seconds.items():
+            lines.append(
+                f"stage {stage}: {seconds:.3f}s, "
+                f"{self.stage_items[stage]} items"
+            )
+        for rule, evaluations in self.rule_evaluations.items():
+            lines.append(
+                f"rule {rule}: {self.rule_hits[rule]} hits "
+                f"of {evaluations} evaluations"
+            )
+        for reason, count in sorted(self.ignored.items()):
+            lines.append(f"ignored {reason}: {count}")
+        lines.append(f"monthly cap triggered: {self.monthly_cap_triggered}")
+        return "\n".join(lines)
+
+
+def enable() -> PipelineStats:
+    """Turn instrumentation on with fresh counters.
+
+    Returns:
+        PipelineStats: The counters the pipeline will update.
+    """
+    global STATS
+    STATS = PipelineStats()
+    return STATS
+
+
+def disable() -> PipelineStats:
+    """Turn instrumentation off.
+
+    Returns:
+        PipelineStats: The counters collected so far, or None if it was off.
+    """
+    global STATS
+    stats, STATS = STATS, None
+    return stats
+
+
+def record_ignored(reason: str):
+    """Count an ignored line by reason, if instrumentation is on."""
+    if STATS is not None:
+        STATS.ignored[reason] += 1
+
+
+def timed(items: Iterable, stage: str, stats: PipelineStats) -> Iterator:
+    """Yield from an iterable, charging the time spent producing items to a stage.
+
+    Args:
+        items (Iterable): The iterable to wrap.
+        stage (str): The stage name.
+        stats (PipelineStats): The counters to update.
+
+    Yields:
+        The items of the iterable.
+    """
+    items = iter(items)
+    while True:
+        start = perf_counter()
+        try:
+            item = next(items)
+        except StopIteration:
+            stats.stage_seconds[stage] += perf_counter() - start
+            return
+        stats.stage_seconds[stage] += perf_counter() - start
+        stats.stage_items[stage] += 1
+        yield item
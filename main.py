@@ -3,21 +3,502 @@ Main entry point for the shipment processing application.
 
 This module orchestrates the reading, processing, and output of shipment transactions.
 
+    python main.py [input.txt | input.col ...] [--output PATH]
+                   [--format {text,columnar,store}] [--mmap] [--parallel]
+                   [--workers N] [--order {input,date}]
+                   [--catalog PATH] [--checkpoint PATH [--final]] [--stats]
+                   [--report PATH] [--scenario PATH ...] [--dedup]
+                   [--retain-months N] [--validate-only]
+                   [--serve] [--host HOST] [--port PORT] [--socket PATH]
+
+Several inputs, directories or glob patterns are read as one batch of
+shards (see ingest.py); shards that cannot be read are reported on stderr
+and the exit status is 1, but the other shards are still processed.
+
+A single input may also be a columnar file of validated transactions, as
+written by ``--validate-only --format columnar``; it is recognised by its
+magic bytes and read without parsing or validation.
+
+The plain ``python main.py [input]`` path is kept lean, as it runs many times
+a day on small files: argparse and the optional stages (process pool,
+external sort, checkpoints, the asyncio server) are only imported when the
+options that need them are given.
+
 Imports:
-    - validators.read_transactions: Reads and validates transaction data from a file.
-    - processor.process_transactions: Processes transactions by applying discount rules.
+    - os: Tells directories apart from input files.
+    - sys: Reads command line arguments and reports errors.
+    - types.SimpleNamespace: Holds the options of the plain invocation.
+    - validators.iter_transactions: Lazily reads and validates transaction data from a file.
+    - validators.iter_transactions_mmap: The same, through a memory map.
+    - validators.read_transactions: Reads one shard of a multi-input batch.
+    - processor.iter_processed_transactions: Lazily applies discount rules to transactions.
+    - processor.process_transactions_parallel: Prices months in a process pool.
+    - processor.MonthlyReport: Monthly totals for --report.
     - processor.write_output: Writes the processed transaction data to output.
+    - discounts.DiscountManager: Prices the stream, keeping --retain-months months.
+    - instrumentation: Optional stage timings and counters for --stats.
 """
 
-from validators import read_transactions
-from processor import process_transactions, write_output
+import os
+import sys
+from types import SimpleNamespace
+from validators import (
+    iter_transactions,
+    iter_transactions_mmap,
+    read_transactions,
+)
+from processor import (
+    MonthlyReport,
+    iter_processed_transactions,
+    process_transactions_parallel,
+    write_output,
+)
+from discounts import DiscountManager
+import instrumentation
+
+DEFAULTS = {
+    "inputs": ["input.txt"],
+    "output": None,
+    "format": "text",
+    "mmap": False,
+    "parallel": False,
+    "workers": None,
+    "order": None,
+    "catalog": None,
+    "checkpoint": None,
+    "final": False,
+    "stats": False,
+    "report": None,
+    "scenarios": None,
+    "dedup": False,
+    "retain_months": None,
+    "validate_only": False,
+    "serve": False,
+    "host": "127.0.0.1",
+    "port": 8000,
+    "socket": None,
+}
+
+# Mode option -> options it does not support, as option names in DEFAULTS.
+INCOMPATIBLE = {
+    "serve": (
+        "output",
+        "format",
+        "mmap",
+        "parallel",
+        "order",
+        "checkpoint",
+        "report",
+        "scenarios",
+        "dedup",
+        "workers",
+        "stats",
+    ),
+    "checkpoint": (
+        "format",
+        "mmap",
+        "parallel",
+        "order",
+        "report",
+        "scenarios",
+    ),
+    "scenarios": ("format", "parallel", "order", "report"),
+    "order": ("parallel",),
+    "retain_months": ("parallel", "scenarios"),
+    "validate_only": (
+        "serve",
+        "parallel",
+        "order",
+        "checkpoint",
+        "report",
+        "scenarios",
+        "retain_months",
+    ),
+}
+
+# Option -> mode option it only applies to.
+REQUIRES = {
+    "final": "checkpoint",
+    "host": "serve",
+    "port": "serve",
+    "socket": "serve",
+}
+
+
+def parse_args(argv=None) -> SimpleNamespace:
+    """Parse command line arguments.
+
+    A lone input path (or nothing) is handled without importing argparse.
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults
+            to sys.argv[1:].
+
+    Returns:
+        SimpleNamespace: The options, see DEFAULTS.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if len(argv) <= 1 and not any(arg.startswith("-") for arg in argv):
+        options = SimpleNamespace(**DEFAULTS)
+        if argv:
+            options.inputs = argv
+        return options
+    return _build_parser().parse_args(argv, SimpleNamespace(**DEFAULTS))
+
+
+def _build_parser():
+    """Build the full argument parser."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Price shipment transactions and apply discounts."
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=DEFAULTS["inputs"],
+        help="transaction logs (.txt), directories or glob patterns, or "
+        "one columnar file written with --validate-only",
+    )
+    parser.add_argument("-o", "--output", help="output file (default stdout)")
+    parser.add_argument(
+        "--format",
+        choices=("text", "columnar", "store"),
+        help="output format; columnar and store (date-range query store) "
+        "need --output",
+    )
+    parser.add_argument(
+        "--mmap", action="store_true", help="read through a memory map"
+    )
+    parser.add_argument(
+        "--parallel", action="store_true", help="price months in parallel"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="worker processes, or shard reader threads"
+    )
+    parser.add_argument(
+        "--order",
+        choices=("input", "date"),
+        help="input is not in date order: sort it externally and write "
+        "results in input or date order",
+    )
+    parser.add_argument("--catalog", help="JSON price catalog")
+    parser.add_argument(
+        "--checkpoint", help="process only lines appended since checkpoint"
+    )
+    parser.add_argument(
+        "--final",
+        action="store_true",
+        help="with --checkpoint: the input is complete, so also process a "
+        "last line without a trailing newline",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print stage timings and counters to stderr",
+    )
+    parser.add_argument("--report", help="write monthly totals to this file")
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="drop lines whose #id transaction id was already seen",
+    )
+    parser.add_argument(
+        "--retain-months",
+        type=int,
+        metavar="N",
+        help="input is in date order: drop the discount state of months "
+        "more than N months before the latest one, keeping memory bounded",
+    )
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="write the validated transactions without pricing them, as a "
+        "columnar file that later runs read without parsing; needs "
+        "--format columnar",
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        dest="scenarios",
+        help="JSON price catalog to evaluate as a what-if scenario; may be "
+        "repeated. Writes per-month cost and discount totals of every "
+        "scenario instead of the transactions",
+    )
+    parser.add_argument(
+        "--serve", action="store_true", help="run the pricing server"
+    )
+    parser.add_argument("--host", help="server host")
+    parser.add_argument("--port", type=int, help="server port")
+    parser.add_argument("--socket", help="server Unix socket path")
+    return parser
+
+
+def _flag(name: str) -> str:
+    """Command line flag of an option name in DEFAULTS."""
+    if name == "scenarios":
+        return "--scenario"
+    return "--" + name.replace("_", "-")
+
+
+def check_options(options: SimpleNamespace):
+    """Reject option combinations that the selected mode would ignore.
+
+    Args:
+        options (SimpleNamespace): Options from parse_args.
+
+    Raises:
+        ValueError: If an option is given that the selected mode does not
+            support.
+    """
+    given = {
+        name
+        for name, default in DEFAULTS.items()
+        if getattr(options, name) != default
+    }
+    for mode, unsupported in INCOMPATIBLE.items():
+        if mode in given:
+            for name in unsupported:
+                if name in given:
+                    raise ValueError(
+                        f"Error: {_flag(name)} cannot be used with "
+                        f"{_flag(mode)}."
+                    )
+    for name, mode in REQUIRES.items():
+        if name in given and mode not in given:
+            raise ValueError(f"Error: {_flag(name)} needs {_flag(mode)}.")
+    if (
+        "workers" in given
+        and "parallel" not in given
+        and _single_input(options.inputs) is not None
+    ):
+        raise ValueError(
+            "Error: --workers needs --parallel or several inputs."
+        )
+    if options.retain_months is not None and options.retain_months < 0:
+        raise ValueError("Error: --retain-months cannot be negative.")
+    if options.validate_only and options.format != "columnar":
+        raise ValueError("Error: --validate-only needs --format columnar.")
+
+
+def run(options: SimpleNamespace) -> list:
+    """Run the pipeline selected by the options.
+
+    Args:
+        options (SimpleNamespace): Options from parse_args.
+
+    Returns:
+        list: (path, exception) for every shard of a multi-input batch that
+        could not be read.
+
+    Raises:
+        FileNotFoundError: If a single input file does not exist.
+        ValueError: If a single input file or an option value is invalid, or
+            options are combined that cannot be used together.
+    """
+    check_options(options)
+    if options.serve:
+        from server import serve
+
+        serve(
+            options.host,
+            options.port,
+            options.socket,
+            options.catalog,
+            options.retain_months,
+        )
+        return []
+
+    if options.catalog is not None:
+        from catalog import reload_catalog
+
+        reload_catalog(options.catalog)
+
+    single = _single_input(options.inputs)
+    columnar = single is not None and _is_columnar(single)
+    if columnar and options.checkpoint is not None:
+        raise ValueError("Error: --checkpoint needs a text input file.")
+    if columnar and options.mmap:
+        raise ValueError(
+            "Error: --mmap only applies to text input; columnar files are "
+            "always memory-mapped."
+        )
+
+    if options.checkpoint is not None:
+        if single is None:
+            raise ValueError("Error: --checkpoint takes a single input file.")
+        from checkpoint import process_incremental
+
+        deferred = process_incremental(
+            single,
+            options.checkpoint,
+            options.output,
+            options.final,
+            options.dedup,
+            options.retain_months,
+        )
+        if deferred:
+            print(
+                f"Warning: {deferred} bytes at the end of '{single}' have no "
+                "trailing newline and were left for the next run; use "
+                "--final to process them.",
+                file=sys.stderr,
+            )
+        return []
+
+    errors = []
+    if single is not None:
+        if columnar:
+            transactions = _read_columnar_input(single)
+        elif options.mmap:
+            transactions = iter_transactions_mmap(single)
+        else:
+            transactions = iter_transactions(single)
+    else:
+        from ingest import iter_shards
+
+        reader = _read_mmap if options.mmap else read_transactions
+        transactions = iter_shards(
+            options.inputs, errors, options.workers, reader
+        )
+
+    if options.dedup:
+        from dedup import SeenIndex, deduplicate
+
+        # With --order, input is deduplicated before it is sorted, so
+        # months cannot be closed yet.
+        retain_months = (
+            options.retain_months if options.order is None else None
+        )
+        transactions = deduplicate(transactions, SeenIndex(retain_months))
+
+    if options.validate_only:
+        write_output(transactions, options.output, options.format)
+        return errors
+
+    if options.scenarios:
+        _write_scenarios(transactions, options.scenarios, options.output)
+        return errors
+
+    if options.order is not None:
+        from external_sort import process_unsorted
+
+        processed = process_unsorted(
+            transactions, options.order, retain_months=options.retain_months
+        )
+    elif options.parallel:
+        processed = process_transactions_parallel(
+            transactions, options.workers
+        )
+    else:
+        processed = iter_processed_transactions(
+            transactions, DiscountManager(retain_months=options.retain_months)
+        )
+
+    report = None
+    if options.report is not None:
+        report = MonthlyReport()
+        processed = report.track(processed)
+
+    write_output(processed, options.output, options.format)
+    if report is not None:
+        with open(options.report, "w", encoding="utf-8") as file:
+            file.write(report.format_report() + "\n")
+    return errors
+
+
+def _write_scenarios(transactions, paths: list, output: str):
+    """Evaluate catalog files as what-if scenarios and write the report."""
+    from catalog import load_catalog
+    from scenarios import ScenarioEngine
+
+    scenarios = {
+        os.path.splitext(os.path.basename(path))[0]: load_catalog(path)
+        for path in paths
+    }
+    report = ScenarioEngine(scenarios).evaluate(transactions).format_report()
+    if output is None:
+        print(report)
+        return
+    with open(output, "w", encoding="utf-8") as file:
+        file.write(report + "\n")
+
+
+def _single_input(inputs: list) -> str:
+    """Return the input path if exactly one plain file path was given."""
+    if len(inputs) != 1:
+        return None
+    path = inputs[0]
+    if os.path.isdir(path) or any(char in path for char in "*?["):
+        return None
+    return path
+
+
+def _is_columnar(path: str) -> bool:
+    """Tell whether an input file is a columnar file.
+
+    Text logs must end in ``.txt``, so only other files are probed, keeping
+    the columnar module off the plain path.
+    """
+    if path.endswith(".txt"):
+        return False
+    from columnar import MAGIC
+
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _read_columnar_input(path: str):
+    """Return the transactions of a columnar input file.
+
+    Raises:
+        ValueError: If the file holds processed transactions, or is damaged.
+    """
+    from columnar import ColumnarFile, read_columnar
+
+    with ColumnarFile(path) as columnar:
+        if columnar.processed:
+            raise ValueError(
+                f"Error: '{path}' holds processed transactions; write input "
+                "files with --validate-only."
+            )
+    return read_columnar(path)
+
+
+def _read_mmap(path: str) -> list:
+    """Read one shard through the memory-mapped reader."""
+    return list(iter_transactions_mmap(path))
+
+
+def main(argv=None):
+    """Main function to read, validate, process, and display transactions.
+
+    Transactions are streamed through every stage one line at a time.
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults
+            to sys.argv[1:].
+    """
+    options = parse_args(argv)
+    stats = instrumentation.enable() if options.stats else None
 
+    try:
+        errors = run(options)
+    except (FileNotFoundError, ValueError) as error:
+        sys.exit(str(error))
+    finally:
+        if stats is not None:
+            instrumentation.disable()
+            print(stats.format_summary(), file=sys.stderr)
 
-def main():
-    """Main function to read, validate, process, and display transactions."""
-    transactions = read_transactions("input.txt")
-    processed_transactions = process_transactions(transactions)
-    write_output(processed_transactions)
+    for _, error in errors:
+        print(error, file=sys.stderr)
+    if errors:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,39 +1,129 @@
 """
 Defines data models for shipment transactions.
 
-This module contains dataclasses representing different types of transactions.
+This module contains compact record classes representing different types of
+transactions. Records use ``__slots__`` instead of a per-instance ``__dict__``,
+and their string fields are interned, so millions of rows sharing the same
+date, size and provider only store pointers to a single copy of each value.
 
 Imports:
-    - dataclasses.dataclass: Simplifies the creation of data classes.
+    - sys.intern: Shares one copy of each repeated date, size and provider string.
+    - datetime: Converts dates to integer ordinals (imported on first use).
+    - functools.lru_cache: Caches date ordinals, as dates repeat heavily.
     - typing.Union: Allows defining attributes that can have multiple types.
 """
 
-from dataclasses import dataclass
+from functools import lru_cache
+from sys import intern
 from typing import Union
 
 
-@dataclass
-class Transaction:
-    """Represents a valid shipment transaction."""
+@lru_cache(maxsize=4096)
+def date_ordinal(date: str) -> int:
+    """Convert a validated ``%Y-%m-%d`` date to its proleptic Gregorian ordinal.
 
-    date: str
-    size: str
-    provider: str
+    Args:
+        date (str): A date accepted by validators.is_valid_date.
 
+    Returns:
+        int: The date ordinal, as returned by datetime.date.toordinal.
+    """
+    import datetime
 
-@dataclass
-class ProcessedTransaction:
+    try:
+        return datetime.date.fromisoformat(date).toordinal()
+    except ValueError:
+        return datetime.datetime.strptime(date, "%Y-%m-%d").toordinal()
+
+
+class Record:
+    """Base class for slotted records with dataclass-like equality and repr."""
+
+    __slots__ = ()
+    __hash__ = None
+
+    def astuple(self) -> tuple:
+        """Return the field values in declaration order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.astuple() == other.astuple()
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self.__slots__
+        )
+        return f"{self.__class__.__name__}({fields})"
+
+
+class Transaction(Record):
+    """Represents a valid shipment transaction.
+
+    ``account`` identifies the customer whose discount budget the shipment
+    uses; None for single-account input. ``transaction_id`` is the optional
+    upstream id used to drop redelivered lines (see dedup.py); ids are
+    unique, so unlike the other fields they are not interned.
+    """
+
+    __slots__ = ("date", "size", "provider", "account", "transaction_id")
+
+    def __init__(
+        self,
+        date: str,
+        size: str,
+        provider: str,
+        account: str = None,
+        transaction_id: str = None,
+    ):
+        self.date = intern(date)
+        self.size = intern(size)
+        self.provider = intern(provider)
+        self.account = account if account is None else intern(account)
+        self.transaction_id = transaction_id
+
+    @property
+    def ordinal(self) -> int:
+        """int: The transaction date as an integer ordinal."""
+        return date_ordinal(self.date)
+
+
+class ProcessedTransaction(Record):
     """Represents a processed shipment transaction with price and discount details."""
 
-    date: str
-    size: str
-    provider: str
-    price: float
-    discount: Union[float, str]  # "-" if no discount applied
+    __slots__ = ("date", "size", "provider", "price", "discount", "account")
+
+    def __init__(
+        self,
+        date: str,
+        size: str,
+        provider: str,
+        price: int,  # In cents
+        discount: Union[int, str],  # In cents, "-" if no discount applied
+        account: str = None,
+    ):
+        self.date = intern(date)
+        self.size = intern(size)
+        self.provider = intern(provider)
+        self.price = price
+        self.discount = discount
+        self.account = account if account is None else intern(account)
+
+    @property
+    def ordinal(self) -> int:
+        """int: The transaction date as an integer ordinal."""
+        return date_ordinal(self.date)
+
+
+class IgnoredTransaction(Record):
+    """Represents an invalid transaction.
 
+    ``data`` is the stripped input line; readers working on raw bytes keep it
+    as ``bytes``.
+    """
 
-@dataclass
-class IgnoredTransaction:
-    """Represents an invalid transaction."""
+    __slots__ = ("data",)
 
-    data: str
+    def __init__(self, data: Union[str, bytes]):
+        self.data = data
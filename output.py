@@ -0,0 +1,126 @@
+"""
+Output backend for processed transactions.
+
+This module formats processed transactions in chunks and writes each chunk
+to the sink in a single call, instead of one print() per transaction.
+
+Imports:
+    - io: Distinguishes binary sinks from text sinks.
+    - os: Recognises file path sinks.
+    - sys: Provides the default stdout sink.
+    - functools.lru_cache: Caches formatted prices and discounts.
+    - itertools.islice: Splits the transaction stream into chunks.
+    - typing.Iterable, Union: Defines type hints.
+    - models.ProcessedTransaction, models.IgnoredTransaction: Represents output records.
+    - instrumentation: Optional write stage timing.
+"""
+
+import io
+import os
+import sys
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Union
+from models import ProcessedTransaction, IgnoredTransaction
+import instrumentation
+
+CHUNK_SIZE = 4096  # Transactions formatted per write call
+
+
+@lru_cache(maxsize=256)
+def format_amount(amount: Union[int, str]) -> str:
+    """Format a price or discount, caching the handful of distinct values.
+
+    Amounts are integer cents and are only converted to decimal here.
+
+    Args:
+        amount (Union[int, str]): The amount in cents, or "-" if no discount
+            applied.
+
+    Returns:
+        str: The amount with two decimals, or "-".
+    """
+    if isinstance(amount, int):
+        return f"{amount // 100}.{amount % 100:02d}"
+    return "-"
+
+
+def format_transaction(
+    transaction: Union[ProcessedTransaction, IgnoredTransaction],
+) -> str:
+    """Format a transaction as a single output line without the newline.
+
+    Args:
+        transaction (Union[ProcessedTransaction, IgnoredTransaction]):
+            The transaction to format.
+
+    Returns:
+        str: The formatted output line.
+    """
+    if isinstance(transaction, IgnoredTransaction):
+        data = transaction.data
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        return f"{data} Ignored"
+    account = transaction.account
+    return (
+        f"{transaction.date} {transaction.size} {transaction.provider} "
+        f"{'' if account is None else account + ' '}"
+        f"{format_amount(transaction.price)} "
+        f"{format_amount(transaction.discount)}"
+    )
+
+
+def write_lines(
+    transactions: Iterable[Union[ProcessedTransaction, IgnoredTransaction]],
+    sink=None,
+    chunk_size: int = CHUNK_SIZE,
+):
+    """Write formatted transactions to a sink in bulk.
+
+    Args:
+        transactions (Iterable[Union[ProcessedTransaction, IgnoredTransaction]]):
+            A list or stream of transactions to write.
+        sink (optional): A file path, a text stream or a binary stream.
+            Defaults to sys.stdout.
+        chunk_size (int): Number of transactions formatted per write call.
+    """
+    if isinstance(sink, (str, os.PathLike)):
+        with open(sink, "w", encoding="utf-8") as file:
+            write_lines(transactions, file, chunk_size)
+        return
+
+    if sink is None:
+        sink = sys.stdout
+    binary = isinstance(sink, (io.RawIOBase, io.BufferedIOBase))
+
+    transactions = iter(transactions)
+    stats = instrumentation.STATS
+    if stats is not None:
+        _write_chunks_instrumented(
+            transactions, sink, binary, chunk_size, stats
+        )
+        return
+
+    while True:
+        chunk = list(map(format_transaction, islice(transactions, chunk_size)))
+        if not chunk:
+            break
+        chunk.append("")
+        text = "\n".join(chunk)
+        sink.write(text.encode("utf-8") if binary else text)
+
+
+def _write_chunks_instrumented(transactions, sink, binary, chunk_size, stats):
+    """write_lines loop, charging formatting and writing time to "write"."""
+    while True:
+        chunk = list(islice(transactions, chunk_size))
+        if not chunk:
+            break
+        start = instrumentation.perf_counter()
+        lines = list(map(format_transaction, chunk))
+        lines.append("")
+        text = "\n".join(lines)
+        sink.write(text.encode("utf-8") if binary else text)
+        stats.stage_seconds["write"] += instrumentation.perf_counter() - start
+        stats.stage_items["write"] += len(chunk)
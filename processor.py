@@ -4,19 +4,39 @@ Processing module for handling transactions.
 This module processes transactions, applies discounts, and writes output results.
 
 Imports:
-    - typing.List, Union: Defines type hints for function return values.
+    - typing.Iterable, Iterator, List, Union: Defines type hints for function
+    arguments and return values.
     - models.Transaction, models.ProcessedTransaction, models.IgnoredTransaction:
     Represents valid and ignored transactions.
+    - collections.Counter, defaultdict: Monthly rollup storage.
     - discounts.DiscountManager: Class for the discount rules
+    - discounts.tracking_key: Per-month (and per-account) partition keys.
+    - output.write_lines: Buffered bulk writer for formatted output lines.
+    - output.format_amount: Formats cents in monthly reports.
+    - columnar.write_columnar: Writer for the binary columnar format
+    (imported on first use).
+    - store.write_store: Writer for the date-range query store (imported on
+    first use).
+    - instrumentation: Optional processing stage timing.
+    - concurrent.futures.ProcessPoolExecutor: Runs independent months in
+    parallel (imported on first use, as multiprocessing is slow to load).
+    - functools.partial: Binds the price catalog for worker processes.
+    - catalog.get_catalog: The published price catalog.
 """
 
-from typing import List, Union
+from collections import Counter, defaultdict
+from functools import partial
+from typing import Iterable, Iterator, List, Union
 from models import Transaction, ProcessedTransaction, IgnoredTransaction
-from discounts import DiscountManager
+from discounts import DiscountManager, tracking_key
+from catalog import PriceCatalog, get_catalog
+from output import format_amount, write_lines
+import instrumentation
 
 
 def process_transactions(
     transactions: List[Union[Transaction, IgnoredTransaction]],
+    report: "MonthlyReport" = None,
 ) -> List[Union[ProcessedTransaction, IgnoredTransaction]]:
     """Process a list of transactions using the DiscountManager.
 
@@ -26,45 +46,320 @@ def process_transactions(
     Args:
         transactions (List[Union[Transaction, IgnoredTransaction]]):
             A list of transactions to process.
+        report (MonthlyReport, optional): Monthly rollups to update.
 
     Returns:
         List[Union[ProcessedTransaction, IgnoredTransaction]]:
             A list of processed transactions, including discounted shipments and ignored entries.
     """
-    discount_manager = DiscountManager()
-    processed = []
+    return list(iter_processed_transactions(transactions, report=report))
+
+
+def iter_processed_transactions(
+    transactions: Iterable[Union[Transaction, IgnoredTransaction]],
+    discount_manager: DiscountManager = None,
+    report: "MonthlyReport" = None,
+) -> Iterator[Union[ProcessedTransaction, IgnoredTransaction]]:
+    """Lazily process transactions using a single DiscountManager.
+
+    Transactions are pulled from the input one at a time, so chaining this
+    with validators.iter_transactions and write_output keeps memory flat
+    regardless of the input size.
+
+    Args:
+        transactions (Iterable[Union[Transaction, IgnoredTransaction]]):
+            Transactions to process, in input order.
+        discount_manager (DiscountManager, optional): Manager holding the
+            discount state to continue from. Defaults to a fresh one.
+        report (MonthlyReport, optional): Monthly rollups to update as
+            transactions are processed.
+
+    Yields:
+        Union[ProcessedTransaction, IgnoredTransaction]:
+            Processed transactions, in input order.
+    """
+    if discount_manager is None:
+        discount_manager = DiscountManager()
+
+    if report is not None:
+        yield from report.track(
+            iter_processed_transactions(transactions, discount_manager)
+        )
+        return
+
+    stats = instrumentation.STATS
+    if stats is not None:
+        yield from _iter_processed_instrumented(
+            transactions, discount_manager, stats
+        )
+        return
 
     for transaction in transactions:
         if isinstance(transaction, IgnoredTransaction):
-            processed.append(transaction)
+            yield transaction
         else:
-            processed.append(discount_manager.apply_discounts(transaction))
+            yield discount_manager.apply_discounts(transaction)
+
+
+def _iter_processed_instrumented(transactions, discount_manager, stats):
+    """iter_processed_transactions, charging discount time to "process"."""
+    for transaction in transactions:
+        start = instrumentation.perf_counter()
+        if not isinstance(transaction, IgnoredTransaction):
+            transaction = discount_manager.apply_discounts(transaction)
+        stats.stage_seconds["process"] += (
+            instrumentation.perf_counter() - start
+        )
+        stats.stage_items["process"] += 1
+        yield transaction
+
+
+def process_transactions_parallel(
+    transactions: Iterable[Union[Transaction, IgnoredTransaction]],
+    max_workers: int = None,
+) -> List[Union[ProcessedTransaction, IgnoredTransaction]]:
+    """Process transactions month by month in a process pool.
+
+    Discount tracking is keyed by month, so every month is priced by its own
+    DiscountManager in a separate worker. Results are merged back into the
+    original input order and are identical to process_transactions.
+
+    Args:
+        transactions (Iterable[Union[Transaction, IgnoredTransaction]]):
+            Transactions to process.
+        max_workers (int, optional): Number of worker processes. Defaults to
+            the number of CPUs.
+
+    Returns:
+        List[Union[ProcessedTransaction, IgnoredTransaction]]:
+            A list of processed transactions, including ignored entries.
+    """
+    processed = []
+    partitions = {}
+
+    for index, transaction in enumerate(transactions):
+        processed.append(transaction)
+        if not isinstance(transaction, IgnoredTransaction):
+            indices, month = partitions.setdefault(
+                transaction.date[:7], ([], [])
+            )
+            indices.append(index)
+            month.append(transaction)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            partial(_process_month, catalog=get_catalog()),
+            [month for _, month in partitions.values()],
+        )
+        for (indices, _), month in zip(partitions.values(), results):
+            for index, transaction in zip(indices, month):
+                processed[index] = transaction
 
     return processed
 
 
+def _process_month(transactions, catalog):
+    """Worker for process_transactions_parallel: price one month's transactions."""
+    return list(
+        iter_processed_transactions(transactions, DiscountManager(catalog))
+    )
+
+
 def write_output(
-    transactions: List[Union[ProcessedTransaction, IgnoredTransaction]],
+    transactions: Iterable[Union[ProcessedTransaction, IgnoredTransaction]],
+    sink=None,
+    fmt: str = "text",
 ):
-    """Write the processed transactions to the console.
+    """Write the processed transactions to the console or another sink.
 
-    Each processed transaction is printed in a structured format.
+    Each processed transaction is written in a structured format.
     If a transaction is ignored, it is explicitly marked as "Ignored."
+    Lines are formatted in chunks and written in bulk.
 
     Args:
-        transactions (List[Union[ProcessedTransaction, IgnoredTransaction]]):
-            A list of transactions to be displayed.
+        transactions (Iterable[Union[ProcessedTransaction, IgnoredTransaction]]):
+            A list or stream of transactions to be displayed.
+        sink (optional): A file path, a text stream or a binary stream.
+            Defaults to sys.stdout.
+        fmt (str): "text" for output lines, "columnar" for the binary
+            columnar format (see columnar.py) or "store" for the date-range
+            query store (see store.py); the binary formats need a file path
+            sink.
+
+    Raises:
+        ValueError: If the format is unknown, or binary output is requested
+            without a file path.
     """
-    for transaction in transactions:
-        if isinstance(transaction, IgnoredTransaction):
-            print(f"{transaction.data} Ignored")
+    if fmt == "text":
+        write_lines(transactions, sink)
+    elif fmt in ("columnar", "store"):
+        if not isinstance(sink, str):
+            raise ValueError(
+                f"Error: {fmt.capitalize()} output needs an output file path."
+            )
+        if fmt == "columnar":
+            from columnar import write_columnar
+
+            write_columnar(transactions, sink)
         else:
-            discount_display = (
-                f"{transaction.discount:.2f}"
-                if isinstance(transaction.discount, float)
-                else "-"
+            from store import write_store
+
+            write_store(transactions, sink)
+    else:
+        raise ValueError(
+            f"Error: Invalid output format '{fmt}', expected 'text', "
+            "'columnar' or 'store'."
+        )
+
+
+class MonthRollup:
+    """Totals of one month, or of one account's month."""
+
+    __slots__ = ("shipments", "revenue", "discount", "ignored", "counts")
+
+    def __init__(self):
+        self.shipments = 0
+        self.revenue = 0  # In cents
+        self.discount = 0  # In cents
+        self.ignored = 0
+        self.counts = Counter()  # (size, provider) -> shipments
+
+
+class MonthlyReport:
+    """Per-month totals, maintained incrementally as transactions stream by.
+
+    Rollups are keyed like DiscountManager's tracking data: by year_month,
+    or (account, year_month) for transactions with an account, so memory
+    grows with the number of months (and accounts), never with the input.
+    Ignored lines are attributed to the month of their ``YYYY-MM`` prefix,
+    or to "unknown" if they do not start with one.
+    """
+
+    def __init__(self, catalog: PriceCatalog = None):
+        """Initialize empty rollups.
+
+        Args:
+            catalog (PriceCatalog, optional): Catalog whose monthly discount
+                limit the report compares against. Defaults to the published
+                catalog.
+        """
+        self.monthly_limit = (catalog or get_catalog()).monthly_limit
+        self.months = defaultdict(MonthRollup)
+
+    def add(
+        self, transaction: Union[ProcessedTransaction, IgnoredTransaction]
+    ):
+        """Add one processed or ignored transaction to its month."""
+        if isinstance(transaction, IgnoredTransaction):
+            self.months[ignored_month(transaction.data)].ignored += 1
+            return
+
+        rollup = self.months[tracking_key(transaction)]
+        rollup.shipments += 1
+        rollup.revenue += transaction.price
+        if transaction.discount != "-":
+            rollup.discount += transaction.discount
+        rollup.counts[(transaction.size, transaction.provider)] += 1
+
+    def track(
+        self,
+        transactions: Iterable[
+            Union[ProcessedTransaction, IgnoredTransaction]
+        ],
+    ) -> Iterator[Union[ProcessedTransaction, IgnoredTransaction]]:
+        """Yield transactions unchanged, adding each one to the rollups.
+
+        Args:
+            transactions (Iterable[Union[ProcessedTransaction, IgnoredTransaction]]):
+                Processed transactions.
+
+        Yields:
+            Union[ProcessedTransaction, IgnoredTransaction]: The same
+            transactions.
+        """
+        for transaction in transactions:
+            self.add(transaction)
+            yield transaction
+
+    def _sorted_keys(self) -> list:
+        """Keys by month, then account; "unknown" last."""
+
+        def order(key):
+            account, month = ("", key) if isinstance(key, str) else key
+            return month == "unknown", month, account
+
+        return sorted(self.months, key=order)
+
+    def summary(self) -> dict:
+        """Export the rollups as plain data.
+
+        Returns:
+            dict: "year_month" or "account year_month" -> shipments, revenue
+            and discount in cents, discount limit in cents, ignored lines and
+            shipments per "size provider".
+        """
+        summary = {}
+        for key in self._sorted_keys():
+            rollup = self.months[key]
+            name = key if isinstance(key, str) else " ".join(key)
+            summary[name] = {
+                "shipments": rollup.shipments,
+                "revenue": rollup.revenue,
+                "discount": rollup.discount,
+                "discount_limit": self.monthly_limit,
+                "ignored": rollup.ignored,
+                "counts": {
+                    f"{size} {provider}": count
+                    for (size, provider), count in sorted(
+                        rollup.counts.items()
+                    )
+                },
+            }
+        return summary
+
+    def format_report(self) -> str:
+        """Format the rollups as a human-readable report.
+
+        Returns:
+            str: One line per month (and account).
+        """
+        lines = []
+        for key, month in self.summary().items():
+            counts = ", ".join(
+                f"{name} {count}" for name, count in month["counts"].items()
             )
-            print(
-                f"{transaction.date} {transaction.size} {transaction.provider} "
-                f"{transaction.price:.2f} {discount_display}"
+            lines.append(
+                f"{key}: {month['shipments']} shipments, "
+                f"revenue {format_amount(month['revenue'])}, "
+                f"discount {format_amount(month['discount'])} "
+                f"of {format_amount(month['discount_limit'])}, "
+                f"{month['ignored']} ignored"
+                + (f"; {counts}" if counts else "")
             )
+        return "\n".join(lines)
+
+
+def ignored_month(data: Union[str, bytes]) -> str:
+    """Return the ``YYYY-MM`` prefix of an ignored line, or "unknown".
+
+    Args:
+        data (Union[str, bytes]): The ignored line.
+
+    Returns:
+        str: The month, if the line starts with a valid one.
+    """
+    prefix = data[:7]
+    if isinstance(prefix, bytes):
+        prefix = prefix.decode("ascii", "replace")
+    if (
+        len(prefix) == 7
+        and prefix[4] == "-"
+        and prefix.isascii()
+        and prefix[:4].isdigit()
+        and prefix[5:].isdigit()
+        and 1 <= int(prefix[5:]) <= 12
+    ):
+        return prefix
+    return "unknown"
@@ -0,0 +1,214 @@
+"""
+What-if repricing: many price catalogs evaluated in one pass.
+
+Candidate price tables and monthly limits are given as PriceCatalogs. The
+input is read and validated once, and the SmallPackageDiscount and
+LargeLPThirdShipmentFree rules are evaluated for every scenario at once:
+
+    - the L/LP shipment count of a partition does not depend on prices, so
+      it is kept once and shared by all scenarios,
+    - the discount used per partition is a vector with one entry per
+      scenario; a discounted shipment updates the whole vector with
+      element-wise ``min(requested, limit - used)``,
+    - undiscounted cost is never summed per shipment: shipments are counted
+      per month and (size, provider), and multiplied by each scenario's
+      prices when the report is built.
+
+Per-month totals match running a separate DiscountManager per catalog over
+the same transactions.
+
+Imports:
+    - operator.add, sub: Element-wise vector updates.
+    - collections.Counter, defaultdict: Shipment counts and partition state.
+    - typing.Dict, Iterable, Union: Defines type hints.
+    - models.Transaction, IgnoredTransaction: Represents transactions.
+    - catalog.PriceCatalog: Scenario prices and limits.
+    - discounts.tracking_key: Discount tracking partitions.
+    - output.format_amount: Formats cents in the report.
+"""
+
+from operator import add, sub
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Union
+from models import Transaction, IgnoredTransaction
+from catalog import PriceCatalog
+from discounts import tracking_key
+from output import format_amount
+
+
+class ScenarioPartition:
+    """Discount state of one partition across all scenarios."""
+
+    __slots__ = ("L_LP_count", "used")
+
+    def __init__(self, scenarios: int):
+        self.L_LP_count = 0
+        self.used = [0] * scenarios  # Discount used per scenario, in cents
+
+
+class ScenarioEngine:
+    """Evaluates a fixed set of scenarios over a stream of transactions."""
+
+    def __init__(self, scenarios: Dict[str, PriceCatalog]):
+        """Prepare per-scenario limits and empty state.
+
+        Args:
+            scenarios (Dict[str, PriceCatalog]): Scenario name -> catalog.
+
+        Raises:
+            ValueError: If no scenarios are given.
+        """
+        if not scenarios:
+            raise ValueError("Error: No pricing scenarios given.")
+        self.names = list(scenarios)
+        self.catalogs = list(scenarios.values())
+        self.limits = [catalog.monthly_limit for catalog in self.catalogs]
+        self.partitions = defaultdict(
+            lambda: ScenarioPartition(len(self.catalogs))
+        )
+        self.counts = defaultdict(Counter)  # month -> (size, provider) -> n
+        self.requests = {}  # (size, provider) -> requested discount vector
+
+    def _requested(self, size: str, provider: str) -> list:
+        """Discount each scenario's rule asks for, for one shipment type.
+
+        Small shipments ask for the difference to the scenario's lowest
+        small price; the third large LP shipment asks for its full price.
+
+        Raises:
+            ValueError: If a scenario has no price for the shipment type.
+        """
+        key = (size, provider)
+        for name, catalog in zip(self.names, self.catalogs):
+            if key not in catalog.price_index:
+                raise ValueError(
+                    f"Error: Scenario '{name}' has no price for "
+                    f"{size} {provider}."
+                )
+        if size == "S":
+            return [
+                catalog.price_index[key] - catalog.lowest_price["S"]
+                for catalog in self.catalogs
+            ]
+        if key == ("L", "LP"):
+            return [catalog.price_index[key] for catalog in self.catalogs]
+        return None
+
+    def add(self, transaction: Union[Transaction, IgnoredTransaction]):
+        """Evaluate one transaction in every scenario.
+
+        Transactions must arrive in processing order, as for DiscountManager.
+
+        Args:
+            transaction (Union[Transaction, IgnoredTransaction]): The
+                transaction; ignored transactions are skipped.
+        """
+        if isinstance(transaction, IgnoredTransaction):
+            return
+
+        key = (transaction.size, transaction.provider)
+        self.counts[transaction.date[:7]][key] += 1
+        if key not in self.requests:
+            self.requests[key] = self._requested(*key)
+        requested = self.requests[key]
+        if requested is None:
+            return
+
+        partition = self.partitions[tracking_key(transaction)]
+        if key == ("L", "LP"):
+            partition.L_LP_count += 1
+            if partition.L_LP_count != 3:
+                return
+
+        used = partition.used
+        used[:] = map(
+            add, used, map(min, requested, map(sub, self.limits, used))
+        )
+
+    def evaluate(
+        self, transactions: Iterable[Union[Transaction, IgnoredTransaction]]
+    ) -> "ScenarioEngine":
+        """Evaluate a stream of transactions.
+
+        Args:
+            transactions (Iterable[Union[Transaction, IgnoredTransaction]]):
+                Transactions in processing order.
+
+        Returns:
+            ScenarioEngine: This engine, for chaining with summary().
+        """
+        for transaction in transactions:
+            self.add(transaction)
+        return self
+
+    def summary(self) -> dict:
+        """Per-scenario, per-month totals.
+
+        Returns:
+            dict: scenario -> "YYYY-MM" -> {"shipments", "cost",
+            "discount"}, amounts in cents. The cost is what customers pay
+            after discounts.
+        """
+        discounts = defaultdict(lambda: [0] * len(self.catalogs))
+        for key, partition in self.partitions.items():
+            month = key if isinstance(key, str) else key[1]
+            discounts[month][:] = map(add, discounts[month], partition.used)
+
+        summary = {name: {} for name in self.names}
+        for month in sorted(self.counts):
+            counts = self.counts[month]
+            shipments = sum(counts.values())
+            for index, (name, catalog) in enumerate(
+                zip(self.names, self.catalogs)
+            ):
+                discount = discounts[month][index]
+                base = sum(
+                    catalog.price_index[key] * count
+                    for key, count in counts.items()
+                )
+                summary[name][month] = {
+                    "shipments": shipments,
+                    "cost": base - discount,
+                    "discount": discount,
+                }
+        return summary
+
+    def format_report(self) -> str:
+        """Format the totals as a human-readable report.
+
+        Returns:
+            str: One line per scenario and month, then a total per scenario.
+        """
+        lines = []
+        for name, months in self.summary().items():
+            for month, totals in months.items():
+                lines.append(
+                    f"{name} {month}: {totals['shipments']} shipments, "
+                    f"cost {format_amount(totals['cost'])}, "
+                    f"discount {format_amount(totals['discount'])}"
+                )
+            cost = sum(totals["cost"] for totals in months.values())
+            discount = sum(totals["discount"] for totals in months.values())
+            lines.append(
+                f"{name} total: cost {format_amount(cost)}, "
+                f"discount {format_amount(discount)}"
+            )
+        return "\n".join(lines)
+
+
+def evaluate_scenarios(
+    transactions: Iterable[Union[Transaction, IgnoredTransaction]],
+    scenarios: Dict[str, PriceCatalog],
+) -> dict:
+    """Evaluate many price catalogs over the same transactions in one pass.
+
+    Args:
+        transactions (Iterable[Union[Transaction, IgnoredTransaction]]):
+            Transactions in processing order.
+        scenarios (Dict[str, PriceCatalog]): Scenario name -> catalog.
+
+    Returns:
+        dict: scenario -> "YYYY-MM" -> {"shipments", "cost", "discount"},
+        see ScenarioEngine.summary.
+    """
+    return ScenarioEngine(scenarios).evaluate(transactions).summary()
@@ -0,0 +1,216 @@
+"""
+Asyncio service mode for pricing shipments online.
+
+Clients connect over TCP or a Unix socket and send newline-delimited
+transactions; every line is validated with validate_transaction, priced
+against one long-lived DiscountManager and answered with the same line that
+write_output would print.
+
+Each read from a client is handled as one batch: all complete lines it
+contains are priced and answered with a single write. Pricing a batch never
+awaits, so batches from concurrent clients run one after another on the event
+loop and the per-month discount state stays consistent without locks.
+A newly published price catalog is picked up at the start of the next batch;
+with a catalog file, the server polls it every CATALOG_POLL_INTERVAL seconds
+and publishes it when it changes.
+A line longer than READ_SIZE is never buffered: the lines before it are
+answered and the connection is closed.
+
+Imports:
+    - asyncio: Runs the socket server.
+    - sys: Reports catalog reload errors.
+    - typing.List, Tuple: Defines type hints.
+    - models.IgnoredTransaction: Represents invalid transactions.
+    - catalog.CatalogWatcher: Reloads the catalog file when it changes.
+    - discounts.DiscountManager: Holds the long-lived discount state.
+    - output.format_transaction: Formats result lines.
+    - validators.validate_transaction: Validates incoming lines.
+"""
+
+import asyncio
+import sys
+from typing import List, Tuple
+from models import IgnoredTransaction
+from catalog import CatalogWatcher
+from discounts import DiscountManager
+from output import format_transaction
+from validators import validate_transaction
+
+READ_SIZE = 65536  # Maximum bytes read per batch, and maximum line size
+CATALOG_POLL_INTERVAL = 1.0  # Seconds between catalog file checks
+
+
+class PricingServer:
+    """Prices transactions received from socket clients."""
+
+    def __init__(
+        self,
+        discount_manager: DiscountManager = None,
+        retain_months: int = None,
+    ):
+        """Initialize the server state.
+
+        Args:
+            discount_manager (DiscountManager, optional): Manager holding the
+                discount state to continue from. Defaults to a fresh one.
+            retain_months (int, optional): Passed to the fresh
+                DiscountManager, so a long-running server only keeps recent
+                months.
+        """
+        self.discount_manager = discount_manager or DiscountManager(
+            retain_months=retain_months
+        )
+        self.watch_task = None
+
+    def price_lines(self, lines: List[bytes]) -> bytes:
+        """Validate, price and format a batch of raw lines.
+
+        Args:
+            lines (List[bytes]): Complete input lines without newlines.
+
+        Returns:
+            bytes: One result line per input line.
+        """
+        # Price catalog reloads take effect between batches.
+        self.discount_manager.refresh_catalog()
+        results = []
+        for line in lines:
+            transaction = validate_transaction(
+                line.decode("utf-8", errors="replace").strip()
+            )
+            if not isinstance(transaction, IgnoredTransaction):
+                transaction = self.discount_manager.apply_discounts(
+                    transaction
+                )
+            results.append(format_transaction(transaction))
+        results.append("")
+        return "\n".join(results).encode("utf-8")
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """Answer every line sent by a client until it closes its side.
+
+        Clients sending a line longer than READ_SIZE are disconnected.
+        """
+        pending = b""
+        try:
+            while True:
+                chunk = await reader.read(READ_SIZE)
+                if not chunk:
+                    break
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                if lines:
+                    writer.write(self.price_lines(lines))
+                    await writer.drain()
+                if len(pending) > READ_SIZE:
+                    pending = b""
+                    break
+
+            if pending:
+                writer.write(self.price_lines([pending]))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def watch_catalog(
+        self,
+        watcher: CatalogWatcher,
+        interval: float = CATALOG_POLL_INTERVAL,
+    ):
+        """Poll a catalog file until cancelled.
+
+        A catalog that fails to load is reported on stderr and the previous
+        one stays in use.
+
+        Args:
+            watcher (CatalogWatcher): Watcher of the catalog file.
+            interval (float): Seconds between checks.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                watcher.poll()
+            except (OSError, ValueError) as error:
+                print(error, file=sys.stderr)
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0, path: str = None
+    ) -> asyncio.AbstractServer:
+        """Start listening on a TCP port or, if a path is given, a Unix socket.
+
+        Args:
+            host (str): TCP host to bind.
+            port (int): TCP port to bind; 0 picks a free port.
+            path (str, optional): Unix socket path; overrides host and port.
+
+        Returns:
+            asyncio.AbstractServer: The listening server.
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_client, path)
+        return await asyncio.start_server(self.handle_client, host, port)
+
+
+async def start_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    path: str = None,
+    catalog_path: str = None,
+    poll_interval: float = CATALOG_POLL_INTERVAL,
+    retain_months: int = None,
+) -> Tuple[asyncio.AbstractServer, PricingServer]:
+    """Start a pricing server with a fresh DiscountManager.
+
+    Args:
+        host (str): TCP host to bind.
+        port (int): TCP port to bind; 0 picks a free port.
+        path (str, optional): Unix socket path; overrides host and port.
+        catalog_path (str, optional): Catalog file to publish and then watch
+            for changes. The watch task is PricingServer.watch_task.
+        poll_interval (float): Seconds between catalog file checks.
+        retain_months (int, optional): Passed to the DiscountManager.
+
+    Returns:
+        Tuple[asyncio.AbstractServer, PricingServer]: The listening server and
+        the pricing state behind it.
+    """
+    watcher = None if catalog_path is None else CatalogWatcher(catalog_path)
+    pricing = PricingServer(retain_months=retain_months)
+    server = await pricing.start(host, port, path)
+    if watcher is not None:
+        pricing.watch_task = asyncio.create_task(
+            pricing.watch_catalog(watcher, poll_interval)
+        )
+    return server, pricing
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    path: str = None,
+    catalog_path: str = None,
+    retain_months: int = None,
+):
+    """Run a pricing server until interrupted.
+
+    Args:
+        host (str): TCP host to bind.
+        port (int): TCP port to bind.
+        path (str, optional): Unix socket path; overrides host and port.
+        catalog_path (str, optional): Catalog file to publish and reload
+            whenever it changes.
+        retain_months (int, optional): Passed to the DiscountManager.
+    """
+
+    async def run():
+        server, _ = await start_server(
+            host, port, path, catalog_path, retain_months=retain_months
+        )
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
@@ -0,0 +1,363 @@
+"""
+Queryable on-disk store of processed transactions.
+
+Answers "all shipments between two dates for provider X" without rerunning
+the pipeline. Processed transactions are stored sorted by date, as integer
+ordinals in fixed-width columns, with:
+
+    - secondary indexes per provider, per size and per (size, provider):
+      the sorted row numbers of the matching shipments,
+    - prefix sums of prices and discounts for the whole store and for every
+      index, so totals over a date range take two lookups,
+    - binary search over the date ordinals to find the rows of a range.
+
+The file follows the conventions of the columnar format (see columnar.py):
+a magic string, a JSON header locating every section, and 8-byte aligned
+little-endian sections. Opening a store maps it into memory and reads the
+sections through memoryview casts, so it is ready instantly whatever its
+size. Dates are read back in ``YYYY-MM-DD`` form.
+
+Stores are written with ``python main.py --format store --output PATH`` (or
+write_store) and queried with
+
+    python store.py PATH [--from DATE] [--to DATE] [--provider P] [--size S]
+                         [--totals]
+
+Imports:
+    - json: Encodes the header.
+    - mmap: Maps stores for zero-copy reads.
+    - struct: Encodes the header length.
+    - array.array: Builds the columns while writing.
+    - bisect.bisect_left, bisect_right: Binary search over date ordinals.
+    - itertools.accumulate: Builds the prefix sums.
+    - typing.Iterable, Iterator, Tuple, Union: Defines type hints.
+    - models.ProcessedTransaction, IgnoredTransaction: Represents transactions.
+    - models.date_ordinal: Converts query dates to ordinals.
+    - columnar.ordinal_date: Converts ordinals back to dates.
+    - columnar.aligned, check_byteorder: Shared layout helpers.
+    - output.format_amount, write_lines: Prints query results.
+"""
+
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Iterable, Iterator, Tuple, Union
+from models import ProcessedTransaction, IgnoredTransaction, date_ordinal
+from columnar import aligned, check_byteorder, ordinal_date
+from output import format_amount, write_lines
+
+MAGIC = b"VSHPIDX1"
+
+
+def _prefix_sums(values: Iterable[int]) -> array:
+    """Running totals, starting with 0, so sum(values[a:b]) = p[b] - p[a]."""
+    return array("q", accumulate(values, initial=0))
+
+
+def write_store(
+    transactions: Iterable[Union[ProcessedTransaction, IgnoredTransaction]],
+    path: str,
+):
+    """Write processed transactions to a store file.
+
+    Ignored transactions are skipped. Shipments with the same date keep
+    their processing order.
+
+    Args:
+        transactions (Iterable[Union[ProcessedTransaction, IgnoredTransaction]]):
+            Processed transactions, e.g. from processor.process_transactions.
+        path (str): The file to write.
+    """
+    check_byteorder("store")
+    ordinals, sizes, providers, accounts = (
+        array("i"),
+        array("B"),
+        array("B"),
+        array("I"),
+    )
+    prices, discounts = array("i"), array("i")
+    size_codes, provider_codes, account_codes = {}, {}, {}
+    for transaction in transactions:
+        if isinstance(transaction, IgnoredTransaction):
+            continue
+        ordinals.append(transaction.ordinal)
+        sizes.append(size_codes.setdefault(transaction.size, len(size_codes)))
+        providers.append(
+            provider_codes.setdefault(
+                transaction.provider, len(provider_codes)
+            )
+        )
+        account = transaction.account
+        accounts.append(
+            0
+            if account is None
+            else account_codes.setdefault(account, len(account_codes)) + 1
+        )
+        prices.append(transaction.price)
+        discount = transaction.discount
+        discounts.append(0 if isinstance(discount, str) else discount)
+
+    order = sorted(range(len(ordinals)), key=ordinals.__getitem__)
+    columns = {
+        name: array(column.typecode, map(column.__getitem__, order))
+        for name, column in (
+            ("ordinal", ordinals),
+            ("size", sizes),
+            ("provider", providers),
+            ("account", accounts),
+            ("price", prices),
+            ("discount", discounts),
+        )
+    }
+    sections = dict(columns)
+    sections["price_prefix"] = _prefix_sums(columns["price"])
+    sections["discount_prefix"] = _prefix_sums(columns["discount"])
+
+    size_names, provider_names = list(size_codes), list(provider_codes)
+    indexes = {}
+    for row, (size, provider) in enumerate(
+        zip(columns["size"], columns["provider"])
+    ):
+        size, provider = size_names[size], provider_names[provider]
+        for name in (
+            f"provider:{provider}",
+            f"size:{size}",
+            f"size:{size}:provider:{provider}",
+        ):
+            indexes.setdefault(name, array("I")).append(row)
+    for name, rows in sorted(indexes.items()):
+        sections[f"rows:{name}"] = rows
+        sections[f"price_prefix:{name}"] = _prefix_sums(
+            map(columns["price"].__getitem__, rows)
+        )
+        sections[f"discount_prefix:{name}"] = _prefix_sums(
+            map(columns["discount"].__getitem__, rows)
+        )
+
+    layout, position = {}, 0
+    for name, section in sections.items():
+        layout[name] = [position, section.typecode, len(section)]
+        position += aligned(len(section) * section.itemsize)
+
+    header = json.dumps(
+        {
+            "rows": len(ordinals),
+            "sizes": size_names,
+            "providers": provider_names,
+            "accounts": list(account_codes),
+            "sections": layout,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<I", len(header)))
+        file.write(header)
+        file.write(bytes(aligned(file.tell()) - file.tell()))
+        for section in sections.values():
+            data = section.tobytes()
+            file.write(data)
+            file.write(bytes(aligned(len(data)) - len(data)))
+
+
+class TransactionStore:
+    """A memory-mapped store of processed transactions.
+
+    Date bounds of queries are inclusive and given as ``YYYY-MM-DD`` strings
+    or date ordinals; None leaves that side of the range open.
+    """
+
+    def __init__(self, path: str):
+        """Map the store and locate its sections.
+
+        Args:
+            path (str): The store file.
+
+        Raises:
+            ValueError: If the file is not a store file.
+        """
+        check_byteorder("store")
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        if self._view[:8] != MAGIC:
+            self.close()
+            raise ValueError(f"Error: '{path}' is not a transaction store.")
+        (length,) = struct.unpack_from("<I", self._view, 8)
+        self.header = json.loads(bytes(self._view[12 : 12 + length]))
+        start = aligned(12 + length)
+
+        self.sections = {}
+        for name, (offset, code, count) in self.header["sections"].items():
+            offset += start
+            end = offset + count * array(code).itemsize
+            self.sections[name] = self._view[offset:end].cast(code)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.header["rows"]
+
+    def close(self):
+        """Release the sections and unmap the file."""
+        for section in getattr(self, "sections", {}).values():
+            section.release()
+        self.sections = {}
+        self._view.release()
+        self._mmap.close()
+
+    def _index(self, provider: str, size: str) -> str:
+        """Section name suffix of the index to use, or "" for all rows."""
+        if provider is not None and size is not None:
+            return f":size:{size}:provider:{provider}"
+        if provider is not None:
+            return f":provider:{provider}"
+        if size is not None:
+            return f":size:{size}"
+        return ""
+
+    def _range(
+        self, start, end, provider: str = None, size: str = None
+    ) -> Tuple[str, int, int]:
+        """Find the index and the [lo, hi) positions of a date range."""
+        index = self._index(provider, size)
+        if not index:
+            keys, key = self.sections["ordinal"], None
+        elif f"rows{index}" in self.sections:
+            keys = self.sections[f"rows{index}"]
+            key = self.sections["ordinal"].__getitem__
+        else:
+            return index, 0, 0  # No shipment has this provider or size
+
+        lo = (
+            0 if start is None else bisect_left(keys, _ordinal(start), key=key)
+        )
+        hi = (
+            len(keys)
+            if end is None
+            else bisect_right(keys, _ordinal(end), key=key)
+        )
+        return index, lo, max(lo, hi)
+
+    def rows(
+        self, start=None, end=None, provider: str = None, size: str = None
+    ) -> Union[range, list]:
+        """Row numbers of the shipments in a date range.
+
+        Args:
+            start: First date, inclusive.
+            end: Last date, inclusive.
+            provider (str, optional): Only shipments of this provider.
+            size (str, optional): Only shipments of this size.
+
+        Returns:
+            Union[range, list]: Row numbers, in date order.
+        """
+        index, lo, hi = self._range(start, end, provider, size)
+        if not index:
+            return range(lo, hi)
+        if lo == hi:
+            return []
+        return self.sections[f"rows{index}"][lo:hi].tolist()
+
+    def query(
+        self, start=None, end=None, provider: str = None, size: str = None
+    ) -> Iterator[ProcessedTransaction]:
+        """Yield the shipments in a date range, in date order.
+
+        Args:
+            start: First date, inclusive.
+            end: Last date, inclusive.
+            provider (str, optional): Only shipments of this provider.
+            size (str, optional): Only shipments of this size.
+
+        Yields:
+            ProcessedTransaction: The matching shipments.
+        """
+        sections = self.sections
+        sizes = self.header["sizes"]
+        providers = self.header["providers"]
+        accounts = [None] + self.header["accounts"]
+        for row in self.rows(start, end, provider, size):
+            discount = sections["discount"][row]
+            yield ProcessedTransaction(
+                ordinal_date(sections["ordinal"][row]),
+                sizes[sections["size"][row]],
+                providers[sections["provider"][row]],
+                sections["price"][row],
+                discount if discount > 0 else "-",
+                accounts[sections["account"][row]],
+            )
+
+    def totals(
+        self, start=None, end=None, provider: str = None, size: str = None
+    ) -> dict:
+        """Aggregate the shipments in a date range using prefix sums.
+
+        Args:
+            start: First date, inclusive.
+            end: Last date, inclusive.
+            provider (str, optional): Only shipments of this provider.
+            size (str, optional): Only shipments of this size.
+
+        Returns:
+            dict: "shipments", and "revenue" and "discount" in cents.
+        """
+        index, lo, hi = self._range(start, end, provider, size)
+        if hi == lo:
+            return {"shipments": 0, "revenue": 0, "discount": 0}
+        prices = self.sections[f"price_prefix{index}"]
+        discounts = self.sections[f"discount_prefix{index}"]
+        return {
+            "shipments": hi - lo,
+            "revenue": prices[hi] - prices[lo],
+            "discount": discounts[hi] - discounts[lo],
+        }
+
+
+def _ordinal(day) -> int:
+    """Convert a query bound to a date ordinal."""
+    return day if isinstance(day, int) else date_ordinal(day)
+
+
+def main(argv=None):
+    """Print the shipments, or their totals, matching a query."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Query a store of processed transactions."
+    )
+    parser.add_argument("path", help="store file")
+    parser.add_argument("--from", dest="start", help="first date, inclusive")
+    parser.add_argument("--to", dest="end", help="last date, inclusive")
+    parser.add_argument("--provider", help="only this provider")
+    parser.add_argument("--size", help="only this package size")
+    parser.add_argument(
+        "--totals", action="store_true", help="print totals instead of rows"
+    )
+    args = parser.parse_args(argv)
+
+    with TransactionStore(args.path) as store:
+        query = (args.start, args.end, args.provider, args.size)
+        if not args.totals:
+            write_lines(store.query(*query))
+            return
+        totals = store.totals(*query)
+        print(
+            f"{totals['shipments']} shipments, "
+            f"revenue {format_amount(totals['revenue'])}, "
+            f"discount {format_amount(totals['discount'])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,25 @@ This module provides functions for reading and validating transaction data.
 
 Imports:
     - os: Used to check for file existence and validate file extension.
-    - datetime.datetime: Used to validate the date format in transactions.
-    - typing.List, Union: Defines type hints for function return values.
+    - sys.intern: Shares one copy of the fields of cached lines.
+    - mmap: Memory-maps input files for the zero-copy reader.
+    - datetime.datetime: Used to validate dates outside the fixed-width ISO layout
+    (imported on first use).
+    - functools.lru_cache: Memoizes validation of repeated lines.
+    - typing.Iterator, List, Union: Defines type hints for function return values.
     - models.Transaction, models.IgnoredTransaction: Represents valid and ignored transactions.
+    - catalog: Valid sizes and providers from the published price catalog.
+    - instrumentation: Optional read timing and ignored-line counters.
 """
 
 import os
-import datetime
-from typing import List, Union
+import mmap
+from sys import intern
+from functools import lru_cache
+from typing import Iterator, List, Union
 from models import Transaction, IgnoredTransaction
+import catalog
+import instrumentation
 
 
 def read_transactions(
@@ -28,6 +38,43 @@ def read_transactions(
     Returns:
         List[Union[Transaction, IgnoredTransaction]]: A list of validated transactions.
 
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file is not a .txt file or is empty.
+    """
+    return list(iter_transactions(file_name))
+
+
+def iter_transactions(
+    file_name,
+) -> Iterator[Union[Transaction, IgnoredTransaction]]:
+    """Lazily read and validate transactions from a file, one line at a time.
+
+    The file is checked eagerly, so errors are raised on the call itself
+    rather than on the first iteration. Only a single line is held in memory
+    at any point.
+
+    Args:
+        file_name (str): The name of the file containing transactions.
+
+    Returns:
+        Iterator[Union[Transaction, IgnoredTransaction]]: Validated transactions
+        in input order.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file is not a .txt file or is empty.
+    """
+    check_input_file(file_name)
+    return _instrument(_iter_lines(file_name))
+
+
+def check_input_file(file_name):
+    """Ensure the input file exists, is a .txt file and is not empty.
+
+    Args:
+        file_name (str): The name of the file containing transactions.
+
     Raises:
         FileNotFoundError: If the file does not exist.
         ValueError: If the file is not a .txt file or is empty.
@@ -42,42 +89,369 @@ def read_transactions(
             f"Error: Invalid file type. Expected a .txt file, got '{file_name}'."
         )
 
-    transactions = []
-
-    with open(file_name, encoding="utf-8") as file:
-        lines = file.readlines()
-
-        if not lines:
-            raise ValueError(f"Error: The file '{file_name}' is empty.")
+    if os.path.getsize(file_name) == 0:
+        raise ValueError(f"Error: The file '{file_name}' is empty.")
 
-        for line in lines:
-            transaction = validate_transaction(line.strip())
-            transactions.append(transaction)
 
-    return transactions
+def _iter_lines(file_name) -> Iterator[Union[Transaction, IgnoredTransaction]]:
+    """Yield a validated transaction for every line of an already checked file."""
+    with open(file_name, encoding="utf-8") as file:
+        for line in file:
+            yield validate_transaction(line.strip())
 
 
 def validate_transaction(line: str) -> Union[Transaction, IgnoredTransaction]:
     """Validate and convert a raw transaction line into a Transaction object.
 
+    A line holds a date, a package size and a provider, optionally followed
+    by an account id and by a ``#``-prefixed transaction id. Results are
+    memoized per line without its transaction id, see
+    configure_validation_cache.
+
     Args:
         line (str): A single line from the input file.
 
     Returns:
         Union[Transaction, IgnoredTransaction]: A valid Transaction object or an IgnoredTransaction.
     """
+    rest, transaction_id = _split_transaction_id(line)
+    if transaction_id == "":
+        return _ignore(line, "transaction_id")
+    fields, reason = _classify(rest, catalog.ACTIVE)
+    if fields is None:
+        return _ignore(line, reason)
+    return Transaction(*fields, transaction_id)
+
+
+def _split_transaction_id(line: Union[str, bytes]) -> tuple:
+    """Split a trailing ``#id`` token off a line.
+
+    Returns:
+        tuple: The rest of the line (right-stripped) and the id, which is
+        None if the line has no id token and empty if the token is just "#".
+    """
+    mark = "#" if isinstance(line, str) else b"#"
+    if mark not in line:
+        return line, None
+    head, _, tail = line.rpartition(mark)
+    tokens = tail.split()
+    if head[-1:].strip() or len(tokens) > 1:
+        return line, None  # "#" inside a token, or not in the last token
+    return head.rstrip(), tokens[0] if tokens else tail[:0]
+
+
+def _classify_line(line: str, active: catalog.PriceCatalog) -> tuple:
+    """Validate a stripped text line against a catalog.
+
+    Returns:
+        tuple: ((date, size, provider, account), None) for a valid line, or
+        (None, reason) for an ignored one.
+    """
     parts = line.split()
-    if len(parts) != 3:
-        return IgnoredTransaction(line)
+    if len(parts) == 3:
+        date, size, provider = parts
+        account = None
+    elif len(parts) == 4:
+        date, size, provider, account = parts
+    else:
+        return None, "field_count"
+
+    if not is_valid_date(date):
+        return None, "date"
+
+    if size not in active.valid_sizes:
+        return None, "size"
+
+    if provider not in active.valid_providers:
+        return None, "provider"
+
+    if (size, provider) not in active.price_index:
+        return None, "unpriced"
+
+    return _intern_fields(date, size, provider, account), None
+
+
+def _classify_bytes(line: bytes, active: catalog.PriceCatalog) -> tuple:
+    """Validate a raw printable-ASCII line against a catalog.
+
+    Returns:
+        tuple: ((date, size, provider, account), None) for a valid line, or
+        (None, reason) for an ignored one.
+    """
+    parts = line.split()
+    if len(parts) not in (3, 4):
+        return None, "field_count"
+
+    date = parts[0].decode("ascii")
+    if not is_valid_date(date):
+        return None, "date"
+
+    if parts[1] not in active.valid_size_bytes:
+        return None, "size"
+
+    if parts[2] not in active.valid_provider_bytes:
+        return None, "provider"
+
+    size, provider = parts[1].decode("ascii"), parts[2].decode("ascii")
+    if (size, provider) not in active.price_index:
+        return None, "unpriced"
+
+    account = parts[3].decode("ascii") if len(parts) == 4 else None
+    return _intern_fields(date, size, provider, account), None
+
+
+def _intern_fields(date, size, provider, account) -> tuple:
+    """Intern the fields of a valid line once, when it is first cached."""
+    return (
+        intern(date),
+        intern(size),
+        intern(provider),
+        account if account is None else intern(account),
+    )
+
+
+def _classify_uncached(line, active: catalog.PriceCatalog) -> tuple:
+    """Dispatch a text or raw line to its validator."""
+    if isinstance(line, bytes):
+        return _classify_bytes(line, active)
+    return _classify_line(line, active)
+
+
+# Shipment logs repeat the same lines thousands of times a day.
+VALIDATION_CACHE_SIZE = 65536
+
+# Keyed on (line, catalog), so publishing a new catalog never returns stale
+# results; entries of the old catalog simply age out.
+_classify = lru_cache(maxsize=VALIDATION_CACHE_SIZE)(_classify_uncached)
+
+
+def configure_validation_cache(maxsize: int = VALIDATION_CACHE_SIZE):
+    """Resize the validation cache, dropping its entries and statistics.
+
+    Args:
+        maxsize (int, optional): Maximum number of distinct lines to keep.
+            0 disables caching. Defaults to VALIDATION_CACHE_SIZE.
+
+    Raises:
+        ValueError: If maxsize is negative.
+    """
+    global _classify
+    if maxsize is None or maxsize < 0:
+        raise ValueError(f"Error: Invalid validation cache size '{maxsize}'.")
+    _classify = lru_cache(maxsize=maxsize)(_classify_uncached)
+
+
+def validation_cache_info() -> dict:
+    """Report the validation cache statistics.
+
+    Returns:
+        dict: hits, misses, hit_rate (0.0 before any lookup), size and
+        maxsize of the cache.
+    """
+    info = _classify.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+    }
+
+
+def _ignore(line, reason: str) -> IgnoredTransaction:
+    """Build an IgnoredTransaction and count it by reason."""
+    instrumentation.record_ignored(reason)
+    return IgnoredTransaction(line)
+
+
+# Printable ASCII and the whitespace that bytes.split() and str.split() agree
+# on. Lines with any other byte are decoded and validated as text.
+_BYTES_PATH_CHARS = b"\t\x0b\x0c" + bytes(range(0x20, 0x7F))
+_BLOCK_PATH_CHARS = _BYTES_PATH_CHARS + b"\n"
+
+MMAP_BLOCK_SIZE = 1 << 20  # Bytes scanned per block by the mmap reader
+
+
+def iter_transactions_mmap(
+    file_name,
+) -> Iterator[Union[Transaction, IgnoredTransaction]]:
+    """Lazily read transactions by scanning a memory-mapped file.
+
+    The map is scanned in blocks of about MMAP_BLOCK_SIZE bytes, cut after a
+    newline. Each block is checked for unusual bytes once and split into
+    lines in one call; lines of a clean block go straight to the validation
+    cache, and only the fields of lines that pass validation are decoded
+    into a Transaction. Ignored lines keep their raw (stripped) bytes as
+    IgnoredTransaction data. Blocks containing carriage returns, non-ASCII
+    or other unusual bytes are validated line by line with
+    validate_raw_line, so the results match iter_transactions.
+
+    Args:
+        file_name (str): The name of the file containing transactions.
+
+    Returns:
+        Iterator[Union[Transaction, IgnoredTransaction]]: Validated transactions
+        in input order.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file is not a .txt file or is empty.
+    """
+    check_input_file(file_name)
+    return _instrument(_iter_mmap(file_name))
+
+
+def _instrument(transactions: Iterator) -> Iterator:
+    """Charge reading and validation time to the "read" stage, if enabled."""
+    stats = instrumentation.STATS
+    if stats is None:
+        return transactions
+    return instrumentation.timed(transactions, "read", stats)
+
+
+def _iter_mmap(file_name) -> Iterator[Union[Transaction, IgnoredTransaction]]:
+    """Yield a validated transaction for every line of a memory-mapped file."""
+    with open(file_name, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        start, end = 0, len(data)
+        while start < end:
+            stop = start + MMAP_BLOCK_SIZE
+            if stop >= end:
+                stop = end
+            else:
+                # Cut after the last newline, or after the first one if a
+                # single line is longer than the block.
+                cut = data.rfind(b"\n", start, stop)
+                if cut == -1:
+                    cut = data.find(b"\n", stop)
+                stop = end if cut == -1 else cut + 1
+            block = data[start:stop]
+            start = stop
+            yield from _validate_block(block)
+
 
-    date, size, provider = parts
+def _validate_block(
+    block: bytes,
+) -> Iterator[Union[Transaction, IgnoredTransaction]]:
+    """Validate a block of whole lines read from the memory map."""
+    lines = block.split(b"\n")
+    if block.endswith(b"\n"):
+        lines.pop()
+
+    if block.translate(None, _BLOCK_PATH_CHARS):
+        for line in lines:
+            yield from validate_raw_line(line)
+    elif b"#" in block:
+        yield from map(validate_transaction_bytes, lines)
+    else:
+        # No transaction ids: classify lines directly.
+        classify, active = _classify, catalog.ACTIVE
+        for line in lines:
+            fields, reason = classify(line, active)
+            if fields is None:
+                yield _ignore(line.strip(), reason)
+            else:
+                yield Transaction(*fields)
+
+
+def validate_raw_line(
+    line: bytes,
+) -> Iterator[Union[Transaction, IgnoredTransaction]]:
+    """Validate a raw line read in binary mode.
+
+    Printable-ASCII lines go through validate_transaction_bytes. Other lines
+    are decoded and split the way text mode would, where "\\r\\n" ends one
+    line and a lone "\\r" ends another.
+
+    Args:
+        line (bytes): A single line from the input file, without the newline.
+
+    Yields:
+        Union[Transaction, IgnoredTransaction]: The validated transactions.
+    """
+    if not line.translate(None, _BYTES_PATH_CHARS):
+        yield validate_transaction_bytes(line)
+        return
+
+    text = line.decode("utf-8")
+    if text.endswith("\r"):
+        text = text[:-1]
+    for part in text.split("\r"):
+        yield validate_transaction(part.strip())
+
+
+def validate_transaction_bytes(
+    line: bytes,
+) -> Union[Transaction, IgnoredTransaction]:
+    """Validate a raw printable-ASCII transaction line.
+
+    Results share the memoized validation cache with validate_transaction,
+    and a trailing ``#id`` token is read the same way.
+
+    Args:
+        line (bytes): A single line from the input file, without the newline.
+
+    Returns:
+        Union[Transaction, IgnoredTransaction]: A valid Transaction object or
+        an IgnoredTransaction holding the stripped raw bytes.
+    """
+    rest, transaction_id = _split_transaction_id(line)
+    if transaction_id == b"":
+        return _ignore(line.strip(), "transaction_id")
+    fields, reason = _classify(rest, catalog.ACTIVE)
+    if fields is None:
+        return _ignore(line.strip(), reason)
+    if transaction_id is not None:
+        transaction_id = transaction_id.decode("ascii")
+    return Transaction(*fields, transaction_id)
+
+
+# Days per month in a common year; February is adjusted for leap years.
+DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def is_valid_date(date: str) -> bool:
+    """Check whether a date token is a valid ``%Y-%m-%d`` calendar date.
+
+    The fixed-width ``YYYY-MM-DD`` layout is checked with plain integer
+    arithmetic. Anything else (e.g. ``2015-2-1``, which ``strptime`` also
+    accepts) falls back to ``datetime.strptime``, so exactly the same inputs
+    are accepted as before.
+
+    Args:
+        date (str): The date token from a transaction line.
+
+    Returns:
+        bool: True if the date is valid, False otherwise.
+    """
+    year, month, day = date[:4], date[5:7], date[8:]
+    if (
+        len(date) == 10
+        and date[4] == "-"
+        and date[7] == "-"
+        and date.isascii()
+        and year.isdigit()
+        and month.isdigit()
+        and day.isdigit()
+    ):
+        year, month, day = int(year), int(month), int(day)
+        if year < 1 or not 1 <= month <= 12 or day < 1:
+            return False
+
+        if (
+            month == 2
+            and year % 4 == 0
+            and (year % 100 != 0 or year % 400 == 0)
+        ):
+            return day <= 29
+        return day <= DAYS_IN_MONTH[month]
+
+    import datetime
 
     try:
         datetime.datetime.strptime(date, "%Y-%m-%d")
     except ValueError:
-        return IgnoredTransaction(line)
-
-    if size not in {"S", "M", "L"} or provider not in {"LP", "MR"}:
-        return IgnoredTransaction(line)
-
-    return Transaction(date, size, provider)
+        return False
+    return True